@@ -0,0 +1,295 @@
+"""Times every builder exported from paramak at several scales of num_points,
+number of layers, number of toroidal field coils and number of cutters.
+
+Each case is built in a new Python process with the caches disabled, which
+records the wall time of the build and the peak resident set size (RSS) of
+the process. The results are written as JSON and compared against a stored
+baseline, returning a non zero exit code when a case is slower, or its build
+raises the peak RSS by more, than the baseline by more than the tolerance.
+
+Usage:
+    python benchmarks/benchmark_builders.py [--filter tokamak] [--output results.json]
+    python benchmarks/benchmark_builders.py --save-baseline
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import paramak
+from paramak import LayerType
+
+BASELINE_FILENAME = Path(__file__).parent / "baseline.json"
+
+
+class Case(NamedTuple):
+    builder: str
+    scale: str
+    # returns the keyword arguments of the builder, built before the timing starts
+    arguments: Callable[[], dict]
+
+    @property
+    def name(self) -> str:
+        return f"{self.builder}[{self.scale}]"
+
+
+def radial_build(layers: int, spherical: bool = False):
+    """A radial build with the given number of solid layers on each side of the plasma."""
+    inner_layers = 2 if spherical else layers
+    return (
+        [(LayerType.GAP, 10)]
+        + [(LayerType.SOLID, 20)] * inner_layers
+        + [(LayerType.GAP, 50), (LayerType.PLASMA, 300), (LayerType.GAP, 60)]
+        + [(LayerType.SOLID, 20)] * layers
+    )
+
+
+def vertical_build(layers: int):
+    return (
+        [(LayerType.SOLID, 15)] * layers
+        + [(LayerType.GAP, 50), (LayerType.PLASMA, 700), (LayerType.GAP, 60)]
+        + [(LayerType.SOLID, 15)] * layers
+    )
+
+
+def poloidal_field_coils(count: int):
+    """Pairs of poloidal field coils and casings placed around the blanket."""
+    shapes = []
+    for index in range(count):
+        center_point = (750 + 40 * (index % 2), -700 + 1400 * index / max(count - 1, 1))
+        shapes.append(paramak.poloidal_field_coil(height=30, width=30, center_point=center_point, rotation_angle=180))
+        shapes.append(
+            paramak.poloidal_field_coil_case(
+                coil_height=30, coil_width=30, casing_thickness=5, center_point=center_point, rotation_angle=180
+            )
+        )
+    return shapes
+
+
+def toroidal_field_coils(count: int):
+    return paramak.toroidal_field_coil_rectangle(
+        horizontal_start_point=(10, 900),
+        vertical_mid_point=(1000, 0),
+        thickness=20,
+        distance=20,
+        azimuthal_placement_angles=[(index + 0.5) * 180 / count for index in range(count)],
+    )
+
+
+def reactor_cases(builder: str, spherical: bool, from_plasma: bool):
+    def arguments(layers, cutters=()):
+        def make():
+            kwargs = dict(radial_build=radial_build(layers, spherical), rotation_angle=180, triangularity=0.55)
+            if from_plasma:
+                kwargs["elongation"] = 2.0
+            else:
+                kwargs["vertical_build"] = vertical_build(layers)
+            kwargs["extra_cut_shapes"] = [shape for make_cutters in cutters for shape in make_cutters()]
+            return kwargs
+
+        return make
+
+    cases = [Case(builder, f"layers={layers}", arguments(layers)) for layers in (1, 2, 4)]
+    if from_plasma:
+        cases += [
+            Case(builder, f"layers=2,pf_coils={count}", arguments(2, [lambda count=count: poloidal_field_coils(count)]))
+            for count in (4, 8)
+        ]
+        cases.append(Case(builder, "layers=2,tf_coils=8", arguments(2, [lambda: [toroidal_field_coils(8)]])))
+    return cases
+
+
+def princeton_d_arguments(coils: int, instanced: bool = False):
+    return lambda: dict(
+        r1=100,
+        r2=900,
+        thickness=50,
+        distance=30,
+        azimuthal_placement_angles=[index * 360 / coils for index in range(coils)],
+        instanced=instanced,
+    )
+
+
+def rectangle_arguments(coils: int, instanced: bool = False):
+    return lambda: dict(
+        horizontal_start_point=(10, 900),
+        vertical_mid_point=(1000, 0),
+        thickness=20,
+        distance=20,
+        azimuthal_placement_angles=[index * 360 / coils for index in range(coils)],
+        instanced=instanced,
+    )
+
+
+CASES = (
+    [
+        Case("plasma_simplified", f"num_points={num_points}", lambda num_points=num_points: dict(num_points=num_points))
+        for num_points in (50, 200, 800)
+    ]
+    + [
+        Case(
+            "blanket_from_plasma",
+            f"num_points={num_points}",
+            lambda num_points=num_points: dict(thickness=20, start_angle=-90, stop_angle=260, num_points=num_points),
+        )
+        for num_points in (50, 200, 800)
+    ]
+    + [
+        Case(
+            "blanket_constant_thickness_arc_h",
+            "default",
+            lambda: dict(
+                inner_mid_point=(500, 0), inner_upper_point=(400, 300), inner_lower_point=(400, -300), thickness=20
+            ),
+        ),
+        Case(
+            "center_column_shield_cylinder",
+            "default",
+            lambda: dict(height=600, inner_radius=20, thickness=40, rotation_angle=360),
+        ),
+        Case("constant_thickness_dome", "default", lambda: dict(rotation_angle=360)),
+        Case("cutting_wedge", "default", lambda: dict(height=1000, radius=1000)),
+        Case("dished_vacuum_vessel", "default", lambda: dict(rotation_angle=360)),
+        Case(
+            "poloidal_field_coil",
+            "default",
+            lambda: dict(height=30, width=30, center_point=(750, 200), rotation_angle=360),
+        ),
+        Case(
+            "poloidal_field_coil_case",
+            "default",
+            lambda: dict(
+                coil_height=30, coil_width=30, casing_thickness=5, center_point=(750, 200), rotation_angle=360
+            ),
+        ),
+        Case("u_shaped_dome", "default", lambda: dict(rotation_angle=360)),
+    ]
+    + [Case("toroidal_field_coil_rectangle", f"tf_coils={coils}", rectangle_arguments(coils)) for coils in (1, 8, 16)]
+    + [Case("toroidal_field_coil_rectangle", "tf_coils=16,instanced", rectangle_arguments(16, True))]
+    + [
+        Case("toroidal_field_coil_princeton_d", f"tf_coils={coils}", princeton_d_arguments(coils))
+        for coils in (1, 8, 16)
+    ]
+    + [Case("toroidal_field_coil_princeton_d", "tf_coils=16,instanced", princeton_d_arguments(16, True))]
+    + reactor_cases("tokamak", spherical=False, from_plasma=False)
+    + reactor_cases("tokamak_from_plasma", spherical=False, from_plasma=True)
+    + reactor_cases("spherical_tokamak", spherical=True, from_plasma=False)
+    + reactor_cases("spherical_tokamak_from_plasma", spherical=True, from_plasma=True)
+)
+
+
+def peak_rss_mb() -> float:
+    """The peak resident set size of this process in megabytes."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak_rss / 1e6 if sys.platform == "darwin" else peak_rss / 1e3
+
+
+def run_case(name: str) -> dict:
+    """Builds a case in this process and returns its wall time and peak RSS."""
+    case = next(case for case in CASES if case.name == name)
+    paramak.cache.configure_memory_cache(max_entries=0)
+    kwargs = case.arguments()
+    setup_rss_mb = peak_rss_mb()
+    start = time.perf_counter()
+    getattr(paramak, case.builder)(**kwargs)
+    duration = time.perf_counter() - start
+    # the setup RSS includes the imports and the arguments, which is useful to
+    # tell an increase in the memory used by the build from one in the imports
+    return {"seconds": duration, "peak_rss_mb": peak_rss_mb(), "setup_rss_mb": setup_rss_mb}
+
+
+def run_cases(cases, repeat: int = 1) -> dict:
+    """Builds each case in a new process, keeping the fastest of the repeats."""
+    results = {}
+    for case in cases:
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, __file__, "--case", case.name], capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.splitlines()[-1]))
+        result = results[case.name] = min(runs, key=lambda run: run["seconds"])
+        print(f"{case.name:<60} {result['seconds']:>9.3f}s {build_rss_mb(result):>8.0f} MB", flush=True)
+    return results
+
+
+def build_rss_mb(result: dict) -> float:
+    """The increase of the peak RSS during the build, which leaves out the
+    imports and the arguments that dominate the peak RSS of the process."""
+    return result["peak_rss_mb"] - result["setup_rss_mb"]
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_seconds: float, min_mb: float) -> list:
+    """Returns a description of each case that is slower or uses more memory
+    during the build than the baseline by more than the tolerance. Increases
+    of less than min_seconds or min_mb are ignored as the smallest builds are
+    dominated by noise."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        measures = {
+            "seconds": (result["seconds"], baseline[name]["seconds"], min_seconds),
+            "build_rss_mb": (build_rss_mb(result), build_rss_mb(baseline[name]), min_mb),
+        }
+        for key, (value, baseline_value, minimum) in measures.items():
+            if value - baseline_value < minimum:
+                continue
+            ratio = value / baseline_value if baseline_value > 0 else float("inf")
+            if ratio > 1 + tolerance:
+                regressions.append(f"{name} {key}: {baseline_value:.3f} -> {value:.3f} ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run the cases with names containing this text")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs of each case, keeping the fastest")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILENAME, help="JSON file of baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional increase on the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--min-mb", type=float, default=5, help="ignore build memory increases smaller than this")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case)))
+        return 0
+
+    results = run_cases([case for case in CASES if args.filter in case.name], repeat=args.repeat)
+    report = {
+        "paramak": paramak.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        # keeps the baseline of the cases that were not run
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"results": {}}
+        report["results"] = {**baseline["results"], **results}
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline to make one")
+        return 0
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_seconds, args.min_mb)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Compares the time taken to cut the extra_cut_shapes from the layers of a
+tokamak one cutter at a time and with paramak.utils.cut_workplanes, which
+skips the cutters that can not intersect a layer and cuts the rest in one
+boolean operation.
+
+Usage: python benchmarks/benchmark_cut.py [number of toroidal field coils]
+"""
+
+import sys
+import time
+
+import paramak
+from paramak.assemblies.tokamak import center_column_shield_cylinder_tasks, layer_tasks_from_plasma
+from paramak.utils import LayerType, build_workplanes, cut_workplanes
+
+radial_build = [
+    (LayerType.GAP, 10),
+    (LayerType.SOLID, 30),
+    (LayerType.SOLID, 50),
+    (LayerType.SOLID, 10),
+    (LayerType.SOLID, 120),
+    (LayerType.SOLID, 20),
+    (LayerType.GAP, 60),
+    (LayerType.PLASMA, 300),
+    (LayerType.GAP, 60),
+    (LayerType.SOLID, 20),
+    (LayerType.SOLID, 120),
+    (LayerType.SOLID, 10),
+]
+vertical_build = [
+    (LayerType.SOLID, 15),
+    (LayerType.SOLID, 80),
+    (LayerType.SOLID, 10),
+    (LayerType.GAP, 50),
+    (LayerType.PLASMA, 700),
+    (LayerType.GAP, 60),
+    (LayerType.SOLID, 10),
+    (LayerType.SOLID, 40),
+    (LayerType.SOLID, 15),
+]
+
+
+def tokamak_layers():
+    tasks = center_column_shield_cylinder_tasks(radial_build, 360, 1000)
+    tasks += layer_tasks_from_plasma(
+        radial_build=radial_build,
+        vertical_build=vertical_build,
+        minor_radius=150,
+        major_radius=450,
+        triangularity=0.55,
+        elongation=2.0,
+        rotation_angle=360,
+    )
+    return build_workplanes(tasks)
+
+
+def cutters(tf_coils: int, pf_coils: int):
+    shapes = []
+    if tf_coils > 0:
+        shapes.append(
+            paramak.toroidal_field_coil_rectangle(
+                horizontal_start_point=(10, 900),
+                vertical_mid_point=(1000, 0),
+                thickness=20,
+                distance=20,
+                azimuthal_placement_angles=[index * 360 / tf_coils for index in range(tf_coils)],
+            )
+        )
+    for index in range(pf_coils):
+        center_point = (750 + 40 * (index % 2), -700 + 200 * index)
+        shapes.append(paramak.poloidal_field_coil(height=30, width=30, center_point=center_point, rotation_angle=360))
+        shapes.append(
+            paramak.poloidal_field_coil_case(
+                coil_height=30, coil_width=30, casing_thickness=5, center_point=center_point, rotation_angle=360
+            )
+        )
+    return shapes
+
+
+def cut_one_at_a_time(layers, shapes):
+    cut_layers = []
+    for layer in layers:
+        for shape in shapes:
+            layer = layer.cut(shape)
+        cut_layers.append(layer)
+    return cut_layers
+
+
+def main(tf_coils: int = 0, pf_coils: int = 8):
+    """The cut of the toroidal field coils through every layer dominates the
+    time when tf_coils is set, as neither method can skip it."""
+    layers = tokamak_layers()
+    shapes = cutters(tf_coils, pf_coils)
+    for label, cut in (("one cutter at a time", cut_one_at_a_time), ("cut_workplanes", cut_workplanes)):
+        start = time.perf_counter()
+        volume = sum(layer.val().Volume() for layer in cut(layers, shapes))
+        duration = time.perf_counter() - start
+        print(f"{len(layers)} layers, {len(shapes)} cutters, {label}: {duration:.3f}s, volume {volume:.6e}")
+
+
+if __name__ == "__main__":
+    main(tf_coils=int(sys.argv[1]) if len(sys.argv) > 1 else 0)
@@ -0,0 +1,134 @@
+"""Compares the time taken to fuse workplanes with a chain of pairwise unions
+and with a single general fuse, with and without the OCC parallel mode, for
+the nested uncut components of a tokamak, as fused before intersecting the
+extra_intersect_shapes, and for separate poloidal field coil cases.
+
+Usage: python benchmarks/benchmark_fuse.py
+"""
+
+import functools
+import time
+import typing
+
+from cadquery import Shape, Workplane
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Fuse
+from OCP.TopTools import TopTools_ListOfShape
+
+from paramak import poloidal_field_coil_case
+from paramak.assemblies.tokamak import center_column_shield_cylinder_tasks, layer_tasks_from_plasma
+from paramak.utils import LayerType, build_workplanes
+
+
+def fuse_workplanes(
+    workplanes: typing.Sequence[Workplane],
+    parallel: bool = True,
+    fuzzy_tolerance: typing.Optional[float] = None,
+    clean: bool = True,
+) -> Workplane:
+    """Fuses the solids of all the workplanes in a single general fuse
+    operation instead of a chain of pairwise unions, each on a growing shape.
+
+    Args:
+        workplanes: the workplanes containing the solids to fuse.
+        parallel: runs the boolean operation with the OCC parallel mode.
+        fuzzy_tolerance: the tolerance for the OCC fuzzy boolean mode, None
+            uses the exact mode.
+        clean: removes unwanted edges from the faces of the fused solid.
+
+    Returns:
+        a Workplane with the fused shape on the same plane as the first
+        workplane.
+    """
+    solids = [solid for workplane in workplanes for solid in workplane.solids().vals()]
+    if len(solids) == 0:
+        raise ValueError("The workplanes should contain at least one solid to fuse")
+
+    arguments = TopTools_ListOfShape()
+    arguments.Append(solids[0].wrapped)
+    tools = TopTools_ListOfShape()
+    for solid in solids[1:]:
+        tools.Append(solid.wrapped)
+
+    fuse = BRepAlgoAPI_Fuse()
+    fuse.SetArguments(arguments)
+    fuse.SetTools(tools)
+    fuse.SetRunParallel(parallel)
+    if fuzzy_tolerance:
+        fuse.SetFuzzyValue(fuzzy_tolerance)
+    fuse.Build()
+    if not fuse.IsDone():
+        raise ValueError("The general fuse of the workplanes failed")
+
+    fused = Shape.cast(fuse.Shape())
+    if clean:
+        fused = fused.clean()
+    return Workplane(workplanes[0].plane).newObject([fused])
+
+
+def chained_union(workplanes):
+    fused = workplanes[0]
+    for workplane in workplanes[1:]:
+        fused = fused.union(workplane)
+    return fused
+
+
+def tokamak_components(layers: int):
+    radial_build = (
+        [(LayerType.GAP, 10)]
+        + [(LayerType.SOLID, 20)] * layers
+        + [(LayerType.GAP, 60), (LayerType.PLASMA, 300), (LayerType.GAP, 60)]
+        + [(LayerType.SOLID, 20)] * layers
+    )
+    vertical_build = (
+        [(LayerType.SOLID, 20)] * layers
+        + [(LayerType.GAP, 60), (LayerType.PLASMA, 600), (LayerType.GAP, 60)]
+        + [(LayerType.SOLID, 20)] * layers
+    )
+    tasks = center_column_shield_cylinder_tasks(radial_build, 180, 700 + 40 * layers)
+    tasks += layer_tasks_from_plasma(
+        radial_build=radial_build,
+        vertical_build=vertical_build,
+        minor_radius=150,
+        major_radius=10 + 20 * layers + 60 + 150,
+        triangularity=0.55,
+        elongation=2.0,
+        rotation_angle=180,
+    )
+    return build_workplanes(tasks)
+
+
+def coil_cases(count: int):
+    return [
+        poloidal_field_coil_case(
+            coil_height=20,
+            coil_width=20,
+            casing_thickness=5,
+            center_point=(600 + 40 * index, 30 * index),
+            rotation_angle=180,
+        )
+        for index in range(count)
+    ]
+
+
+def time_fuses(label: str, workplanes):
+    fuses = {
+        "chained union": chained_union,
+        "general fuse": fuse_workplanes,
+        "general fuse, serial": functools.partial(fuse_workplanes, parallel=False),
+    }
+    for fuse_label, fuse in fuses.items():
+        start = time.perf_counter()
+        volume = fuse(workplanes).val().Volume()
+        duration = time.perf_counter() - start
+        print(f"{len(workplanes)} {label}, {fuse_label}: {duration:.3f}s, volume {volume:.6e}")
+
+
+def main(layer_counts=(2, 4, 8), coil_counts=(5, 10, 20)):
+    for layers in layer_counts:
+        time_fuses("tokamak components", tokamak_components(layers))
+    for count in coil_counts:
+        time_fuses("coil cases", coil_cases(count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Times importing paramak and the first access of a builder in new Python
+processes, and lists the slow to import libraries loaded by each.
+
+Usage: python benchmarks/benchmark_import.py [number of repeats]
+"""
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("cadquery", "OCP", "scipy")
+
+STATEMENTS = {
+    "python": "pass",
+    "import paramak": "import paramak",
+    "paramak.plasma_simplified": "import paramak; paramak.plasma_simplified",
+    "paramak.blanket_from_plasma": "import paramak; paramak.blanket_from_plasma",
+    "paramak.toroidal_field_coil_princeton_d": "import paramak; paramak.toroidal_field_coil_princeton_d",
+    "paramak.tokamak_from_plasma": "import paramak; paramak.tokamak_from_plasma",
+}
+
+
+def time_statement(statement: str) -> dict:
+    """Runs the statement in a new process, returning its duration and the
+    slow to import libraries that it loaded."""
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "duration = time.perf_counter() - start\n"
+        f"print(json.dumps([duration, [name for name in {HEAVY_MODULES!r} if name in sys.modules]]))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    duration, modules = json.loads(output)
+    return {"seconds": duration, "modules": modules}
+
+
+def main(repeat: int = 5):
+    for label, statement in STATEMENTS.items():
+        runs = [time_statement(statement) for _ in range(repeat)]
+        fastest = min(runs, key=lambda run: run["seconds"])
+        print(f"{label:<45} {fastest['seconds']:>7.3f}s  {', '.join(fastest['modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
@@ -0,0 +1,80 @@
+"""Compares the peak memory of building a reactor with toroidal field coils
+and saving it as one STEP file with Assembly.save, and of building it while
+a PartWriter writes each part to its own BREP or STEP file.
+
+Each case runs in a new Python process, which records the wall time of the
+build and export and the increase of the peak resident set size (RSS) of the
+process during them.
+
+Usage: python benchmarks/benchmark_part_writer.py [number of toroidal field coils]
+"""
+
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import paramak
+from paramak import LayerType
+
+MODES = ("save", "brep", "step")
+
+
+def build(coils: int):
+    cutters = paramak.toroidal_field_coil_rectangle(
+        horizontal_start_point=(10, 900),
+        vertical_mid_point=(1000, 0),
+        thickness=20,
+        distance=20,
+        azimuthal_placement_angles=[(index + 0.5) * 180 / coils for index in range(coils)],
+    )
+    return paramak.tokamak_from_plasma(
+        radial_build=[(LayerType.GAP, 10)]
+        + [(LayerType.SOLID, 20)] * 4
+        + [(LayerType.GAP, 50), (LayerType.PLASMA, 300), (LayerType.GAP, 60)]
+        + [(LayerType.SOLID, 20)] * 4,
+        elongation=2,
+        rotation_angle=180,
+        extra_cut_shapes=[cutters],
+    )
+
+
+def peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak_rss / 1e6 if sys.platform == "darwin" else peak_rss / 1e3
+
+
+def run_case(mode: str, coils: int):
+    paramak.cache.configure_memory_cache(max_entries=0)
+    # imports the builders first, as the cadquery import dominates the peak RSS of the process
+    paramak.tokamak_from_plasma
+    setup_rss_mb = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        if mode == "save":
+            build(coils).save(str(Path(directory) / "reactor.step"))
+        else:
+            with paramak.PartWriter(directory, file_format=mode):
+                build(coils)
+        duration = time.perf_counter() - start
+    print(f"{duration} {peak_rss_mb() - setup_rss_mb}")
+
+
+def main(coils: int = 12):
+    print(f"{'mode':<6} {'seconds':>9} {'build RSS':>10}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, str(coils), mode], capture_output=True, text=True, check=True
+        ).stdout
+        duration, rss = (float(value) for value in output.split())
+        print(f"{mode:<6} {duration:>8.2f}s {rss:>7.0f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        run_case(sys.argv[2], int(sys.argv[1]))
+    else:
+        main(*[int(argument) for argument in sys.argv[1:]])
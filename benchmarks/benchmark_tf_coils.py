@@ -0,0 +1,39 @@
+"""Compares the build time and STEP file size of toroidal field coils fused
+into one solid and placed as located instances of a single coil.
+
+Usage: python benchmarks/benchmark_tf_coils.py
+"""
+
+import os
+import tempfile
+import time
+
+from cadquery import exporters
+
+import paramak
+
+
+def main(coil_counts=(4, 8, 16)):
+    # builds every coil from scratch
+    paramak.cache.configure_memory_cache(max_entries=0)
+    with tempfile.TemporaryDirectory() as directory:
+        for count in coil_counts:
+            for instanced in (False, True):
+                start = time.perf_counter()
+                coils = paramak.toroidal_field_coil_princeton_d(
+                    r1=100,
+                    r2=900,
+                    thickness=50,
+                    distance=30,
+                    azimuthal_placement_angles=[index * 360 / count for index in range(count)],
+                    instanced=instanced,
+                )
+                duration = time.perf_counter() - start
+                filename = os.path.join(directory, "coils.step")
+                exporters.export(coils, filename)
+                label = "instanced" if instanced else "fused"
+                print(f"{count} coils, {label}: {duration:.3f}s, STEP {os.path.getsize(filename) / 1e3:.0f} kB")
+
+
+if __name__ == "__main__":
+    main()
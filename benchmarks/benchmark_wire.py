@@ -0,0 +1,80 @@
+"""Compares the time taken to make the wire of a profile with the Workplane
+spline, polyline and threePointArc methods, as create_wire_workplane_from_points
+did, and with paramak.utils.create_wire_workplane_from_arrays, which builds
+the OCC edges directly. The volumes revolved from the two wires are compared
+to check that they have the same geometry.
+
+Usage: python benchmarks/benchmark_wire.py [number of repeats]
+"""
+
+import sys
+import time
+
+import cadquery as cq
+
+import paramak
+from paramak.utils import (
+    create_wire_workplane_from_arrays,
+    create_wire_workplane_from_instructions,
+    instructions_from_points,
+)
+
+
+def create_wire_workplane_fluent(points, plane):
+    """The Workplane method version of create_wire_workplane_from_points."""
+    workplane = cq.Workplane(plane)
+    if all(entry[-1] == "straight" for entry in points):
+        return workplane.polyline([entry[:2] for entry in points[:-1]]).close()
+    if all(entry[-1] == "spline" for entry in points):
+        return workplane.spline([entry[:2] for entry in points[:-1]], makeWire=True, tol=1e-1, periodic=True)
+    return create_wire_workplane_from_instructions(instructions=instructions_from_points(points), workplane=workplane)
+
+
+PROFILES = {
+    f"plasma_simplified[num_points={num_points}]": paramak.plasma_simplified_profile(num_points=num_points)
+    for num_points in (50, 200, 800)
+}
+PROFILES.update(
+    {
+        f"blanket_from_plasma[num_points={num_points}]": paramak.blanket_from_plasma_profile(
+            thickness=20, start_angle=-90, stop_angle=260, num_points=num_points
+        )
+        for num_points in (50, 200, 800)
+    }
+)
+PROFILES["blanket_constant_thickness_arc_h"] = paramak.blanket_constant_thickness_arc_h_profile(
+    inner_mid_point=(500, 0), inner_upper_point=(400, 300), inner_lower_point=(400, -300), thickness=20
+)
+PROFILES["poloidal_field_coil"] = paramak.poloidal_field_coil_profile(height=30, width=30, center_point=(750, 200))
+PROFILES["toroidal_field_coil_princeton_d"] = paramak.toroidal_field_coil_princeton_d_profile(
+    r1=100, r2=900, thickness=50, vertical_displacement=0
+)[0]
+
+
+def best_time(function, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(repeats: int = 20):
+    print(f"{'profile':<45} {'fluent':>10} {'arrays':>10} {'speedup':>8} {'volume difference':>18}")
+    for name, profile in PROFILES.items():
+        points = profile.to_points()
+        fluent = best_time(lambda: create_wire_workplane_fluent(points, "XZ"), repeats)
+        arrays = best_time(
+            lambda: create_wire_workplane_from_arrays(profile.points, profile.connections, "XZ"), repeats
+        )
+
+        fluent_volume = create_wire_workplane_fluent(points, "XZ").revolve(90).val().Volume()
+        arrays_wire = create_wire_workplane_from_arrays(profile.points, profile.connections, "XZ")
+        arrays_volume = arrays_wire.revolve(90).val().Volume()
+        difference = abs(arrays_volume - fluent_volume) / fluent_volume
+        print(f"{name:<45} {fluent * 1e3:>8.2f}ms {arrays * 1e3:>8.2f}ms {fluent / arrays:>7.1f}x {difference:>18.1e}")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
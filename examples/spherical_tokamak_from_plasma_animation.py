@@ -21,6 +21,8 @@ original_triangularity = 0.55
 original_n_tf_coils = 8
 original_coil_height_factor = 1
 original_divertor_thickness = 50
+# "preview" builds coarse frames quickly while iterating on the animation, "full" renders the final frames
+fidelity = "full"
 
 # Function to create a reactor with modified radial build
 def create_reactor(
@@ -110,14 +112,17 @@ def create_reactor(
             "extra_intersect_shapes": (0.1, 0.1, 0.4), # divertor lower
             
         },
+        fidelity=fidelity,
         extra_cut_shapes=coils,
         extra_intersect_shapes=[divertor_lower]
     )
 
 # Function to export reactor to PNG
 def export_reactor_to_png(reactor, file_path):
+    # labels the frames of a preview reactor so that they are not mistaken for the final frames
+    label = "Paramak preview" if reactor.fidelity == "preview" else "Paramak"
     reactor.add(
-        cq.Workplane('XZ').text("Paramak", fontsize=200, distance=10
+        cq.Workplane('XZ').text(label, fontsize=200, distance=10
     ).translate((0, 0, -615)))
     reactor.exportPNG(
         options={
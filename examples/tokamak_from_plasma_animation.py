@@ -25,6 +25,8 @@ original_rotation_angle=180
 original_n_tf_coils = 8
 original_coil_height_factor = 1
 original_divertor_thickness = 55
+# "preview" builds coarse frames quickly while iterating on the animation, "full" renders the final frames
+fidelity = "full"
 
 # Function to create a reactor with modified radial build
 def create_reactor(
@@ -116,14 +118,17 @@ def create_reactor(
             "extra_intersect_shapes": (0.1, 0.1, 0.4), # divertor lower
             
         },
+        fidelity=fidelity,
         extra_cut_shapes=coils,
         extra_intersect_shapes=[divertor]
     )
 
 # Function to export reactor to PNG
 def export_reactor_to_png(reactor, file_path):
+    # labels the frames of a preview reactor so that they are not mistaken for the final frames
+    label = "Paramak preview" if reactor.fidelity == "preview" else "Paramak"
     reactor.add(
-        cq.Workplane('XZ').text("Paramak", fontsize=200, distance=10
+        cq.Workplane('XZ').text(label, fontsize=200, distance=10
     ).translate((0, 0, -1215)))
     reactor.exportPNG(
         options={
@@ -0,0 +1,54 @@
+import paramak
+
+base = dict(
+    radial_build=[
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 30),
+        (paramak.LayerType.SOLID, 50),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 20),
+        (paramak.LayerType.SOLID, 120),
+    ],
+    elongation=2,
+    triangularity=0.55,
+    rotation_angle=180,
+)
+
+
+def add_tf_coils(kwargs):
+    """Turns the tf_coil_count parameter into toroidal field coils cut from the reactor."""
+    kwargs = dict(kwargs)
+    count = kwargs.pop("tf_coil_count")
+    kwargs["extra_cut_shapes"] = [
+        paramak.toroidal_field_coil_rectangle(
+            horizontal_start_point=(10, 900),
+            vertical_mid_point=(1000, 0),
+            thickness=20,
+            distance=30,
+            azimuthal_placement_angles=[(index + 0.5) * 180 / count for index in range(count)],
+        )
+    ]
+    return kwargs
+
+
+# every combination of the blanket thickness, triangularity and number of coils
+points = paramak.parameter_grid(
+    triangularity=[0.3, 0.55],
+    tf_coil_count=[4, 8],
+    **{"radial_build[7]": [80, 120, 160]},
+)
+
+if __name__ == "__main__":
+    # running the script again after an interruption only builds the missing points
+    results = paramak.run_sweep(
+        paramak.tokamak_from_plasma,
+        base,
+        points,
+        directory="tokamak_sweep",
+        timeout=600,
+        configure=add_tf_coils,
+    )
+    for result in results:
+        print(result["status"], result["parameters"], result["volumes"].get("layer_2"))
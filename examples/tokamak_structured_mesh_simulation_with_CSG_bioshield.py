@@ -70,10 +70,10 @@ my_reactor = my_reactor.remove(name="plasma")
 # knowing the material tags to use in the simulation
 print(my_reactor.names())
 
-material_tags = ["layer_1", "layer_2", "layer_3", "layer_4", "layer_5"]
+# the material tag of each solid in order, which is the name of its layer
+material_tags = my_reactor.material_tags()
 my_model = CadToDagmc()
 
-# 6 material tags as inner and outer layers are one solid there are only 6 solids in model and plasma has been removed
 my_model.add_cadquery_object(cadquery_object=my_reactor, material_tags=material_tags)
 
 script_folder = Path(__file__).resolve().parent
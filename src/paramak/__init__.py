@@ -1,24 +1,109 @@
+import importlib
+import typing
 from importlib.metadata import version
 
-from .assemblies.spherical_tokamak import spherical_tokamak, spherical_tokamak_from_plasma
-from .assemblies.tokamak import tokamak, tokamak_from_plasma
+# the builders are imported when first accessed, so that importing paramak
+# does not import cadquery and scipy, which take seconds to import
+_LAZY_ATTRIBUTES = {
+    "spherical_tokamak": ".assemblies.spherical_tokamak",
+    "spherical_tokamak_from_plasma": ".assemblies.spherical_tokamak",
+    "tokamak": ".assemblies.tokamak",
+    "tokamak_from_plasma": ".assemblies.tokamak",
+    "ReactorBuilder": ".assemblies.reactor_builder",
+    "PartWriter": ".assemblies.part_writer",
+    "blanket_constant_thickness_arc_h": ".workplanes.blanket_constant_thickness_arc_h",
+    "blanket_from_plasma": ".workplanes.blanket_from_plasma",
+    "center_column_shield_cylinder": ".workplanes.center_column_shield_cylinder",
+    "constant_thickness_dome": ".workplanes.constant_thickness_dome",
+    "cutting_wedge": ".workplanes.cutting_wedge",
+    "dished_vacuum_vessel": ".workplanes.dished_vacuum_vessel",
+    "plasma_simplified": ".workplanes.plasma_simplified",
+    "poloidal_field_coil": ".workplanes.poloidal_field_coil",
+    "poloidal_field_coil_case": ".workplanes.poloidal_field_coil_case",
+    "toroidal_field_coil_rectangle": ".workplanes.toroidal_field_coil_rectangle",
+    "u_shaped_dome": ".workplanes.u_shaped_dome",
+    "toroidal_field_coil_princeton_d": ".workplanes.toroidal_field_coil_princeton_d",
+    # the 2D profiles of the builders, computed without OCC
+    "blanket_constant_thickness_arc_h_profile": ".workplanes.blanket_constant_thickness_arc_h",
+    "blanket_from_plasma_profile": ".workplanes.blanket_from_plasma",
+    "center_column_shield_cylinder_profile": ".workplanes.center_column_shield_cylinder",
+    "constant_thickness_dome_profile": ".workplanes.constant_thickness_dome",
+    "dished_vacuum_vessel_profile": ".workplanes.dished_vacuum_vessel",
+    "plasma_simplified_profile": ".workplanes.plasma_simplified",
+    "poloidal_field_coil_profile": ".workplanes.poloidal_field_coil",
+    "poloidal_field_coil_case_profile": ".workplanes.poloidal_field_coil_case",
+    "toroidal_field_coil_rectangle_profile": ".workplanes.toroidal_field_coil_rectangle",
+    "u_shaped_dome_profile": ".workplanes.u_shaped_dome",
+    "toroidal_field_coil_princeton_d_profile": ".workplanes.toroidal_field_coil_princeton_d",
+    "LayerType": ".utils",
+    "Profile": ".utils",
+    # volumes and areas of the revolved and extruded profiles from Pappus' theorem
+    "extruded_surface_area": ".volumes",
+    "extruded_volume": ".volumes",
+    "revolved_surface_area": ".volumes",
+    "revolved_volume": ".volumes",
+    "load_results": ".sweep",
+    "parameter_grid": ".sweep",
+    "random_parameters": ".sweep",
+    "run_sweep": ".sweep",
+    "assembly_to_csg": ".csg",
+}
+_LAZY_SUBMODULES = {"assemblies", "cache", "csg", "sweep", "timing", "utils", "volumes", "workplanes"}
 
-from .workplanes.blanket_constant_thickness_arc_h import blanket_constant_thickness_arc_h
-from .workplanes.blanket_from_plasma import blanket_from_plasma
-from .workplanes.center_column_shield_cylinder import center_column_shield_cylinder
-from .workplanes.constant_thickness_dome import constant_thickness_dome
-from .workplanes.cutting_wedge import cutting_wedge
-from .workplanes.dished_vacuum_vessel import dished_vacuum_vessel
-from .workplanes.plasma_simplified import plasma_simplified
-from .workplanes.poloidal_field_coil import poloidal_field_coil
-from .workplanes.poloidal_field_coil_case import poloidal_field_coil_case
-from .workplanes.toroidal_field_coil_rectangle import toroidal_field_coil_rectangle
-from .workplanes.u_shaped_dome import u_shaped_dome
-from .workplanes.toroidal_field_coil_princeton_d import toroidal_field_coil_princeton_d
+if typing.TYPE_CHECKING:
+    from . import assemblies, cache, csg, sweep, timing, utils, volumes, workplanes
+    from .assemblies.spherical_tokamak import spherical_tokamak, spherical_tokamak_from_plasma
+    from .assemblies.tokamak import tokamak, tokamak_from_plasma
+    from .assemblies.reactor_builder import ReactorBuilder
+    from .assemblies.part_writer import PartWriter
 
-from .utils import LayerType
+    from .workplanes.blanket_constant_thickness_arc_h import (
+        blanket_constant_thickness_arc_h,
+        blanket_constant_thickness_arc_h_profile,
+    )
+    from .workplanes.blanket_from_plasma import blanket_from_plasma, blanket_from_plasma_profile
+    from .workplanes.center_column_shield_cylinder import (
+        center_column_shield_cylinder,
+        center_column_shield_cylinder_profile,
+    )
+    from .workplanes.constant_thickness_dome import constant_thickness_dome, constant_thickness_dome_profile
+    from .workplanes.cutting_wedge import cutting_wedge
+    from .workplanes.dished_vacuum_vessel import dished_vacuum_vessel, dished_vacuum_vessel_profile
+    from .workplanes.plasma_simplified import plasma_simplified, plasma_simplified_profile
+    from .workplanes.poloidal_field_coil import poloidal_field_coil, poloidal_field_coil_profile
+    from .workplanes.poloidal_field_coil_case import poloidal_field_coil_case, poloidal_field_coil_case_profile
+    from .workplanes.toroidal_field_coil_rectangle import (
+        toroidal_field_coil_rectangle,
+        toroidal_field_coil_rectangle_profile,
+    )
+    from .workplanes.u_shaped_dome import u_shaped_dome, u_shaped_dome_profile
+    from .workplanes.toroidal_field_coil_princeton_d import (
+        toroidal_field_coil_princeton_d,
+        toroidal_field_coil_princeton_d_profile,
+    )
+
+    from .csg import assembly_to_csg
+    from .sweep import load_results, parameter_grid, random_parameters, run_sweep
+    from .utils import LayerType, Profile
+    from .volumes import extruded_surface_area, extruded_volume, revolved_surface_area, revolved_volume
 
 __version__ = version("paramak")
 
 
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # later accesses find the attribute without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
+
+
 __all__ = ["__version__"]
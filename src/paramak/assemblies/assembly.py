@@ -1,8 +1,51 @@
 # Creates an assembly class that inherits from cadquery's assembly class
-# and adds a few conveniences methods remove() and names()
+# and adds a few conveniences methods to find, remove, rename and replace
+# parts by name, and names()
 
+import io
+import json
+import os
+import struct
+import tempfile
+import typing
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import cadquery as cq
+from cadquery.assembly import PATH_DELIM
+from OCP.BRepTools import BRepTools
+
+from ..timing import timed
+from ..utils import workplane_from_bytes, workplane_from_compound
+from ..volumes import shape_volume, workplane_volume
+from .part_writer import MANIFEST_FILENAME, active_part_writer
+
+
+# the size of the header and of each triangle of a binary STL file
+_STL_HEADER_SIZE = 80
+_STL_TRIANGLE_SIZE = 50
+
+
+def _export_stl(brep: bytes, filename: str, tolerance: float, angular_tolerance: float, parallel: bool) -> str:
+    """Tessellates a shape serialised as binary BREP and writes it to a binary
+    STL file. Runs in the worker processes of Assembly.export_meshes."""
+    shape = cq.Shape.importBin(io.BytesIO(brep))
+    # the BREP includes the triangles of any earlier export, which OCC keeps if they are finer
+    BRepTools.Clean_s(shape.wrapped)
+    shape.exportStl(filename, tolerance, angular_tolerance, relative=False, parallel=parallel)
+    return filename
+
+
+def _combine_stl_files(filenames: typing.Sequence[str], filename: str):
+    """Joins binary STL files into one binary STL file."""
+    contents = [Path(name).read_bytes() for name in filenames]
+    count = sum(struct.unpack("<I", content[_STL_HEADER_SIZE : _STL_HEADER_SIZE + 4])[0] for content in contents)
+    with open(filename, "wb") as file:
+        file.write(b"paramak".ljust(_STL_HEADER_SIZE, b" "))
+        file.write(struct.pack("<I", count))
+        for content in contents:
+            file.write(content[_STL_HEADER_SIZE + 4 :])
 
 
 class Assembly(cq.Assembly):
@@ -12,26 +55,311 @@ class Assembly(cq.Assembly):
     triangularity=None
     major_radius=None
     minor_radius=None
+    # the TimingReport of the build that made the assembly
+    timings=None
+    # "preview" for the coarse assemblies of the reactor functions with fidelity="preview"
+    fidelity="full"
+
+    def add(self, *args, **kwargs):
+        """Adds a subassembly or object as cq.Assembly.add does, timed as the
+        assembly_add stage of the build. While a PartWriter is active the
+        object is written to its file instead of being kept, see PartWriter."""
+        with timed("assembly_add"):
+            writer = active_part_writer.get()
+            if writer is None or not args or isinstance(args[0], cq.Assembly):
+                return super().add(*args, **kwargs)
+            # the object, location, name and color are in the order of the Assembly arguments
+            part = self.__class__(*args, **kwargs)
+            writer.write(part)
+            return super().add(part)
+
+    @classmethod
+    def from_parts(cls, directory: typing.Union[str, Path]) -> "Assembly":
+        """Loads the parts written by a PartWriter into an Assembly, in the
+        order they were written, with the reactor attributes of the manifest.
+
+        Args:
+            directory: the directory of the part files and their manifest.
+        """
+        directory = Path(directory)
+        manifest = json.loads((directory / MANIFEST_FILENAME).read_text())
+        assembly = cls()
+        for entry in manifest["parts"]:
+            path = directory / entry["file"]
+            if manifest["file_format"] == "brep":
+                workplane = workplane_from_bytes(path.read_bytes(), entry["workplane"])
+            else:
+                compound = cq.Compound.makeCompound(cq.importers.importStep(str(path)).vals())
+                workplane = workplane_from_compound(compound, entry["workplane"])
+            (x, y, z), (rx, ry, rz) = entry["location"]
+            assembly.add(
+                workplane,
+                name=entry["name"],
+                loc=cq.Location(x, y, z, rx, ry, rz),
+                color=cq.Color(*entry["color"]) if entry["color"] is not None else None,
+                metadata=entry["metadata"],
+            )
+        for attribute, value in manifest.get("attributes", {}).items():
+            setattr(assembly, attribute, value)
+        return assembly
+
+    def _copy(self) -> "Assembly":
+        """Copies the assembly tree, sharing the part objects, with the reactor
+        attributes of the assembly."""
+        copy = super()._copy()
+        for attribute in ("elongation", "triangularity", "major_radius", "minor_radius", "timings", "fidelity"):
+            setattr(copy, attribute, getattr(self, attribute))
+        return copy
+
+    def _find(self, name: str) -> "Assembly":
+        """Finds a part or subassembly below this assembly by its name or its
+        path, using the objects dictionary that indexes the children by path."""
+        child = self.objects.get(name)
+        if child is not None and child is not self:
+            return child
+        # a part of a subassembly is indexed by its path
+        for path, child in self.objects.items():
+            if path.endswith(f"{PATH_DELIM}{name}"):
+                return child
+        raise KeyError(f"Part with name {name} not found")
+
+    @staticmethod
+    def _indexes(child: "Assembly"):
+        """Yields the child's parent and each of its ancestors, whose objects
+        dictionaries index the child and its descendants, with the path prefix
+        of their keys."""
+        prefix = []
+        node = child.parent
+        while node is not None:
+            yield node, prefix
+            prefix = [node.name] + prefix
+            node = node.parent
+
+    @staticmethod
+    def _unindex(child: "Assembly", owners):
+        paths = list(child._flatten())
+        for owner, prefix in owners:
+            for path in paths:
+                owner.objects.pop(PATH_DELIM.join(prefix + [path]), None)
+
+    def get(self, name: str) -> "Assembly":
+        """Returns the part or subassembly with the name. The part's Workplane
+        or Shape is its obj attribute.
+
+        Args:
+            name: the name of the part, or its path such as "subassembly/part".
+
+        Raises:
+            KeyError: if there is no part with the name.
+        """
+        return self._find(name)
+
+    def remove(self, name: str, inplace: bool = False) -> "Assembly":
+        """Removes a part or subassembly by name. A warning is raised if there
+        is no part with the name.
+
+        Args:
+            name: the name of the part, or its path such as "subassembly/part".
+            inplace: removes the part from this assembly instead of from a
+                copy of it. Only the child list and the objects indexes of
+                the parent and ancestors of the part are updated.
+
+        Returns:
+            the assembly without the part, a copy that shares the part
+            objects and reactor attributes of this assembly unless inplace.
+        """
+        assembly = self if inplace else self._copy()
+        try:
+            child = assembly._find(name)
+        except KeyError:
+            warnings.warn(f"Part with name {name} not found")
+            return assembly
 
-    def remove(self, name: str):
-        new_assembly = Assembly()
-        part_found = False
-        for part in self:
-            if part[1].endswith(f'/{name}'):
-                part_found = True
+        child.parent.children.remove(child)
+        self._unindex(child, self._indexes(child))
+        child.parent = None
+        return assembly
+
+    def rename(self, name: str, new_name: str) -> "Assembly":
+        """Renames a part or subassembly in place.
+
+        Args:
+            name: the name of the part, or its path such as "subassembly/part".
+            new_name: the new name, which must be unique among the parts of
+                the same parent.
+
+        Returns:
+            this assembly.
+        """
+        child = self._find(name)
+        if new_name in child.parent.objects:
+            raise ValueError(f"Unique name is required. {new_name} is already in the assembly")
+
+        # the child indexes itself and its descendants like its parent does
+        owners = [(child, [])] + list(self._indexes(child))
+        self._unindex(child, owners)
+        child.name = new_name
+        paths = child._flatten()
+        for owner, prefix in owners:
+            owner.objects.update({PATH_DELIM.join(prefix + [path]): node for path, node in paths.items()})
+        return self
+
+    def replace(
+        self,
+        name: str,
+        obj: typing.Union[cq.Workplane, cq.Shape],
+        loc: typing.Optional[cq.Location] = None,
+        color: typing.Optional[cq.Color] = None,
+    ) -> "Assembly":
+        """Replaces the Workplane or Shape of a part in place, keeping its name,
+        position in the assembly, metadata and, unless given, its location and
+        color.
+
+        Args:
+            name: the name of the part, or its path such as "subassembly/part".
+            obj: the new Workplane or Shape of the part.
+            loc: the new location of the part.
+            color: the new color of the part.
+
+        Returns:
+            this assembly.
+        """
+        child = self._find(name)
+        child.obj = obj
+        if loc is not None:
+            child.loc = loc
+        if color is not None:
+            child.color = color
+        return self
+
+    def _parts(self):
+        # the assemblies with an object in the order cq.Assembly.__iter__ yields them
+        if self.obj:
+            yield self
+        for child in self.children:
+            yield from child._parts()
+
+    def names(self) -> typing.List[str]:
+        """Returns the names of the parts in the order they were added."""
+        return [part.name for part in self._parts()]
+
+    def _part_solid_counts(self) -> typing.List[typing.Tuple["Assembly", int]]:
+        counts = []
+        for part in self._parts():
+            shapes = part.obj.vals() if isinstance(part.obj, cq.Workplane) else [part.obj]
+            counts.append((part, sum(len(shape.Solids()) for shape in shapes if isinstance(shape, cq.Shape))))
+        return counts
+
+    def solid_names(self) -> typing.List[str]:
+        """Returns the name of the part of each solid, in the order of the
+        solids of toCompound() that cad_to_dagmc and other exporters follow.
+        A layer split into several solids by the extra_cut_shapes, such as
+        toroidal field coils, has one entry for each of its solids."""
+        return [part.name for part, count in self._part_solid_counts() for _ in range(count)]
+
+    def material_tags(self, tags: typing.Optional[typing.Dict[str, str]] = None) -> typing.List[str]:
+        """Returns the material tag of each solid, in the order of the solids
+        of toCompound(), for example for
+        CadToDagmc.add_cadquery_object(assembly, material_tags=assembly.material_tags()).
+
+        Args:
+            tags: the material tag of the parts by name. Parts not in tags use
+                the "material_tag" entry of their metadata if it has one,
+                otherwise their name.
+        """
+        tags = tags or {}
+        material_tags = []
+        for part, count in self._part_solid_counts():
+            material_tags.extend([self._material_tag(part, tags)] * count)
+        return material_tags
+
+    @staticmethod
+    def _material_tag(part: "Assembly", tags: typing.Dict[str, str]) -> str:
+        return tags.get(part.name, part.metadata.get("material_tag", part.name))
+
+    def volumes(self, cross_check_tolerance: typing.Optional[float] = None) -> typing.Dict[str, float]:
+        """Returns the volume of each part by name. Parts revolved from a 2D
+        profile use Pappus' theorem on the profile, which is much faster than
+        integrating the 3D shape, and the other parts are integrated by OCC.
+
+        Args:
+            cross_check_tolerance: if set, the volumes from the profiles are
+                also integrated by OCC and a ValueError is raised when the two
+                differ by more than this fraction.
+        """
+        volumes = {}
+        for name, child in self.objects.items():
+            if isinstance(child.obj, cq.Workplane):
+                volumes[name] = workplane_volume(child.obj, cross_check_tolerance=cross_check_tolerance)
+            elif isinstance(child.obj, cq.Shape):
+                volumes[name] = shape_volume(child.obj)
+        return volumes
+
+    @timed("export_meshes")
+    def export_meshes(
+        self,
+        directory: typing.Union[str, Path] = ".",
+        tolerance: float = 0.1,
+        angular_tolerance: float = 0.1,
+        part_tolerances: typing.Optional[typing.Dict[str, typing.Tuple[float, float]]] = None,
+        workers: typing.Optional[int] = None,
+        filename: typing.Optional[typing.Union[str, Path]] = None,
+    ) -> typing.Dict[str, str]:
+        """Tessellates each part and writes it to a binary STL file named after
+        the part, such as plasma.stl. The parts are tessellated concurrently
+        in a process pool, as each part is meshed independently.
+
+        Args:
+            directory: the directory of the STL files.
+            tolerance: the largest distance (cm) between the surfaces and the
+                triangles of the parts.
+            angular_tolerance: the largest angle (radians) between the
+                triangles along a curve.
+            part_tolerances: the (tolerance, angular_tolerance) of the parts
+                that need a different resolution by name, such as
+                {"plasma": (1, 0.5), "layer_1": (0.01, 0.05)}.
+            workers: the number of worker processes, at most the number of
+                CPUs. None and 1 tessellate the parts one after another in
+                this process.
+            filename: writes a single STL file in the directory with this
+                name combining every part, instead of one file per part.
+
+        Returns:
+            the STL filename of each part by name, or the filename for every
+            part when the parts are combined.
+        """
+        part_tolerances = part_tolerances or {}
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        workers = min(workers or 1, os.cpu_count() or 1)
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            output_directory = directory if filename is None else Path(temporary_directory)
+            tasks = {}
+            for shape, path, location, _ in self:
+                name = path.split(PATH_DELIM)[-1]
+                if name in tasks:
+                    raise ValueError(f"The STL files are named after the parts, so {name} should be unique")
+                tolerances = part_tolerances.get(name, (tolerance, angular_tolerance))
+                tasks[name] = (shape.moved(location), str(output_directory / f"{name}.stl"), *tolerances)
+
+            if workers <= 1 or len(tasks) <= 1:
+                for shape, stl_filename, *tolerances in tasks.values():
+                    # a copy without the triangles of the part, which OCC would reuse if they are finer,
+                    # so the triangles of this export are not stored on the part either
+                    shape.copy().exportStl(stl_filename, *tolerances, relative=False)
             else:
-                new_assembly.add(part[0], name=part[1], color=part[3], loc=part[2])
-        if not part_found:
-            warnings.warn(f'Part with name {name} not found')
-
-        new_assembly.elongation = self.elongation
-        new_assembly.triangularity = self.triangularity
-        new_assembly.major_radius = self.major_radius
-        new_assembly.minor_radius = self.minor_radius
-        return new_assembly
-
-    def names(self):
-        names = []
-        for part in self:
-            names.append(part[1].split('/')[-1])
-        return names
+                with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                    futures = []
+                    for shape, stl_filename, *tolerances in tasks.values():
+                        brep = io.BytesIO()
+                        shape.exportBin(brep)
+                        futures.append(executor.submit(_export_stl, brep.getvalue(), stl_filename, *tolerances, False))
+                    for future in futures:
+                        future.result()
+
+            filenames = {name: task[1] for name, task in tasks.items()}
+            if filename is None:
+                return filenames
+            _combine_stl_files(list(filenames.values()), directory / filename)
+            return {name: str(directory / filename) for name in filenames}
@@ -0,0 +1,119 @@
+# Writes the parts of a reactor to a directory of per-part files as the
+# reactor functions add them to their Assembly, so that a build exports its
+# parts without the Assembly or a STEP document holding every part at once.
+
+import json
+import typing
+from contextvars import ContextVar
+from pathlib import Path
+
+import cadquery as cq
+
+from ..timing import timed
+from ..utils import workplane_metadata, workplane_to_bytes
+
+# the name of the file listing the parts written to a directory
+MANIFEST_FILENAME = "manifest.json"
+
+FILE_FORMATS = ("brep", "step")
+
+# the attributes of the reactor assemblies stored in the manifest
+REACTOR_ATTRIBUTES = ("elongation", "triangularity", "major_radius", "minor_radius", "fidelity")
+
+
+class PartWriter:
+    """Writes each part added to an Assembly while the writer is active to
+    its own file, named after the part, and lists the parts in a
+    manifest.json file. The Assembly keeps the name, location, color and
+    metadata of each part, with the filename in the "file" entry of the
+    metadata, but not its object.
+
+    The reactor functions, such as tokamak_from_plasma, write each component
+    and release it as soon as it is cut, building at most workers components
+    at a time. They return the manifest, which includes reactor attributes
+    such as the elongation, instead of an Assembly. Use Assembly.from_parts
+    to load the parts back into an Assembly.
+
+    Args:
+        directory: the directory of the part files and the manifest.
+        file_format: "brep", which round trips the geometry exactly along
+            with the profiles of revolved parts, or "step".
+
+    Example:
+        with paramak.PartWriter("reactor_parts"):
+            manifest = paramak.tokamak_from_plasma(radial_build=radial_build)
+        reactor = paramak.assemblies.assembly.Assembly.from_parts("reactor_parts")
+    """
+
+    def __init__(self, directory: typing.Union[str, Path], file_format: str = "brep"):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"file_format should be one of {FILE_FORMATS}, not {file_format!r}")
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.parts: typing.List[dict] = []
+        self.attributes: dict = {}
+        self._tokens = []
+
+    def __enter__(self) -> "PartWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.parts = []
+        self.attributes = {}
+        self._write_manifest()
+        self._tokens.append(active_part_writer.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        active_part_writer.reset(self._tokens.pop())
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_FILENAME
+
+    def write(self, part: cq.Assembly):
+        """Writes the object of a part to its file and lists the part in the
+        manifest, then removes the object from the part."""
+        with timed("write_part"):
+            workplane = part.obj if isinstance(part.obj, cq.Workplane) else cq.Workplane("XY", obj=part.obj)
+            filename = f"{part.name}.{self.file_format}"
+            if self.file_format == "brep":
+                brep, metadata = workplane_to_bytes(workplane)
+                (self.directory / filename).write_bytes(brep)
+            else:
+                cq.Compound.makeCompound(workplane.vals()).exportStep(str(self.directory / filename))
+                metadata = workplane_metadata(workplane)
+
+            self.parts.append(
+                {
+                    "name": part.name,
+                    "file": filename,
+                    "location": part.loc.toTuple(),
+                    "color": list(part.color.toTuple()) if part.color is not None else None,
+                    "metadata": part.metadata,
+                    "solids": sum(len(shape.Solids()) for shape in workplane.vals() if isinstance(shape, cq.Shape)),
+                    "workplane": metadata,
+                }
+            )
+            # the manifest is rewritten after each part so that it lists the parts of an interrupted build
+            self._write_manifest()
+
+            part.metadata = {**part.metadata, "file": str(self.directory / filename)}
+            part.obj = None
+
+    def finish(self, assembly: cq.Assembly) -> dict:
+        """Adds the reactor attributes of the assembly, whose parts have been
+        written, to the manifest and returns the manifest."""
+        self.attributes = {attribute: getattr(assembly, attribute) for attribute in REACTOR_ATTRIBUTES}
+        self._write_manifest()
+        return self.manifest
+
+    @property
+    def manifest(self) -> dict:
+        """The content of the manifest.json file."""
+        return {"file_format": self.file_format, "parts": self.parts, "attributes": self.attributes}
+
+    def _write_manifest(self):
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=2))
+
+
+# the PartWriter that Assembly.add writes the parts to, set while a writer is active
+active_part_writer: ContextVar[typing.Optional[PartWriter]] = ContextVar("paramak_part_writer", default=None)
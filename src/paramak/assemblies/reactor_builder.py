@@ -0,0 +1,143 @@
+# Creates a reactor builder object that keeps the components of its last
+# build so that changing one argument, such as a thickness of the radial
+# build, only regenerates the components that the change moves.
+
+import hashlib
+import typing
+from contextvars import ContextVar
+
+import numpy as np
+from cadquery import Shape, Workplane
+
+from ..cache import UncacheableArgument, builder_key
+from .assembly import Assembly
+
+
+class ComponentStore:
+    """The components made by build_workplanes and cut_workplanes of
+    paramak.utils during a reactor build, keyed on the builder and arguments
+    of their task or on the component and tools of their cut. While a store
+    is active the next build reuses the components of the previous build
+    whose keys are unchanged and only regenerates the others. Used by
+    ReactorBuilder.
+
+    Attributes:
+        rebuilt: the names of the components built or cut by the last build,
+            with "/cut" appended for cuts.
+        reused: the names of the components taken from the previous build.
+    """
+
+    def __init__(self):
+        self.previous: typing.Dict[str, Workplane] = {}
+        self.current: typing.Dict[str, Workplane] = {}
+        # the key and name of each component of the current build by object id
+        self.components: typing.Dict[int, typing.Tuple[str, str]] = {}
+        self.rebuilt: typing.List[str] = []
+        self.reused: typing.List[str] = []
+
+    def start(self):
+        self.current = {}
+        self.components = {}
+        self.rebuilt = []
+        self.reused = []
+
+    def finish(self, succeeded: bool):
+        # a failed build keeps the components of the previous build as well
+        self.previous = self.current if succeeded else {**self.previous, **self.current}
+
+    def find(self, key: typing.Optional[str], name: str) -> typing.Optional[Workplane]:
+        workplane = self.current.get(key, self.previous.get(key)) if key is not None else None
+        if workplane is not None:
+            self.keep(key, name, workplane)
+            self.reused.append(name)
+        return workplane
+
+    def keep(self, key: typing.Optional[str], name: str, workplane: Workplane):
+        if key is not None:
+            self.current[key] = workplane
+            self.components[id(workplane)] = (key, name)
+
+    def task_key(self, builder: typing.Callable, kwargs: dict) -> typing.Optional[str]:
+        try:
+            return builder_key(builder, (), kwargs)
+        except UncacheableArgument:
+            return None
+
+    def cut_key(self, workplane: Workplane, tools: typing.Sequence[Shape], clean: bool) -> typing.Optional[str]:
+        if id(workplane) not in self.components:
+            return None
+        content = hashlib.sha256(f"{self.components[id(workplane)][0]}/{clean}".encode())
+        for tool in tools:
+            # the BREP of a tool is not used as booleans add data to the tools
+            # that they cut, so the tools are identified by their geometry
+            vertices = np.array([vertex.toTuple() for vertex in tool.Vertices()])
+            content.update(np.round(vertices, 6).tobytes())
+            content.update(f"/{len(tool.Faces())}/{tool.Volume():.9e}/{tool.Area():.9e}".encode())
+        return content.hexdigest()
+
+
+# the store of the ReactorBuilder running a build, if any
+active_component_store: ContextVar[typing.Optional[ComponentStore]] = ContextVar(
+    "paramak_component_store", default=None
+)
+
+
+class ReactorBuilder:
+    """Builds reactors with one of the reactor functions, such as
+    tokamak_from_plasma, remembering the arguments and components of the
+    previous build.
+
+    The plasma, center column cylinders and blanket layers are each built
+    from a task of a builder function and its arguments, which include the
+    cumulative offsets of the layer in the radial and vertical builds. A
+    build only regenerates the components whose task arguments changed, for
+    example the layers at or outside a changed outer radial build entry, and
+    reuses the other components, and their cuts by unchanged extra shapes,
+    from the previous build. Consecutive reactors share the Workplanes of the
+    reused components.
+
+    Args:
+        reactor_function: the function that builds the reactor Assembly, such
+            as paramak.tokamak or paramak.spherical_tokamak_from_plasma.
+        kwargs: the arguments of the reactor function.
+
+    Example:
+        builder = paramak.ReactorBuilder(paramak.tokamak_from_plasma, radial_build=radial_build)
+        reactor = builder.build()
+        radial_build[-1] = (paramak.LayerType.SOLID, 60)
+        reactor = builder.build(radial_build=radial_build)  # only rebuilds the outer layer
+    """
+
+    def __init__(self, reactor_function: typing.Callable[..., Assembly], **kwargs):
+        self.reactor_function = reactor_function
+        self.arguments = kwargs
+        self.reactor: typing.Optional[Assembly] = None
+        self._store = ComponentStore()
+
+    def build(self, **changes) -> Assembly:
+        """Builds the reactor with the arguments of the previous build updated
+        with the changes."""
+        arguments = {**self.arguments, **changes}
+        self._store.start()
+        token = active_component_store.set(self._store)
+        succeeded = False
+        try:
+            reactor = self.reactor_function(**arguments)
+            succeeded = True
+        finally:
+            active_component_store.reset(token)
+            self._store.finish(succeeded)
+        self.arguments = arguments
+        self.reactor = reactor
+        return reactor
+
+    @property
+    def rebuilt(self) -> typing.List[str]:
+        """The names of the components regenerated by the last build, with
+        "/cut" appended for the cuts of extra_cut_shapes."""
+        return list(self._store.rebuilt)
+
+    @property
+    def reused(self) -> typing.List[str]:
+        """The names of the components reused from the previous build."""
+        return list(self._store.reused)
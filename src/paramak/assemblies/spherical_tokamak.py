@@ -2,24 +2,56 @@ from typing import Optional, Sequence, Tuple, Union
 
 import cadquery as cq
 from .assembly import Assembly
+from .part_writer import active_part_writer
 
+from ..timing import record_timings, timed
 from ..utils import (
+    build_workplanes,
+    cut_workplanes,
     get_plasma_index,
     get_plasma_value,
+    is_preview,
+    PREVIEW_NUM_POINTS,
     sum_up_to_gap_before_plasma,
     sum_up_to_plasma,
     sum_before_after_plasma,
     LayerType,
 )
-from ..workplanes.blanket_from_plasma import blanket_from_plasma
+from ..workplanes.blanket_from_plasma import blanket_from_points, find_layer_points, points_from_layer_points
 from ..workplanes.center_column_shield_cylinder import center_column_shield_cylinder
 from ..workplanes.plasma_simplified import plasma_simplified
 
 
-def create_blanket_layers_after_plasma(
-    radial_build, vertical_build, minor_radius, major_radius, triangularity, elongation, rotation_angle, center_column
+def create_blanket_layer_from_points(points, rotation_angle, name, center_column, fidelity="full"):
+    layer = blanket_from_points(
+        points=points,
+        rotation_angle=rotation_angle,
+        color=(0.5, 0.5, 0.5),
+        name=name,
+        fidelity=fidelity,
+    )
+    center_column = center_column_shield_cylinder(**center_column)
+    with timed("cut"):
+        return layer.cut(center_column)
+
+
+def blanket_layer_tasks_after_plasma(
+    radial_build,
+    vertical_build,
+    minor_radius,
+    major_radius,
+    triangularity,
+    elongation,
+    rotation_angle,
+    center_column,
+    fidelity="full",
 ):
-    layers = []
+    """Finds the builder and arguments of each blanket layer. center_column
+    is the dictionary of center_column_shield_cylinder arguments for the
+    cylinder that is cut from every layer."""
+    layer_names = []
+    thicknesses = []
+    offsets = []
     cumulative_thickness_rb = 0
     cumulative_thickness_uvb = 0
     cumulative_thickness_lvb = 0
@@ -38,40 +70,38 @@ def create_blanket_layers_after_plasma(
             cumulative_thickness_lvb += lower_thicknees
             continue
 
-        layer = blanket_from_plasma(
-            minor_radius=minor_radius,
-            major_radius=major_radius,
-            triangularity=triangularity,
-            elongation=elongation,
-            thickness=[
-                lower_thicknees,
-                radial_thickness,
-                upper_thicknees,
-            ],
-            offset_from_plasma=[
-                cumulative_thickness_lvb,
-                cumulative_thickness_rb,
-                cumulative_thickness_uvb,
-            ],
-            start_angle=-90,
-            stop_angle=90,
-            rotation_angle=rotation_angle,
-            color=(0.5, 0.5, 0.5),
-            name=f"layer_{plasma_index_radial+i+1}",
-            allow_overlapping_shape=True,
-            connect_to_center=True,
-        )
-        layer = layer.cut(center_column)
+        layer_names.append(f"layer_{plasma_index_radial+i+1}")
+        thicknesses.append([lower_thicknees, radial_thickness, upper_thicknees])
+        offsets.append([cumulative_thickness_lvb, cumulative_thickness_rb, cumulative_thickness_uvb])
         cumulative_thickness_rb += radial_thickness
         cumulative_thickness_uvb += upper_thicknees
         cumulative_thickness_lvb += lower_thicknees
-        layers.append(layer)
 
-    return layers
+    layers_inner_points, layers_outer_points = find_layer_points(
+        minor_radius=minor_radius,
+        major_radius=major_radius,
+        triangularity=triangularity,
+        elongation=elongation,
+        thicknesses=thicknesses,
+        offsets=offsets,
+        start_angle=-90,
+        stop_angle=90,
+        num_points=PREVIEW_NUM_POINTS if is_preview(fidelity) else 50,
+    )
+
+    tasks = []
+    for name, inner_points, outer_points in zip(layer_names, layers_inner_points, layers_outer_points):
+        points, _ = points_from_layer_points(inner_points, outer_points, connect_to_center=True)
+        layer_kwargs = dict(
+            points=points, rotation_angle=rotation_angle, name=name, center_column=center_column, fidelity=fidelity
+        )
+        tasks.append((create_blanket_layer_from_points, layer_kwargs))
+
+    return tasks
 
 
-def create_center_column_shield_cylinders(radial_build, vertical_build, rotation_angle):
-    cylinders = []
+def center_column_shield_cylinder_tasks(radial_build, vertical_build, rotation_angle):
+    tasks = []
     total_sum = 0
     layer_count = 0
 
@@ -89,7 +119,7 @@ def create_center_column_shield_cylinders(radial_build, vertical_build, rotation
 
         layer_count += 1
         # print('inner_radius', total_sum, 'item thickness', item[1], 'layer_count', layer_count)
-        cylinder = center_column_shield_cylinder(
+        cylinder_kwargs = dict(
             inner_radius=total_sum,
             thickness=item[1],
             name=f"layer_{layer_count}",
@@ -97,12 +127,62 @@ def create_center_column_shield_cylinders(radial_build, vertical_build, rotation
             height=center_column_shield_height,
             reference_point=("lower", -before),
         )
-        cylinders.append(cylinder)
+        tasks.append((center_column_shield_cylinder, cylinder_kwargs))
         total_sum += item[1]
 
-    return cylinders
+    return tasks
+
 
+def add_reactor_components(
+    assembly, plasma_task, component_tasks, cutters, extra_intersect_shapes, colors, workers=None
+):
+    """Builds the center column cylinders and blanket layers of a reactor and
+    adds them to the assembly as layer_1, layer_2, ... once cut by the
+    cutters, followed by the intersections of the extra_intersect_shapes with
+    the uncut layers and by the plasma.
+
+    While a PartWriter is active the components are built at most workers at
+    a time, and each is written to its file and released once it is cut, so
+    that the other components are not held in memory. The union of the uncut
+    layers is still kept when there are extra_intersect_shapes.
+    """
+    tasks = list(component_tasks) + [plasma_task]
+    # the components are independent until they are cut so they can be built concurrently,
+    # without a writer every component is kept by the assembly so they are all built together
+    batch_size = len(tasks) if active_part_writer.get() is None else (workers or 1)
+
+    reactor_compound = None
+    for start in range(0, len(tasks), batch_size):
+        for index, entry in enumerate(build_workplanes(tasks[start : start + batch_size], workers=workers), start):
+            if index == len(component_tasks):
+                plasma = entry
+                continue
+
+            if len(extra_intersect_shapes) > 0:
+                # makes a union of the the radial build to use as a base for the intersect shapes
+                # the nested layers fuse faster as a chain of cleaned unions than with a single general
+                # fuse, see benchmarks/benchmark_fuse.py
+                with timed("union"):
+                    reactor_compound = entry if reactor_compound is None else reactor_compound.union(entry)
+
+            if len(cutters) > 0:
+                # skips the cutters that are away from the layer and cuts the rest in one operation
+                entry = cut_workplanes([entry], cutters)[0]
+
+            # the solids of a layer split by the cut keep its name, see Assembly.solid_names
+            name = f"layer_{index + 1}"
+            assembly.add(entry, name=name, color=cq.Color(*colors.get(name, (0.5, 0.5, 0.5))))
+
+    for i, entry in enumerate(extra_intersect_shapes):
+        with timed("intersect"):
+            reactor_entry_intersection = entry.intersect(reactor_compound)
+        name = f"extra_intersect_shapes_{i+1}"
+        assembly.add(reactor_entry_intersection, name=name, color=cq.Color(*colors.get(name, (0.5, 0.5, 0.5))))
 
+    assembly.add(plasma, name="plasma", color=cq.Color(*colors.get("plasma", (0.5, 0.5, 0.5))))
+
+
+@record_timings
 def spherical_tokamak_from_plasma(
     radial_build: Sequence[Tuple[LayerType, float]],
     elongation: float = 2.0,
@@ -111,6 +191,8 @@ def spherical_tokamak_from_plasma(
     extra_cut_shapes: Sequence[cq.Workplane] = [],
     extra_intersect_shapes: Sequence[cq.Workplane] = [],
     colors: dict = {},
+    workers: Optional[int] = None,
+    fidelity: str = "full",
 ) -> Assembly:
     """Creates a spherical tokamak fusion reactor from a radial build and plasma parameters.
 
@@ -127,9 +209,19 @@ def spherical_tokamak_from_plasma(
             Each dictionary entry should be a key that matches the assembly part name
             (e.g. 'plasma', or 'layer_1') and a tuple of 3 or 4 floats between 0 and 1
             representing the RGB or RGBA values.
+        workers (int, optional): the number of processes used to build the plasma,
+            center column cylinders and blanket layers concurrently. Defaults to None
+            which builds them one after another in this process.
+        fidelity (str, optional): "full" or "preview", which builds a coarser reactor
+            that is quick to render, with the plasma and blanket curves approximated
+            by a few straight lines and without the cuts of the extra_cut_shapes, which
+            only remove the parts of the layers hidden inside the cut shapes. The
+            fidelity attribute of the returned Assembly states the fidelity. Defaults
+            to "full".
 
     Returns:
         _type_: _description_
+            While a PartWriter is active, the manifest of the written parts instead.
     """
 
     inner_equatorial_point = sum_up_to_plasma(radial_build)
@@ -158,9 +250,12 @@ def spherical_tokamak_from_plasma(
         extra_cut_shapes=extra_cut_shapes,
         extra_intersect_shapes=extra_intersect_shapes,
         colors=colors,
+        workers=workers,
+        fidelity=fidelity,
     )
 
 
+@record_timings
 def spherical_tokamak(
     radial_build: Sequence[Tuple[LayerType, float]],
     vertical_build: Sequence[Tuple[str, float]],
@@ -169,6 +264,8 @@ def spherical_tokamak(
     extra_cut_shapes: Sequence[cq.Workplane] = [],
     extra_intersect_shapes: Sequence[cq.Workplane] = [],
     colors: dict = {},
+    workers: Optional[int] = None,
+    fidelity: str = "full",
 ) -> Assembly:
     """  Creates a spherical tokamak fusion reactor from a radial build and vertical build.
 
@@ -184,11 +281,23 @@ def spherical_tokamak(
             Each dictionary entry should be a key that matches the assembly part name
             (e.g. 'plasma', or 'layer_1') and a tuple of 3 or 4 floats between 0 and 1
             representing the RGB or RGBA values.
+        workers (int, optional): the number of processes used to build the plasma,
+            center column cylinders and blanket layers concurrently. Defaults to None
+            which builds them one after another in this process.
+        fidelity (str, optional): "full" or "preview", which builds a coarser reactor
+            that is quick to render, with the plasma and blanket curves approximated
+            by a few straight lines and without the cuts of the extra_cut_shapes, which
+            only remove the parts of the layers hidden inside the cut shapes. The
+            fidelity attribute of the returned Assembly states the fidelity. Defaults
+            to "full".
 
     Returns:
         _type_: _description_
+            While a PartWriter is active, the manifest of the written parts instead.
     """
 
+    preview = is_preview(fidelity)
+
     inner_equatorial_point = sum_up_to_plasma(radial_build)
     plasma_radial_thickness = get_plasma_value(radial_build)
     plasma_vertical_thickness = get_plasma_value(vertical_build)
@@ -204,28 +313,32 @@ def spherical_tokamak(
     elongation = (plasma_vertical_thickness / 2) / minor_radius
     blanket_rear_wall_end_height = sum([item[1] for item in vertical_build])
 
-    plasma = plasma_simplified(
-        major_radius=major_radius,
-        minor_radius=minor_radius,
-        elongation=elongation,
-        triangularity=triangularity,
-        rotation_angle=rotation_angle,
+    plasma_task = (
+        plasma_simplified,
+        dict(
+            major_radius=major_radius,
+            minor_radius=minor_radius,
+            elongation=elongation,
+            triangularity=triangularity,
+            rotation_angle=rotation_angle,
+            fidelity=fidelity,
+        ),
     )
 
-    inner_radial_build = create_center_column_shield_cylinders(
+    cylinder_tasks = center_column_shield_cylinder_tasks(
         radial_build=radial_build,
         vertical_build=vertical_build,
         rotation_angle=rotation_angle,
     )
 
-    blanket_cutting_cylinder = center_column_shield_cylinder(
+    blanket_cutting_cylinder = dict(
         inner_radius=0,
         thickness=sum_up_to_gap_before_plasma(radial_build),
         rotation_angle=360,
         height=2 * blanket_rear_wall_end_height,
     )
 
-    blanket_layers = create_blanket_layers_after_plasma(
+    layer_tasks = blanket_layer_tasks_after_plasma(
         radial_build=radial_build,
         vertical_build=vertical_build,
         minor_radius=minor_radius,
@@ -234,6 +347,7 @@ def spherical_tokamak(
         elongation=elongation,
         rotation_angle=rotation_angle,
         center_column=blanket_cutting_cylinder,
+        fidelity=fidelity,
     )
 
     my_assembly = Assembly()
@@ -246,50 +360,21 @@ def spherical_tokamak(
         else:
             raise ValueError(f"extra_cut_shapes should only contain cadquery Workplanes, not {type(entry)}")
 
-    # builds up the intersect shapes
-    intersect_shapes_to_cut = []
-    if len(extra_intersect_shapes) > 0:
-        all_shapes = []
-        for shape in inner_radial_build + blanket_layers:
-            all_shapes.append(shape)
+    # a preview skips the cuts of the extra_cut_shapes, which only remove the parts of the layers inside them
+    cutters = list(extra_intersect_shapes) if preview else list(extra_cut_shapes) + list(extra_intersect_shapes)
 
-        # makes a union of the the radial build to use as a base for the intersect shapes
-        reactor_compound = inner_radial_build[0]
-        for i, entry in enumerate(inner_radial_build[1:] + blanket_layers):
-            reactor_compound = reactor_compound.union(entry)
-
-        # adds the extra intersect shapes to the assembly
-        for i, entry in enumerate(extra_intersect_shapes):
-            reactor_entry_intersection = entry.intersect(reactor_compound)
-            intersect_shapes_to_cut.append(reactor_entry_intersection)
-            name = f"extra_intersect_shapes_{i+1}"
-            my_assembly.add(reactor_entry_intersection, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
-
-    # builds just the core if there are no extra parts
-    if len(extra_cut_shapes) == 0 and len(intersect_shapes_to_cut) == 0:
-        for i, entry in enumerate(inner_radial_build+blanket_layers):
-            name = f"layer_{i+1}"
-            my_assembly.add(entry, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
-    else:
-        shapes_and_components = []
-        for i, entry in enumerate(inner_radial_build + blanket_layers):
-            for cutter in extra_cut_shapes + extra_intersect_shapes:
-                entry = entry.cut(cutter)
-                # TODO use something like this to return a list of material tags for the solids in order, as some solids get split into multiple
-                # for subentry in entry.objects:
-                #     print(i, subentry)
-            shapes_and_components.append(entry)
-
-        for i, entry in enumerate(shapes_and_components):
-            # TODO track the names of shapes, even when extra shapes are made due to splitting
-            name=f"layer_{i+1}"
-            my_assembly.add(entry, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
-
-    my_assembly.add(plasma, name="plasma", color=cq.Color(*colors.get("plasma", (0.5,0.5,0.5))))
+    add_reactor_components(
+        my_assembly, plasma_task, cylinder_tasks + layer_tasks, cutters, extra_intersect_shapes, colors, workers
+    )
 
     my_assembly.elongation = elongation
     my_assembly.triangularity = triangularity
     my_assembly.major_radius = major_radius
     my_assembly.minor_radius = minor_radius
+    my_assembly.fidelity = fidelity
 
+    writer = active_part_writer.get()
+    if writer is not None:
+        # the parts were released once written so the manifest is returned instead of the assembly
+        return writer.finish(my_assembly)
     return my_assembly
@@ -1,13 +1,15 @@
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, Tuple
 
 import cadquery as cq
 from .assembly import Assembly
+from .part_writer import active_part_writer
 
-from ..utils import get_plasma_index, LayerType
-from ..workplanes.blanket_from_plasma import blanket_from_plasma
+from ..timing import record_timings, timed
+from ..utils import PREVIEW_NUM_POINTS, get_plasma_index, is_preview, LayerType
+from ..workplanes.blanket_from_plasma import blanket_from_points, find_layer_points, points_from_layer_points
 from ..workplanes.center_column_shield_cylinder import center_column_shield_cylinder
 from ..workplanes.plasma_simplified import plasma_simplified
-from .spherical_tokamak import get_plasma_value, sum_up_to_plasma
+from .spherical_tokamak import add_reactor_components, get_plasma_value, sum_up_to_plasma
 
 
 def count_cylinder_layers(radial_build):
@@ -27,8 +29,8 @@ def count_cylinder_layers(radial_build):
     return before_plasma - after_plasma
 
 
-def create_center_column_shield_cylinders(radial_build, rotation_angle, center_column_shield_height):
-    cylinders = []
+def center_column_shield_cylinder_tasks(radial_build, rotation_angle, center_column_shield_height):
+    tasks = []
     total_sum = 0
     layer_count = 0
 
@@ -48,7 +50,7 @@ def create_center_column_shield_cylinders(radial_build, rotation_angle, center_c
         if layer_count > number_of_cylinder_layers:
             break
 
-        cylinder = center_column_shield_cylinder(
+        cylinder_kwargs = dict(
             inner_radius=total_sum,
             thickness=item[1],
             name=f"layer_{layer_count}",
@@ -56,8 +58,8 @@ def create_center_column_shield_cylinders(radial_build, rotation_angle, center_c
             height=center_column_shield_height,
         )
         total_sum += thickness
-        cylinders.append(cylinder)
-    return cylinders
+        tasks.append((center_column_shield_cylinder, cylinder_kwargs))
+    return tasks
 
 
 def distance_to_plasma(radial_build, index):
@@ -69,14 +71,36 @@ def distance_to_plasma(radial_build, index):
     return distance
 
 
-def create_layers_from_plasma(
-    radial_build, vertical_build, minor_radius, major_radius, triangularity, elongation, rotation_angle, center_column
+def create_layer_from_points(outer_points, inner_points, rotation_angle, name, fidelity="full"):
+    # build outer layer
+    outer_layer = blanket_from_points(
+        points=outer_points, rotation_angle=rotation_angle, color=(0.5, 0.5, 0.5), name=name, fidelity=fidelity
+    )
+    # build inner layer
+    inner_layer = blanket_from_points(
+        points=inner_points, rotation_angle=rotation_angle, color=(0.5, 0.5, 0.5), name=name, fidelity=fidelity
+    )
+    # union layers
+    with timed("union"):
+        layer = outer_layer.union(inner_layer)
+    # the layers only touch so the volume of the union is the sum of their volumes
+    layer.profiles = outer_layer.profiles + inner_layer.profiles
+    layer.rotation_angle = rotation_angle
+    return layer
+
+
+def layer_tasks_from_plasma(
+    radial_build, vertical_build, minor_radius, major_radius, triangularity, elongation, rotation_angle, fidelity="full"
 ):
 
     plasma_index_rb = get_plasma_index(radial_build)
     plasma_index_vb = get_plasma_index(vertical_build)
     indexes_from_plamsa_to_end = len(radial_build) - plasma_index_rb
-    layers = []
+    layer_names = []
+    outer_thicknesses = []
+    outer_offsets = []
+    inner_thicknesses = []
+    inner_offsets = []
 
     cumulative_thickness_orb = 0
     cumulative_thickness_irb = 0
@@ -98,58 +122,49 @@ def create_layers_from_plasma(
             cumulative_thickness_lvb += lower_layer_thickness
             continue
 
-        # build outer layer
+        # collects the outer and inner layer profiles so that they can be found together
         if radial_build[plasma_index_rb + index_delta][0] == LayerType.SOLID:
-            outer_layer = blanket_from_plasma(
-                minor_radius=minor_radius,
-                major_radius=major_radius,
-                triangularity=triangularity,
-                elongation=elongation,
-                thickness=[upper_layer_thickness, outer_layer_thickness, lower_layer_thickness],
-                offset_from_plasma=[cumulative_thickness_uvb, cumulative_thickness_orb, cumulative_thickness_lvb],
-                start_angle=90,
-                stop_angle=-90,
-                rotation_angle=rotation_angle,
-                color=(0.5, 0.5, 0.5),
-                name=f"layer_{index_delta}",
-                allow_overlapping_shape=True,
-            )
-            inner_layer = blanket_from_plasma(
-                minor_radius=minor_radius,
-                major_radius=major_radius,
-                triangularity=triangularity,
-                elongation=elongation,
-                thickness=[
-                    lower_layer_thickness,
-                    inner_layer_thickness,
-                    upper_layer_thickness,
-                ],
-                offset_from_plasma=[
-                    cumulative_thickness_lvb,
-                    cumulative_thickness_irb,
-                    cumulative_thickness_uvb,
-                ],
-                start_angle=-90,
-                stop_angle=-270,
-                rotation_angle=rotation_angle,
-                color=(0.5, 0.5, 0.5),
-                name=f"layer_{index_delta}",
-                allow_overlapping_shape=True,
-            )
-            layer = outer_layer.union(inner_layer)
-            layers.append(layer)
-            # layers.append(inner_layer)
+            layer_names.append(f"layer_{index_delta}")
+            outer_thicknesses.append([upper_layer_thickness, outer_layer_thickness, lower_layer_thickness])
+            outer_offsets.append([cumulative_thickness_uvb, cumulative_thickness_orb, cumulative_thickness_lvb])
+            inner_thicknesses.append([lower_layer_thickness, inner_layer_thickness, upper_layer_thickness])
+            inner_offsets.append([cumulative_thickness_lvb, cumulative_thickness_irb, cumulative_thickness_uvb])
         cumulative_thickness_orb += outer_layer_thickness
         cumulative_thickness_irb += inner_layer_thickness
         cumulative_thickness_uvb += upper_layer_thickness
         cumulative_thickness_lvb += lower_layer_thickness
-        # build inner layer
 
-        # union layers
+    plasma_shape = dict(
+        minor_radius=minor_radius,
+        major_radius=major_radius,
+        triangularity=triangularity,
+        elongation=elongation,
+        num_points=PREVIEW_NUM_POINTS if is_preview(fidelity) else 50,
+    )
+    outer_layers_inner_points, outer_layers_outer_points = find_layer_points(
+        start_angle=90, stop_angle=-90, offsets=outer_offsets, thicknesses=outer_thicknesses, **plasma_shape
+    )
+    inner_layers_inner_points, inner_layers_outer_points = find_layer_points(
+        start_angle=-90, stop_angle=-270, offsets=inner_offsets, thicknesses=inner_thicknesses, **plasma_shape
+    )
 
-    return layers
+    tasks = []
+    for i, name in enumerate(layer_names):
+        outer_points, _ = points_from_layer_points(outer_layers_inner_points[i], outer_layers_outer_points[i])
+        inner_points, _ = points_from_layer_points(inner_layers_inner_points[i], inner_layers_outer_points[i])
+        layer_kwargs = dict(
+            outer_points=outer_points,
+            inner_points=inner_points,
+            rotation_angle=rotation_angle,
+            name=name,
+            fidelity=fidelity,
+        )
+        tasks.append((create_layer_from_points, layer_kwargs))
 
+    return tasks
 
+
+@record_timings
 def tokamak_from_plasma(
     radial_build: Sequence[Tuple[LayerType, float]],
     elongation: float = 2.0,
@@ -157,7 +172,9 @@ def tokamak_from_plasma(
     rotation_angle: float = 180.0,
     extra_cut_shapes: Sequence[cq.Workplane] = [],
     extra_intersect_shapes: Sequence[cq.Workplane] = [],
-    colors: dict = {}
+    colors: dict = {},
+    workers: Optional[int] = None,
+    fidelity: str = "full",
 ) -> Assembly:
     """
     Creates a tokamak fusion reactor from a radial build and plasma parameters.
@@ -174,9 +191,19 @@ def tokamak_from_plasma(
             Each dictionary entry should be a key that matches the assembly part name
             (e.g. 'plasma', or 'layer_1') and a tuple of 3 or 4 floats between 0 and 1
             representing the RGB or RGBA values.
+        workers (int, optional): the number of processes used to build the plasma,
+            center column cylinders and blanket layers concurrently. Defaults to None
+            which builds them one after another in this process.
+        fidelity (str, optional): "full" or "preview", which builds a coarser reactor
+            that is quick to render, with the plasma and blanket curves approximated
+            by a few straight lines and without the cuts of the extra_cut_shapes, which
+            only remove the parts of the layers hidden inside the cut shapes. The
+            fidelity attribute of the returned Assembly states the fidelity. Defaults
+            to "full".
 
     Returns:
         CadQuery.Assembly: A CadQuery Assembly object representing the tokamak fusion reactor.
+            While a PartWriter is active, the manifest of the written parts instead.
     """
 
     inner_equatorial_point = sum_up_to_plasma(radial_build)
@@ -205,10 +232,13 @@ def tokamak_from_plasma(
         rotation_angle=rotation_angle,
         extra_cut_shapes=extra_cut_shapes,
         extra_intersect_shapes=extra_intersect_shapes,
-        colors=colors
+        colors=colors,
+        workers=workers,
+        fidelity=fidelity,
     )
 
 
+@record_timings
 def tokamak(
     radial_build: Sequence[Tuple[str, float]],
     vertical_build: Sequence[Tuple[str, float]],
@@ -216,7 +246,9 @@ def tokamak(
     rotation_angle: float = 180.0,
     extra_cut_shapes: Sequence[cq.Workplane] = [],
     extra_intersect_shapes: Sequence[cq.Workplane] = [],
-    colors: dict = {}
+    colors: dict = {},
+    workers: Optional[int] = None,
+    fidelity: str = "full",
 ) -> Assembly:
     """
     Creates a tokamak fusion reactor from a radial and vertical build.
@@ -234,11 +266,23 @@ def tokamak(
             Each dictionary entry should be a key that matches the assembly part name
             (e.g. 'plasma', or 'layer_1') and a tuple of 3 or 4 floats between 0 and 1
             representing the RGB or RGBA values.
+        workers (int, optional): the number of processes used to build the plasma,
+            center column cylinders and blanket layers concurrently. Defaults to None
+            which builds them one after another in this process.
+        fidelity (str, optional): "full" or "preview", which builds a coarser reactor
+            that is quick to render, with the plasma and blanket curves approximated
+            by a few straight lines and without the cuts of the extra_cut_shapes, which
+            only remove the parts of the layers hidden inside the cut shapes. The
+            fidelity attribute of the returned Assembly states the fidelity. Defaults
+            to "full".
 
     Returns:
         CadQuery.Assembly: A CadQuery Assembly object representing the tokamak fusion reactor.
+            While a PartWriter is active, the manifest of the written parts instead.
     """
 
+    preview = is_preview(fidelity)
+
     inner_equatorial_point = sum_up_to_plasma(radial_build)
     plasma_radial_thickness = get_plasma_value(radial_build)
     plasma_vertical_thickness = get_plasma_value(vertical_build)
@@ -250,19 +294,21 @@ def tokamak(
     elongation = (plasma_vertical_thickness / 2) / minor_radius
     blanket_rear_wall_end_height = sum([item[1] for item in vertical_build])
 
-    plasma = plasma_simplified(
-        major_radius=major_radius,
-        minor_radius=minor_radius,
-        elongation=elongation,
-        triangularity=triangularity,
-        rotation_angle=rotation_angle,
+    plasma_task = (
+        plasma_simplified,
+        dict(
+            major_radius=major_radius,
+            minor_radius=minor_radius,
+            elongation=elongation,
+            triangularity=triangularity,
+            rotation_angle=rotation_angle,
+            fidelity=fidelity,
+        ),
     )
 
-    inner_radial_build = create_center_column_shield_cylinders(
-        radial_build, rotation_angle, blanket_rear_wall_end_height
-    )
+    cylinder_tasks = center_column_shield_cylinder_tasks(radial_build, rotation_angle, blanket_rear_wall_end_height)
 
-    blanket_layers = create_layers_from_plasma(
+    layer_tasks = layer_tasks_from_plasma(
         radial_build=radial_build,
         vertical_build=vertical_build,
         minor_radius=minor_radius,
@@ -270,7 +316,7 @@ def tokamak(
         triangularity=triangularity,
         elongation=elongation,
         rotation_angle=rotation_angle,
-        center_column=inner_radial_build[0],  # blanket_cutting_cylinder,
+        fidelity=fidelity,
     )
 
     my_assembly = Assembly()
@@ -282,50 +328,21 @@ def tokamak(
         else:
             raise ValueError(f"extra_cut_shapes should only contain cadquery Workplanes, not {type(entry)}")
 
-    # builds up the intersect shapes
-    intersect_shapes_to_cut = []
-    if len(extra_intersect_shapes) > 0:
-        all_shapes = []
-        for shape in inner_radial_build + blanket_layers:
-            all_shapes.append(shape)
-
-        # makes a union of the the radial build to use as a base for the intersect shapes
-        reactor_compound = inner_radial_build[0]
-        for i, entry in enumerate(inner_radial_build[1:] + blanket_layers):
-            reactor_compound = reactor_compound.union(entry)
-
-        # adds the extra intersect shapes to the assembly
-        for i, entry in enumerate(extra_intersect_shapes):
-            reactor_entry_intersection = entry.intersect(reactor_compound)
-            intersect_shapes_to_cut.append(reactor_entry_intersection)
-            name=f"extra_intersect_shapes_{i+1}"
-            my_assembly.add(reactor_entry_intersection, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
-
-    # builds just the core if there are no extra parts
-    if len(extra_cut_shapes) == 0 and len(intersect_shapes_to_cut) == 0:
-        for i, entry in enumerate(inner_radial_build+blanket_layers):
-            name=f"layer_{i+1}"
-            my_assembly.add(entry, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
-    else:
-        shapes_and_components = []
-        for i, entry in enumerate(inner_radial_build + blanket_layers):
-            for cutter in extra_cut_shapes + extra_intersect_shapes:
-                entry = entry.cut(cutter)
-                # TODO use something like this to return a list of material tags for the solids in order, as some solids get split into multiple
-                # for subentry in entry.objects:
-                #     print(i, subentry)
-            shapes_and_components.append(entry)
-
-        for i, entry in enumerate(shapes_and_components):
-            name=f"layer_{i+1}"
-            # TODO track the names of shapes, even when extra shapes are made due to splitting
-            my_assembly.add(entry, name=name, color=cq.Color(*colors.get(name, (0.5,0.5,0.5))))
+    # a preview skips the cuts of the extra_cut_shapes, which only remove the parts of the layers inside them
+    cutters = list(extra_intersect_shapes) if preview else list(extra_cut_shapes) + list(extra_intersect_shapes)
 
-    my_assembly.add(plasma, name="plasma", color=cq.Color(*colors.get("plasma", (0.5,0.5,0.5))))
+    add_reactor_components(
+        my_assembly, plasma_task, cylinder_tasks + layer_tasks, cutters, extra_intersect_shapes, colors, workers
+    )
 
     my_assembly.elongation = elongation
     my_assembly.triangularity = triangularity
     my_assembly.major_radius = major_radius
     my_assembly.minor_radius = minor_radius
+    my_assembly.fidelity = fidelity
 
+    writer = active_part_writer.get()
+    if writer is not None:
+        # the parts were released once written so the manifest is returned instead of the assembly
+        return writer.finish(my_assembly)
     return my_assembly
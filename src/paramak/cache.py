@@ -0,0 +1,394 @@
+# Caches of the Workplanes made by the workplane builders. Entries are keyed
+# on a hash of the normalised builder arguments and the paramak version. A
+# bounded in-memory LRU cache and an on-disk cache of binary BREP files in a
+# user chosen directory can be enabled.
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import typing
+from collections import Counter, OrderedDict
+from enum import Enum
+from importlib.metadata import version
+from pathlib import Path
+
+import numpy as np
+from cadquery import Color, Workplane
+
+from .timing import timed
+from .utils import copy_workplane, workplane_from_bytes, workplane_to_bytes
+
+
+BuilderResult = typing.Union[Workplane, typing.Tuple[Workplane, ...]]
+
+
+class DiskCacheStats(typing.NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+
+class MemoryCacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    max_entries: int
+    size: int
+    max_size: int
+
+
+class UncacheableArgument(Exception):
+    pass
+
+
+def normalize_argument(value):
+    """Converts a builder argument into a JSON compatible value so that
+    equivalent arguments (e.g. 1, 1.0 and np.float64(1)) produce the same
+    cache key. Raises UncacheableArgument for values such as callables and
+    Workplanes that can not be hashed reliably."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Enum):
+        return normalize_argument(value.value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # adding 0.0 turns -0.0 into 0.0
+        return float(value) + 0.0
+    if isinstance(value, Color):
+        return [float(channel) for channel in value.toTuple()]
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize_argument(entry) for entry in value]
+    if isinstance(value, dict):
+        return {str(key): normalize_argument(entry) for key, entry in value.items()}
+    raise UncacheableArgument(f"Arguments of type {type(value)} can not be cached")
+
+
+@functools.lru_cache(maxsize=None)
+def paramak_version() -> str:
+    return version("paramak")
+
+
+def builder_key(builder: typing.Callable, args: tuple, kwargs: dict) -> str:
+    """Hashes the builder name, the paramak version and the builder arguments
+    with defaults applied."""
+    arguments = inspect.signature(builder).bind(*args, **kwargs)
+    arguments.apply_defaults()
+    content = {
+        "builder": f"{builder.__module__}.{builder.__qualname__}",
+        "version": paramak_version(),
+        "arguments": normalize_argument(dict(arguments.arguments)),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class DiskCache:
+    """A directory of binary BREP files, one per cached builder call, with
+    least recently used eviction once the total size exceeds max_size.
+
+    Args:
+        directory: the directory to store the cached BREP files in.
+        max_size: the maximum total size of the cached files in bytes.
+    """
+
+    def __init__(self, directory: typing.Union[str, Path], max_size: int = 1_000_000_000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _paths(self, key: str) -> typing.Tuple[Path, Path]:
+        return self.directory / f"{key}.brep", self.directory / f"{key}.json"
+
+    def get(self, key: str) -> typing.Optional[BuilderResult]:
+        brep_path, metadata_path = self._paths(key)
+        try:
+            brep = brep_path.read_bytes()
+            metadata = json.loads(metadata_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        # marks the entry as recently used
+        os.utime(brep_path)
+        self.hits += 1
+        workplanes = [
+            workplane_from_bytes(brep, entry)
+            for brep, entry in zip(split_breps(brep, metadata["workplanes"]), metadata["workplanes"])
+        ]
+        return tuple(workplanes) if metadata["sequence"] else workplanes[0]
+
+    def put(self, key: str, result: BuilderResult):
+        sequence = not isinstance(result, Workplane)
+        breps = []
+        metadata = {"sequence": sequence, "workplanes": []}
+        for workplane in result if sequence else [result]:
+            brep, entry = workplane_to_bytes(workplane)
+            entry["size"] = len(brep)
+            breps.append(brep)
+            metadata["workplanes"].append(entry)
+
+        brep_path, metadata_path = self._paths(key)
+        # writes to temporary files then renames so that other processes
+        # sharing the directory never read partial entries
+        for path, content in ((metadata_path, json.dumps(metadata).encode()), (brep_path, b"".join(breps))):
+            temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            temporary_path.write_bytes(content)
+            os.replace(temporary_path, path)
+
+        self.evict()
+
+    def entries(self) -> typing.List[typing.Tuple[Path, int, float]]:
+        """Returns the BREP path, total size and last use time of each entry,
+        least recently used first."""
+        entries = []
+        for brep_path in self.directory.glob("*.brep"):
+            try:
+                stat = brep_path.stat()
+                size = stat.st_size + brep_path.with_suffix(".json").stat().st_size
+            except FileNotFoundError:
+                continue
+            entries.append((brep_path, size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self):
+        entries = self.entries()
+        size = sum(entry[1] for entry in entries)
+        for brep_path, entry_size, _ in entries:
+            if size <= self.max_size:
+                break
+            brep_path.unlink(missing_ok=True)
+            brep_path.with_suffix(".json").unlink(missing_ok=True)
+            size -= entry_size
+            self.evictions += 1
+
+    def clear(self):
+        for brep_path, _, _ in self.entries():
+            brep_path.unlink(missing_ok=True)
+            brep_path.with_suffix(".json").unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> DiskCacheStats:
+        entries = self.entries()
+        return DiskCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(entries),
+            size=sum(entry[1] for entry in entries),
+            max_size=self.max_size,
+        )
+
+
+def split_breps(brep: bytes, entries: typing.List[dict]) -> typing.List[bytes]:
+    breps = []
+    start = 0
+    for entry in entries:
+        breps.append(brep[start : start + entry["size"]])
+        start += entry["size"]
+    return breps
+
+
+_disk_cache: typing.Optional[DiskCache] = None
+
+
+def enable_disk_cache(directory: typing.Union[str, Path], max_size: int = 1_000_000_000) -> DiskCache:
+    """Enables caching of the Workplanes made by the workplane builders as
+    BREP files in the directory. Entries from earlier runs with the same
+    paramak version are reused.
+
+    Args:
+        directory: the directory to store the cached BREP files in.
+        max_size: the maximum total size of the cached files in bytes, the
+            least recently used entries are removed beyond this size.
+
+    Returns:
+        the DiskCache in use.
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(directory=directory, max_size=max_size)
+    return _disk_cache
+
+
+def disable_disk_cache():
+    """Stops reading and writing the disk cache, the cached files are kept."""
+    global _disk_cache
+    _disk_cache = None
+
+
+def disk_cache_stats() -> typing.Optional[DiskCacheStats]:
+    """Returns the hits, misses, evictions, number of entries and size of the
+    disk cache or None if the disk cache is not enabled."""
+    if _disk_cache is None:
+        return None
+    return _disk_cache.stats()
+
+
+class MemoryCache:
+    """A least recently used cache of built Workplanes held in memory, bounded
+    by the number of entries and by their estimated size. Only copies of the
+    cached Workplanes are handed out so callers can not modify the entries.
+
+    Args:
+        max_entries: the maximum number of cached builder results.
+        max_size: the maximum estimated size of the cached results in bytes,
+            estimated from the size of their binary BREP.
+    """
+
+    def __init__(self, max_entries: int = 128, max_size: int = 256_000_000):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        # key: (builder name, result, estimated size)
+        self.entries = OrderedDict()
+
+    def get(self, key: str, builder_name: str) -> typing.Optional[BuilderResult]:
+        if key not in self.entries:
+            self.misses[builder_name] += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits[builder_name] += 1
+        return copy_result(self.entries[key][1])
+
+    def put(self, key: str, builder_name: str, result: BuilderResult) -> bool:
+        """Stores a copy of the result, so that the result itself can be
+        handed out, and returns True if it was small enough to be cached."""
+        if self.max_entries <= 0:
+            return False
+        # a single binary BREP round trip both sizes and copies the result
+        serialised = [workplane_to_bytes(workplane) for workplane in _workplanes(result)]
+        size = sum(len(brep) for brep, _ in serialised)
+        if size > self.max_size:
+            return False
+
+        copies = tuple(workplane_from_bytes(brep, metadata) for brep, metadata in serialised)
+        copy = copies[0] if isinstance(result, Workplane) else copies
+        self.entries[key] = (builder_name, copy, size)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_size:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+        return True
+
+    def info(self, builder_name: typing.Optional[str] = None) -> MemoryCacheInfo:
+        if builder_name is None:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            entries = list(self.entries.values())
+        else:
+            hits, misses = self.hits[builder_name], self.misses[builder_name]
+            entries = [entry for entry in self.entries.values() if entry[0] == builder_name]
+        return MemoryCacheInfo(
+            hits=hits,
+            misses=misses,
+            entries=len(entries),
+            max_entries=self.max_entries,
+            size=sum(entry[2] for entry in entries),
+            max_size=self.max_size,
+        )
+
+    def clear(self, builder_name: typing.Optional[str] = None):
+        if builder_name is None:
+            self.entries.clear()
+            self.hits.clear()
+            self.misses.clear()
+            self.size = 0
+            return
+        for key, entry in list(self.entries.items()):
+            if entry[0] == builder_name:
+                del self.entries[key]
+                self.size -= entry[2]
+        self.hits.pop(builder_name, None)
+        self.misses.pop(builder_name, None)
+
+
+def _workplanes(result: BuilderResult) -> typing.Sequence[Workplane]:
+    return [result] if isinstance(result, Workplane) else result
+
+
+def copy_result(result: BuilderResult) -> BuilderResult:
+    if isinstance(result, Workplane):
+        return copy_workplane(result)
+    return tuple(copy_workplane(workplane) for workplane in result)
+
+
+# disabled until configure_memory_cache is called, as copying the results costs time on every miss
+_memory_cache = MemoryCache(max_entries=0)
+
+
+def configure_memory_cache(max_entries: int = 128, max_size: int = 256_000_000) -> MemoryCache:
+    """Enables the in-memory cache of built Workplanes, replacing any
+    previous cache with an empty cache with new bounds. The cache is
+    disabled by default.
+
+    Args:
+        max_entries: the maximum number of cached builder results, 0 disables
+            the in-memory cache.
+        max_size: the maximum estimated size of the cached results in bytes.
+
+    Returns:
+        the MemoryCache in use.
+    """
+    global _memory_cache
+    _memory_cache = MemoryCache(max_entries=max_entries, max_size=max_size)
+    return _memory_cache
+
+
+def cache_info() -> MemoryCacheInfo:
+    """Returns the hits, misses, number of entries and estimated size of the
+    in-memory cache for all builders."""
+    return _memory_cache.info()
+
+
+def cache_clear():
+    """Removes every entry from the in-memory cache."""
+    _memory_cache.clear()
+
+
+def cached_builder(builder: typing.Callable) -> typing.Callable:
+    """Decorates a workplane builder that returns a Workplane or a tuple of
+    Workplanes so that its results are memoised in memory and, when enabled,
+    read from and written to the disk cache. Calls with arguments that can not
+    be normalised, such as callables or an existing obj, are always built.
+
+    The decorated builder has cache_info() and cache_clear() functions for
+    its own in-memory entries."""
+
+    builder_name = f"{builder.__module__}.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    @timed(builder.__name__)
+    def wrapper(*args, **kwargs):
+        if _disk_cache is None and _memory_cache.max_entries <= 0:
+            return builder(*args, **kwargs)
+
+        try:
+            key = builder_key(builder, args, kwargs)
+        except UncacheableArgument:
+            return builder(*args, **kwargs)
+
+        result = _memory_cache.get(key, builder_name)
+        if result is not None:
+            return result
+
+        result = _disk_cache.get(key) if _disk_cache is not None else None
+        if result is None:
+            result = builder(*args, **kwargs)
+            if _disk_cache is not None:
+                _disk_cache.put(key, result)
+        # the memory cache keeps its own copy, so the built result is handed out
+        _memory_cache.put(key, builder_name, result)
+        return result
+
+    wrapper.cache_info = lambda: _memory_cache.info(builder_name)
+    wrapper.cache_clear = lambda: _memory_cache.clear(builder_name)
+    return wrapper
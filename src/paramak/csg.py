@@ -0,0 +1,288 @@
+# Describes the parts of a reactor that are rectangles in the (R, Z) plane
+# revolved around the Z axis, such as center column cylinders, poloidal field
+# coils and their cases, with the surfaces and regions of the constructive
+# solid geometry (CSG) used by OpenMC. Particles are tracked through CSG
+# cells faster than through a DAGMC mesh and the cells need no meshing. The
+# curved parts, such as the blankets and the plasma, stay as CAD.
+
+import math
+import typing
+import xml.etree.ElementTree as ET
+
+from .utils import Profile
+
+# the tolerance (cm) for comparing the coordinates of profile points
+_TOLERANCE = 1e-9
+
+# the OpenMC surface types and the order of their coefficients
+SURFACE_COEFFICIENTS = {
+    "z-cylinder": ("x0", "y0", "r"),
+    "z-plane": ("z0",),
+    "y-plane": ("y0",),
+    "plane": ("a", "b", "c", "d"),
+}
+
+
+class Surface(typing.NamedTuple):
+    """A surface in the OpenMC convention, whose positive side is where
+    evaluate returns a positive value.
+
+    Attributes:
+        id: the surface id.
+        type: "z-cylinder", "z-plane", "y-plane" or "plane".
+        coefficients: the coefficients in the order of SURFACE_COEFFICIENTS.
+    """
+
+    id: int
+    type: str
+    coefficients: typing.Tuple[float, ...]
+
+    def evaluate(self, point: typing.Sequence[float]) -> float:
+        x, y, z = point
+        if self.type == "z-cylinder":
+            x0, y0, r = self.coefficients
+            return (x - x0) ** 2 + (y - y0) ** 2 - r**2
+        if self.type == "z-plane":
+            return z - self.coefficients[0]
+        if self.type == "y-plane":
+            return y - self.coefficients[0]
+        a, b, c, d = self.coefficients
+        return a * x + b * y + c * z - d
+
+
+class Halfspace(typing.NamedTuple):
+    """The positive or negative side of a surface."""
+
+    surface: int
+    positive: bool
+
+    def __str__(self) -> str:
+        return f"{'+' if self.positive else '-'}{self.surface}"
+
+    def contains(self, point, surfaces: typing.Dict[int, Surface]) -> bool:
+        return (surfaces[self.surface].evaluate(point) > 0) == self.positive
+
+
+class Intersection(typing.NamedTuple):
+    nodes: tuple
+
+    def __str__(self) -> str:
+        return f"({' '.join(str(node) for node in self.nodes)})"
+
+    def contains(self, point, surfaces: typing.Dict[int, Surface]) -> bool:
+        return all(node.contains(point, surfaces) for node in self.nodes)
+
+
+class Union(typing.NamedTuple):
+    nodes: tuple
+
+    def __str__(self) -> str:
+        return f"({' | '.join(str(node) for node in self.nodes)})"
+
+    def contains(self, point, surfaces: typing.Dict[int, Surface]) -> bool:
+        return any(node.contains(point, surfaces) for node in self.nodes)
+
+
+class Complement(typing.NamedTuple):
+    node: typing.Union[Halfspace, Intersection, Union]
+
+    def __str__(self) -> str:
+        return f"~{self.node}"
+
+    def contains(self, point, surfaces: typing.Dict[int, Surface]) -> bool:
+        return not self.node.contains(point, surfaces)
+
+
+Region = typing.Union[Halfspace, Intersection, Union, Complement]
+
+
+class Cell(typing.NamedTuple):
+    """A part of the reactor described by a CSG region.
+
+    Attributes:
+        id: the cell id.
+        name: the name of the part.
+        material_tag: the material tag of the part.
+        region: the region, whose string is in the OpenMC region syntax.
+    """
+
+    id: int
+    name: str
+    material_tag: str
+    region: Region
+
+
+class CSGGeometry(typing.NamedTuple):
+    """The surfaces and cells of the parts of an assembly that are described
+    exactly by CSG, and the names of the parts that are not.
+
+    Attributes:
+        surfaces: the surfaces, shared by the cells that touch.
+        cells: a cell for each part described by CSG.
+        cad_parts: the names of the parts that stay as CAD, for example to
+            remove the cells from the assembly before converting it to DAGMC
+            with assembly.remove(cell.name).
+    """
+
+    surfaces: typing.Tuple[Surface, ...]
+    cells: typing.Tuple[Cell, ...]
+    cad_parts: typing.Tuple[str, ...]
+
+    def contains(self, name: str, point: typing.Sequence[float]) -> bool:
+        """Checks if the point (x, y, z) is in the region of the named cell."""
+        surfaces = {surface.id: surface for surface in self.surfaces}
+        cell = next(cell for cell in self.cells if cell.name == name)
+        return cell.region.contains(point, surfaces)
+
+    def to_xml(self, material_ids: typing.Optional[typing.Dict[str, int]] = None) -> str:
+        """Returns the surfaces and cells as an OpenMC geometry.xml document.
+
+        Args:
+            material_ids: the OpenMC material id of each material tag. Cells
+                whose tag is not included are void.
+        """
+        material_ids = material_ids or {}
+        geometry = ET.Element("geometry")
+        for surface in self.surfaces:
+            ET.SubElement(
+                geometry,
+                "surface",
+                id=str(surface.id),
+                type=surface.type,
+                coeffs=" ".join(repr(coefficient) for coefficient in surface.coefficients),
+            )
+        for cell in self.cells:
+            ET.SubElement(
+                geometry,
+                "cell",
+                id=str(cell.id),
+                name=cell.name,
+                material=str(material_ids.get(cell.material_tag, "void")),
+                region=str(cell.region),
+                universe="0",
+            )
+        ET.indent(geometry)
+        return ET.tostring(geometry, encoding="unicode", xml_declaration=True)
+
+    def export_xml(self, filename: str, material_ids: typing.Optional[typing.Dict[str, int]] = None):
+        """Writes the surfaces and cells to an OpenMC geometry.xml file, see to_xml."""
+        with open(filename, "w") as file:
+            file.write(self.to_xml(material_ids))
+
+
+class _Surfaces:
+    """Numbers the surfaces, reusing the same surface for equal coefficients."""
+
+    def __init__(self):
+        self.surfaces: typing.Dict[typing.Tuple[str, typing.Tuple[float, ...]], Surface] = {}
+
+    def add(self, surface_type: str, coefficients: typing.Sequence[float]) -> int:
+        # rounding removes the floating point noise of the angles, and adding 0.0 turns -0.0 into 0.0
+        coefficients = tuple(round(float(coefficient), 12) + 0.0 for coefficient in coefficients)
+        key = (surface_type, coefficients)
+        if key not in self.surfaces:
+            self.surfaces[key] = Surface(len(self.surfaces) + 1, surface_type, coefficients)
+        return self.surfaces[key].id
+
+
+def _rectangle(profile: Profile) -> typing.Optional[typing.Tuple[float, float, float, float]]:
+    """Returns the (r_min, r_max, z_min, z_max) of a profile that is a
+    rectangle aligned with the R and Z axes, otherwise None."""
+    if len(profile.points) != 4 or any(connection != "straight" for connection in profile.connections):
+        return None
+    r_values = sorted(profile.points[:, 0])
+    z_values = sorted(profile.points[:, 1])
+    if r_values[1] - r_values[0] > _TOLERANCE or r_values[3] - r_values[2] > _TOLERANCE:
+        return None
+    if z_values[1] - z_values[0] > _TOLERANCE or z_values[3] - z_values[2] > _TOLERANCE:
+        return None
+    corners = {(round(r, 6), round(z, 6)) for r, z in profile.points.tolist()}
+    if len(corners) != 4:
+        return None
+    return r_values[0], r_values[3], z_values[0], z_values[3]
+
+
+def _rectangle_region(surfaces: _Surfaces, r_min: float, r_max: float, z_min: float, z_max: float) -> Intersection:
+    nodes = []
+    if r_min > _TOLERANCE:
+        nodes.append(Halfspace(surfaces.add("z-cylinder", (0, 0, r_min)), True))
+    nodes.append(Halfspace(surfaces.add("z-cylinder", (0, 0, r_max)), False))
+    nodes.append(Halfspace(surfaces.add("z-plane", (z_min,)), True))
+    nodes.append(Halfspace(surfaces.add("z-plane", (z_max,)), False))
+    return Intersection(tuple(nodes))
+
+
+def _wedge_region(surfaces: _Surfaces, rotation_angle: float) -> typing.Optional[Region]:
+    """The azimuthal angles from 0 to rotation_angle degrees, which the
+    builders revolve their profiles through, anticlockwise from the +X axis
+    seen from +Z. None for a full revolution."""
+    if rotation_angle >= 360:
+        return None
+    start = Halfspace(surfaces.add("y-plane", (0,)), True)
+    if math.isclose(rotation_angle, 180):
+        return start
+    angle = math.radians(rotation_angle)
+    stop = Halfspace(surfaces.add("plane", (math.sin(angle), -math.cos(angle), 0, 0)), True)
+    if rotation_angle < 180:
+        return Intersection((start, stop))
+    return Union((start, stop))
+
+
+def _profile_region(profile: Profile, rotation_angle: float, surfaces: _Surfaces) -> typing.Optional[Region]:
+    """Returns the CSG region of a profile revolved around the Z axis, or None
+    if the profile or one of its holes is not a rectangle aligned with the R
+    and Z axes."""
+    rectangles = [_rectangle(profile)] + [_rectangle(hole) for hole in profile.holes]
+    if any(rectangle is None for rectangle in rectangles):
+        return None
+    nodes = list(_rectangle_region(surfaces, *rectangles[0]).nodes)
+    nodes.extend(Complement(_rectangle_region(surfaces, *rectangle)) for rectangle in rectangles[1:])
+    wedge = _wedge_region(surfaces, rotation_angle)
+    if wedge is not None:
+        nodes.append(wedge)
+    return Intersection(tuple(nodes))
+
+
+def _workplane_region(workplane, surfaces: _Surfaces) -> typing.Optional[Region]:
+    """Returns the CSG region of a Workplane revolved from rectangular
+    profiles in the XZ plane at the origin, or None for any other
+    Workplane, such as a blanket, a plasma or a cut part."""
+    profiles = getattr(workplane, "profiles", None)
+    if not profiles or getattr(workplane, "rotation_angle", None) is None:
+        return None
+    plane = workplane.plane
+    if plane.origin.Length > _TOLERANCE or plane.xDir.toTuple() != (1, 0, 0) or plane.zDir.toTuple() != (0, -1, 0):
+        return None
+    regions = [_profile_region(profile, workplane.rotation_angle, surfaces) for profile in profiles]
+    if any(region is None for region in regions):
+        return None
+    return regions[0] if len(regions) == 1 else Union(tuple(regions))
+
+
+def assembly_to_csg(assembly, tags: typing.Optional[typing.Dict[str, str]] = None) -> CSGGeometry:
+    """Describes the parts of an assembly that are rectangular profiles
+    revolved around the Z axis, such as uncut center column cylinders,
+    poloidal field coils and poloidal field coil cases, with OpenMC CSG
+    surfaces and cells. The other parts are listed as CAD parts.
+
+    Args:
+        assembly: a paramak Assembly, such as one made by tokamak().
+        tags: the material tag of the parts by name, see
+            Assembly.material_tags.
+
+    Returns:
+        the CSG geometry, which can be written to an OpenMC geometry.xml
+        file with export_xml.
+    """
+    surfaces = _Surfaces()
+    cells = []
+    cad_parts = []
+    for part in assembly._parts():
+        region = None
+        if part.loc.toTuple() == ((0, 0, 0), (0, 0, 0)):
+            region = _workplane_region(part.obj, surfaces)
+        if region is None:
+            cad_parts.append(part.name)
+        else:
+            cells.append(Cell(len(cells) + 1, part.name, assembly._material_tag(part, tags or {}), region))
+    return CSGGeometry(tuple(surfaces.surfaces.values()), tuple(cells), tuple(cad_parts))
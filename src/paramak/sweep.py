@@ -0,0 +1,326 @@
+# Runs a reactor builder such as tokamak_from_plasma over many points of a
+# parameter space. Each point is built in a worker process, which is killed
+# if it runs past the timeout, and its result is appended to a JSON lines
+# store as soon as it finishes so that an interrupted sweep can be resumed.
+
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import re
+import time
+import typing
+from pathlib import Path
+
+import numpy as np
+from cadquery import Shape, Workplane
+
+from .cache import normalize_argument
+from .utils import workplane_to_bytes
+
+logger = logging.getLogger("paramak")
+
+RESULTS_FILENAME = "results.jsonl"
+
+# parameter names such as "radial_build[3]" set the thickness of an entry of a build
+_BUILD_ENTRY = re.compile(r"^(\w+)\[(\d+)\]$")
+
+
+def parameter_grid(**values: typing.Sequence) -> typing.List[dict]:
+    """Returns every combination of the parameter values.
+
+    Args:
+        values: the values of each parameter, for example
+            parameter_grid(elongation=[1.5, 2.0], **{"radial_build[1]": [20, 40]}).
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+
+def random_parameters(
+    ranges: typing.Dict[str, typing.Tuple[float, float]], samples: int, seed: typing.Optional[int] = None
+) -> typing.List[dict]:
+    """Returns parameter points sampled uniformly from the ranges. Parameters
+    with integer bounds, such as coil counts, are sampled as integers from
+    the bounds inclusive.
+
+    Args:
+        ranges: the (low, high) bounds of each parameter.
+        samples: the number of points.
+        seed: the seed of the random number generator.
+    """
+    generator = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        if isinstance(low, (int, np.integer)) and isinstance(high, (int, np.integer)):
+            columns[name] = [int(value) for value in generator.integers(low, high, size=samples, endpoint=True)]
+        else:
+            columns[name] = [float(value) for value in generator.uniform(low, high, size=samples)]
+    return [{name: columns[name][index] for name in ranges} for index in range(samples)]
+
+
+def apply_parameters(base: dict, parameters: dict) -> dict:
+    """Returns the builder arguments of a parameter point. A parameter named
+    like "radial_build[3]" sets the thickness of that entry of the build and
+    the other parameters replace the builder argument of the same name."""
+    kwargs = dict(base)
+    for name, value in parameters.items():
+        match = _BUILD_ENTRY.match(name)
+        if match is None:
+            kwargs[name] = value
+            continue
+        build_name, index = match.group(1), int(match.group(2))
+        build = list(kwargs[build_name])
+        build[index] = (build[index][0], value)
+        kwargs[build_name] = build
+    return kwargs
+
+
+def _json_default(value):
+    # NumPy scalars, such as the values of a parameter grid made with np.linspace
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _identity(value):
+    """A JSON compatible value identifying a builder argument, with the
+    Workplanes and Shapes identified by a hash of their binary BREP and the
+    functions by their name."""
+    if isinstance(value, dict):
+        return {str(key): _identity(entry) for key, entry in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_identity(entry) for entry in value]
+    if isinstance(value, Shape):
+        value = Workplane("XY").add(value)
+    if isinstance(value, Workplane):
+        return hashlib.sha256(workplane_to_bytes(value)[0]).hexdigest()
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    return normalize_argument(value)
+
+
+def base_digest(base: dict, configure: typing.Optional[typing.Callable[[dict], dict]] = None) -> str:
+    """A hash of the builder arguments shared by the points of a sweep and of
+    the configure function, which is part of the key of each point."""
+    content = json.dumps({"base": _identity(base), "configure": _identity(configure)}, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def point_key(builder_name: str, parameters: dict, digest: str = "") -> str:
+    """A hash of the builder name, the parameters and the base_digest of the
+    sweep identifying a point."""
+    content = json.dumps(
+        {"builder": builder_name, "parameters": parameters, "base": digest}, sort_keys=True, default=_json_default
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def load_results(directory: typing.Union[str, Path]) -> typing.List[dict]:
+    """Reads the results stored in a sweep directory. A line left incomplete
+    by an interrupted sweep is skipped."""
+    path = Path(directory) / RESULTS_FILENAME
+    if not path.exists():
+        return []
+    results = []
+    for line in path.read_text().splitlines():
+        try:
+            results.append(json.loads(line))
+        except json.JSONDecodeError:
+            logger.warning("Skipping an incomplete line of %s", path)
+    return results
+
+
+def _remove_incomplete_line(path: Path):
+    """Truncates a results file after its last complete line so that new
+    results are not appended to a line left incomplete by an interruption."""
+    if not path.exists():
+        return
+    content = path.read_bytes()
+    if content and not content.endswith(b"\n"):
+        with open(path, "r+b") as file:
+            file.truncate(content.rfind(b"\n") + 1)
+
+
+def _append_result(path: Path, result: dict):
+    with open(path, "a") as file:
+        file.write(json.dumps(result, default=_json_default) + "\n")
+        file.flush()
+        # the result survives the sweep being killed straight after
+        os.fsync(file.fileno())
+
+
+def build_point(
+    builder: typing.Callable,
+    kwargs: dict,
+    directory: Path,
+    key: str,
+    export: typing.Sequence[str],
+    configure: typing.Optional[typing.Callable[[dict], dict]] = None,
+) -> dict:
+    """Builds the reactor of a parameter point, exports it to the directory
+    and returns its files, volumes and timings."""
+    if configure is not None:
+        kwargs = configure(kwargs)
+    reactor = builder(**kwargs)
+
+    files = {}
+    if "brep" in export:
+        files["brep"] = str(directory / f"{key}.brep")
+        reactor.toCompound().exportBrep(files["brep"])
+    if "step" in export:
+        files["step"] = str(directory / f"{key}.step")
+        reactor.save(files["step"])
+    return {
+        "files": files,
+        "volumes": reactor.volumes(),
+        "timings": reactor.timings.as_dict() if reactor.timings is not None else None,
+    }
+
+
+def _build_point_in_worker(connection, *args):
+    """Sends the result of build_point, or the error it raised, through the
+    pipe to the sweep process."""
+    try:
+        connection.send(("ok", build_point(*args), None))
+    except Exception as error:
+        connection.send(("failed", {}, f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+
+def run_sweep(
+    builder: typing.Callable,
+    base: dict,
+    points: typing.Iterable[dict],
+    directory: typing.Union[str, Path],
+    workers: typing.Optional[int] = None,
+    timeout: typing.Optional[float] = None,
+    export: typing.Sequence[str] = ("brep",),
+    configure: typing.Optional[typing.Callable[[dict], dict]] = None,
+    retry_failed: bool = False,
+) -> typing.List[dict]:
+    """Builds the reactor at each parameter point and stores the results.
+
+    The result of each point is appended to results.jsonl in the directory
+    when the point finishes, as a dictionary of its key, builder, parameters,
+    status ("ok", "failed" or "timeout"), seconds, exported files, part
+    volumes, timings and error. Running the sweep again with the same
+    directory skips the points that already have a result, so an interrupted
+    sweep carries on where it stopped. Points are identified by the builder
+    name, the parameters and a hash of the base and configure function, so a
+    sweep with a changed base builds its points again.
+
+    Args:
+        builder: a reactor builder such as paramak.tokamak_from_plasma.
+        base: the builder arguments shared by all the points.
+        points: the parameters of each point, see parameter_grid,
+            random_parameters and apply_parameters.
+        directory: the directory of the results and exported files.
+        workers: the number of worker processes. None uses the number of CPUs.
+        timeout: the number of seconds after which a build is stopped and
+            recorded as a timeout. None waits for every build.
+        export: the formats to export each reactor to, "brep" and/or "step".
+        configure: a function called in the worker with the builder arguments
+            of a point, returning the arguments to call the builder with. This
+            turns parameters that are not builder arguments, such as a number
+            of toroidal field coils, into shapes such as extra_cut_shapes.
+        retry_failed: builds the points that previously failed or timed out
+            again instead of skipping them.
+
+    Returns:
+        the result of each point in the order of the points.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    results_path = directory / RESULTS_FILENAME
+    builder_name = builder.__name__
+    digest = base_digest(base, configure)
+
+    _remove_incomplete_line(results_path)
+    stored = {result["key"]: result for result in load_results(directory)}
+    keys = []
+    tasks = {}
+    for parameters in points:
+        key = point_key(builder_name, parameters, digest)
+        keys.append(key)
+        previous = stored.get(key)
+        if previous is not None and (previous["status"] == "ok" or not retry_failed):
+            continue
+        tasks[key] = parameters
+    logger.info("Sweep of %s: %d points to build, %d already stored", builder_name, len(tasks), len(keys) - len(tasks))
+
+    def record(key, status, seconds, outputs, error=None):
+        result = {
+            "key": key,
+            "builder": builder_name,
+            "parameters": tasks[key],
+            "status": status,
+            "seconds": seconds,
+            "files": outputs.get("files", {}),
+            "volumes": outputs.get("volumes", {}),
+            "timings": outputs.get("timings"),
+            "error": error,
+        }
+        _append_result(results_path, result)
+        stored[key] = result
+        logger.info("Sweep point %s %s in %.1fs", key, status, seconds)
+
+    def arguments(key):
+        return (builder, apply_parameters(base, tasks[key]), directory, key, tuple(export), configure)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 and timeout is None:
+        # nothing to stop or run alongside so the points are built in this process
+        for key in tasks:
+            start = time.perf_counter()
+            try:
+                outputs = build_point(*arguments(key))
+            except Exception as error:
+                record(key, "failed", time.perf_counter() - start, {}, f"{type(error).__name__}: {error}")
+                continue
+            record(key, "ok", time.perf_counter() - start, outputs)
+        return [stored[key] for key in keys]
+
+    pending = list(tasks)
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            key = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_build_point_in_worker, args=(sender, *arguments(key)))
+            process.start()
+            # closes this process' copy of the sending end so a crashed worker reads as the end of the pipe
+            sender.close()
+            running[receiver] = (key, process, time.perf_counter())
+
+        if timeout is None:
+            wait_time = None
+        else:
+            now = time.perf_counter()
+            wait_time = max(0.0, min(start + timeout - now for _, _, start in running.values()))
+        for receiver in multiprocessing.connection.wait(list(running), timeout=wait_time):
+            key, process, start = running.pop(receiver)
+            try:
+                status, outputs, error = receiver.recv()
+            except EOFError:
+                process.join()
+                status, outputs, error = "failed", {}, f"worker exited with code {process.exitcode}"
+            receiver.close()
+            process.join()
+            record(key, status, time.perf_counter() - start, outputs, error)
+
+        if timeout is not None:
+            now = time.perf_counter()
+            for receiver, (key, process, start) in list(running.items()):
+                if now - start >= timeout:
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+                    del running[receiver]
+                    record(key, "timeout", now - start, {}, f"build took longer than {timeout} seconds")
+
+    return [stored[key] for key in keys]
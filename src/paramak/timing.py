@@ -0,0 +1,149 @@
+# Timing of the stages of a build. Stages are timed with the timed() context
+# manager, which is also usable as a decorator and does nothing unless a
+# report is being recorded. Reactor builds record a report with
+# timing_report(), which is attached to the returned Assembly, logged to the
+# "paramak" logger at debug level and passed to the registered callbacks.
+
+import functools
+import logging
+import time
+import typing
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger("paramak")
+
+
+class StageTiming(typing.NamedTuple):
+    duration: float
+    calls: int
+
+
+class TimingReport:
+    """The total duration and number of calls of each stage of a build.
+    Stage names are the path of nested stages joined with "/", for example
+    "tokamak/components/blanket_from_points/revolve".
+
+    Args:
+        name: the name of the outermost stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: typing.Dict[str, StageTiming] = {}
+
+    def start(self, stage: str):
+        """Lists the stage when it first starts so that stages are reported
+        in the order they started, with parents before their children."""
+        self.stages.setdefault(stage, StageTiming(duration=0.0, calls=0))
+
+    def add(self, stage: str, duration: float):
+        previous = self.stages.get(stage, StageTiming(duration=0.0, calls=0))
+        self.stages[stage] = StageTiming(duration=previous.duration + duration, calls=previous.calls + 1)
+
+    @property
+    def total(self) -> float:
+        """The duration of the outermost stage in seconds."""
+        return self.stages[self.name].duration if self.name in self.stages else 0.0
+
+    def as_dict(self) -> dict:
+        """Returns the report as a JSON compatible dictionary."""
+        return {
+            "name": self.name,
+            "total": self.total,
+            "stages": {stage: timing._asdict() for stage, timing in self.stages.items()},
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'stage':<60} {'calls':>6} {'seconds':>9}"]
+        for stage in self.stages:
+            depth = stage.count("/")
+            label = "  " * depth + stage.split("/")[-1]
+            timing = self.stages[stage]
+            lines.append(f"{label:<60} {timing.calls:>6} {timing.duration:>9.3f}")
+        return "\n".join(lines)
+
+
+_active_report: ContextVar[typing.Optional[TimingReport]] = ContextVar("paramak_timing_report", default=None)
+_stage_path: ContextVar[typing.Tuple[str, ...]] = ContextVar("paramak_stage_path", default=())
+_callbacks: typing.List[typing.Callable[[TimingReport], None]] = []
+
+
+@contextmanager
+def timed(stage: str):
+    """Times the enclosed code as a stage of the report being recorded,
+    nested within the enclosing stages. Recursive calls of a stage are timed
+    once, as part of the outermost call."""
+    report = _active_report.get()
+    if report is None or _stage_path.get()[-1:] == (stage,):
+        yield
+        return
+
+    path = _stage_path.get() + (stage,)
+    token = _stage_path.set(path)
+    report.start("/".join(path))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.add("/".join(path), time.perf_counter() - start)
+        _stage_path.reset(token)
+
+
+@contextmanager
+def timing_report(name: str):
+    """Records the timings of the stages within as a new report, which is
+    logged and passed to the timing callbacks once complete. Within another
+    report the enclosed code is timed as a stage of that report instead.
+
+    Args:
+        name: the name of the outermost stage.
+
+    Yields:
+        the TimingReport being recorded.
+    """
+    report = _active_report.get()
+    if report is not None:
+        with timed(name):
+            yield report
+        return
+
+    report = TimingReport(name)
+    token = _active_report.set(report)
+    try:
+        with timed(name):
+            yield report
+    finally:
+        _active_report.reset(token)
+
+    logger.debug("Timings of %s\n%s", name, report)
+    for callback in _callbacks:
+        callback(report)
+
+
+def record_timings(builder: typing.Callable) -> typing.Callable:
+    """Decorates a reactor builder so that each call records a timing report,
+    which is attached as the timings attribute of the returned Assembly. The
+    manifest returned while a PartWriter is active has no timings, the report
+    still goes to the timing callbacks."""
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        with timing_report(builder.__name__) as report:
+            assembly = builder(*args, **kwargs)
+            if not isinstance(assembly, dict):
+                assembly.timings = report
+        return assembly
+
+    return wrapper
+
+
+def add_timing_callback(callback: typing.Callable[[TimingReport], None]):
+    """Registers a function to call with the TimingReport of every completed
+    reactor build."""
+    _callbacks.append(callback)
+
+
+def remove_timing_callback(callback: typing.Callable[[TimingReport], None]):
+    """Stops calling a function registered with add_timing_callback."""
+    _callbacks.remove(callback)
@@ -1,7 +1,19 @@
+import io
 import typing
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 
-from cadquery import Workplane
+import numpy as np
+from cadquery import Color, Compound, Edge, Location, Plane, Shape, Vector, Wire, Workplane
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeEdge, BRepBuilderAPI_MakeWire
+from OCP.GC import GC_MakeArcOfCircle
+from OCP.GeomAPI import GeomAPI_Interpolate
+from OCP.gp import gp_Pnt
+from OCP.Precision import Precision
+from OCP.TColgp import TColgp_HArray1OfPnt
+from OCP.TopTools import TopTools_ListOfShape
+
+from .timing import timed
 
 
 class LayerType(Enum):
@@ -10,6 +22,156 @@ class LayerType(Enum):
     PLASMA = "plasma"
 
 
+# the fidelities of the builders, "preview" trades accuracy for speed when only a picture of the shapes is needed
+FIDELITIES = ("full", "preview")
+# the largest number of points of the plasma and blanket curves of a preview
+PREVIEW_NUM_POINTS = 16
+
+
+def is_preview(fidelity: str) -> bool:
+    """Returns True for the "preview" fidelity and False for "full"."""
+    if fidelity not in FIDELITIES:
+        raise ValueError(f"fidelity should be one of {FIDELITIES}, not {fidelity!r}")
+    return fidelity == "preview"
+
+
+class Profile(typing.NamedTuple):
+    """A closed 2D profile in the (R, Z) plane, such as the cross section
+    that a builder revolves or extrudes, described without OCC.
+
+    Attributes:
+        points: the (R, Z) coordinates of the points with shape (n, 2).
+        connections: the connection from each point to the next, either
+            "straight", "spline" or "circle", with shape (n,). The last point
+            connects back to the first.
+        holes: profiles of the regions removed from within this profile.
+    """
+
+    points: np.ndarray
+    connections: np.ndarray
+    holes: typing.Tuple["Profile", ...] = ()
+
+    @classmethod
+    def from_points(cls, points, holes: typing.Tuple["Profile", ...] = ()) -> "Profile":
+        """Makes a profile from a list of points [[R1, Z1, connection1], ...]
+        that does not repeat the first point at the end."""
+        return cls(
+            points=np.array([point[:2] for point in points], dtype=float),
+            connections=np.array([point[2] for point in points]),
+            holes=holes,
+        )
+
+    def to_points(self) -> list:
+        """Returns the points as a list [[R1, Z1, connection1], ...] closed by
+        repeating the first point, as used by create_wire_workplane_from_points."""
+        points = [[R, Z, connection] for (R, Z), connection in zip(self.points.tolist(), self.connections.tolist())]
+        return points + [points[0]]
+
+    def straightened(self) -> "Profile":
+        """Returns the profile with straight lines in place of its splines,
+        which are faster to revolve, cut and tessellate."""
+        return self._replace(
+            connections=np.where(self.connections == "spline", "straight", self.connections),
+            holes=tuple(hole.straightened() for hole in self.holes),
+        )
+
+    def as_dict(self) -> dict:
+        """Returns the profile as a JSON compatible dictionary."""
+        return {
+            "points": self.points.tolist(),
+            "connections": self.connections.tolist(),
+            "holes": [hole.as_dict() for hole in self.holes],
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "Profile":
+        """Recreates a profile from the dictionary returned by as_dict."""
+        return cls(
+            points=np.array(values["points"], dtype=float).reshape(-1, 2),
+            connections=np.array(values["connections"]),
+            holes=tuple(cls.from_dict(hole) for hole in values["holes"]),
+        )
+
+
+def _segment_distances(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """The distances of the points from the line segments between starts and
+    ends, broadcasting over the leading dimensions."""
+    direction = ends - starts
+    length_squared = np.sum(direction**2, axis=-1)
+    projection = np.sum((points - starts) * direction, axis=-1) / np.where(length_squared > 0, length_squared, 1)
+    closest = starts + np.clip(projection, 0, 1)[..., np.newaxis] * direction
+    return np.linalg.norm(points - closest, axis=-1)
+
+
+def _curvature_angles(
+    curves: typing.Callable[[np.ndarray], np.ndarray], start_angle: float, stop_angle: float, tolerance: float
+) -> np.ndarray:
+    """Spaces angles so that the chord deviation estimated from the curvature,
+    the curvature times the squared chord length over eight, is equal to the
+    tolerance along the curves."""
+    dense_angles = np.linspace(start_angle, stop_angle, 2001)
+    points = curves(dense_angles)
+    steps = np.diff(points, axis=1)
+    lengths = np.linalg.norm(steps, axis=-1)
+    headings = np.arctan2(steps[..., 1], steps[..., 0])
+    turns = np.abs(np.angle(np.exp(1j * np.diff(headings, axis=1))))
+    curvatures = np.zeros_like(lengths)
+    curvatures[:, 1:] = turns / np.maximum((lengths[:, :-1] + lengths[:, 1:]) / 2, 1e-12)
+    curvatures[:, :-1] = np.maximum(curvatures[:, :-1], curvatures[:, 1:])
+    # the number of chords needed along each dense step, the largest of all the curves
+    density = np.max(lengths * np.sqrt(curvatures / (8 * tolerance)), axis=0)
+    chords = np.concatenate(([0], np.cumsum(density)))
+    intervals = max(4, int(np.ceil(chords[-1])))
+    return np.interp(np.linspace(0, chords[-1], intervals + 1), chords, dense_angles)
+
+
+def adaptive_angles(
+    curves: typing.Callable[[np.ndarray], np.ndarray],
+    start_angle: float,
+    stop_angle: float,
+    tolerance: float,
+    max_points: int = 5000,
+) -> np.ndarray:
+    """Finds the angles at which to sample parametric curves so that the
+    straight chords between consecutive points stay within the tolerance of
+    the curves, using few points. The angles are first spaced by the
+    curvature of the curves, so points gather at the tightly curved parts,
+    such as the corners of a triangular plasma, and few points are used on
+    flat parts. Any chord that still deviates too far is then halved until
+    the tolerance is met. The tolerance only bounds the chords, a spline
+    through the points is not checked against it.
+
+    Args:
+        curves: returns the (x, y) points of each curve at an array of n
+            angles, with shape (n_curves, n, 2).
+        start_angle: the first angle in degrees.
+        stop_angle: the last angle in degrees.
+        tolerance: the maximum distance between a chord and the curve.
+        max_points: the maximum number of angles.
+
+    Returns:
+        the increasing angles in degrees from start_angle to stop_angle.
+    """
+    if tolerance <= 0:
+        raise ValueError(f"The tolerance should be positive, not {tolerance}")
+
+    angles = _curvature_angles(curves, start_angle, stop_angle, tolerance)
+    points = curves(angles)
+    # the deviation of each chord is measured at its quarter, middle and three quarter points
+    fractions = np.array([0.25, 0.5, 0.75])
+    while True:
+        if len(angles) > max_points:
+            raise ValueError(f"More than {max_points} points are needed to reach the tolerance of {tolerance}")
+        samples = angles[:-1, np.newaxis] + fractions * np.diff(angles)[:, np.newaxis]
+        sample_points = curves(samples.ravel()).reshape(points.shape[0], len(samples), len(fractions), 2)
+        deviations = _segment_distances(sample_points, points[:, :-1, np.newaxis, :], points[:, 1:, np.newaxis, :])
+        split = np.flatnonzero(np.any(deviations > tolerance, axis=(0, 2)))
+        if len(split) == 0:
+            return angles
+        angles = np.insert(angles, split + 1, samples[split, 1])
+        points = np.insert(points, split + 1, sample_points[:, split, 1], axis=1)
+
+
 def instructions_from_points(points):
     # obtains the first two values of the points list
     XZ_points = [(p[0], p[1]) for p in points]
@@ -56,34 +218,125 @@ def create_wire_workplane_from_instructions(
     return workplane.close()
 
 
+@timed("create_wire_workplane_from_points")
 def create_wire_workplane_from_points(points, plane, origin=(0, 0, 0), obj=None):
+    """Makes a Workplane with a closed wire through a list of points
+    [[x1, y1, connection1], ...] that repeats the first point at the end, see
+    create_wire_workplane_from_arrays."""
+    if points[-1][:2] == points[0][:2]:
+        points = points[:-1]
+    return create_wire_workplane_from_arrays(
+        points=np.array([point[:2] for point in points], dtype=float),
+        connections=np.array([point[2] for point in points]),
+        plane=plane,
+        origin=origin,
+        obj=obj,
+    )
+
+
+def _line_edges(points: typing.List[gp_Pnt]) -> list:
+    # coincident points are skipped, as Workplane.polyline does
+    return [
+        BRepBuilderAPI_MakeEdge(start, end).Edge()
+        for start, end in zip(points[:-1], points[1:])
+        if start.Distance(end) > Precision.Confusion_s()
+    ]
 
-    workplane = Workplane(plane, origin=origin, obj=obj)  # offset=extrusion_offset
-
-
-    all_straight = all(entry[-1] == "straight" for entry in points)
-    all_spline = all(entry[-1] == "spline" for entry in points)
 
-    if all_straight:
-        entry_values = [entry[:2] for entry in points[:-1]]
-        result = workplane.polyline(entry_values).close()
-    elif all_spline:
-        entry_values = [entry[:2] for entry in points[:-1]]
-        result = workplane.spline(
-            entry_values, makeWire=True, tol=1e-1, periodic=True
-        )  # period smooths out the connecting joint
+def _spline_edge(points: typing.List[gp_Pnt], periodic: bool, tolerance: float):
+    array = TColgp_HArray1OfPnt(1, len(points))
+    for index, point in enumerate(points):
+        array.SetValue(index + 1, point)
+    interpolation = GeomAPI_Interpolate(array, periodic, tolerance)
+    interpolation.Perform()
+    if not interpolation.IsDone():
+        raise ValueError("B-spline interpolation failed")
+    return BRepBuilderAPI_MakeEdge(interpolation.Curve()).Edge()
+
+
+def create_wire_workplane_from_arrays(
+    points: np.ndarray, connections: np.ndarray, plane, origin=(0, 0, 0), obj=None
+) -> Workplane:
+    """Makes a Workplane with a closed wire through the points, ready to be
+    revolved or extruded. The OCC edges are built directly from the arrays,
+    with the same geometry as drawing them with the Workplane spline,
+    polyline and threePointArc methods but without the Workplane objects made
+    by each of those calls.
+
+    A profile of only splines is a single periodic spline. Otherwise each run
+    of points with the same connection is joined to the first point of the
+    next run by straight lines, a spline through the run, or an arc through
+    the first three points of the run.
+
+    Args:
+        points: the (x, y) coordinates of the points in the plane with shape
+            (n, 2), not repeating the first point at the end.
+        connections: the connection from each point to the next, either
+            "straight", "spline" or "circle", with shape (n,). The last point
+            connects back to the first.
+        plane: the name of the plane of the points, such as "XZ".
+        origin: the origin of the plane.
+        obj: an object to add to the Workplane stack.
+    """
+    workplane = Workplane(plane, origin=origin, obj=obj)
+    points = np.asarray(points, dtype=float)
+    connections = np.asarray(connections)
+
+    # the world coordinates of the points, as Plane.toWorldCoords
+    world_points = (
+        np.array(workplane.plane.origin.toTuple())
+        + points[:, :1] * np.array(workplane.plane.xDir.toTuple())
+        + points[:, 1:2] * np.array(workplane.plane.yDir.toTuple())
+    )
+    occ_points = [gp_Pnt(*point) for point in world_points.tolist()]
+    closed_points = occ_points + occ_points[:1]
+
+    if np.all(connections == "spline"):
+        # the periodic spline smooths out the joint at the first point
+        edges = [_spline_edge(occ_points, periodic=True, tolerance=1e-1)]
     else:
-        instructions = instructions_from_points(points)
-
-        result = create_wire_workplane_from_instructions(
-            instructions=instructions,
-            workplane=workplane,
-        )
-
-    return result
-
+        starts = [0] + (np.flatnonzero(connections[1:] != connections[:-1]) + 1).tolist()
+        edges = []
+        for start, end in zip(starts, starts[1:] + [len(connections)]):
+            run = closed_points[start : end + 1]
+            if connections[start] == "spline":
+                edges.append(_spline_edge(run, periodic=False, tolerance=1e-6))
+            elif connections[start] == "circle":
+                edges.append(BRepBuilderAPI_MakeEdge(GC_MakeArcOfCircle(*run[:3]).Value()).Edge())
+            else:
+                edges.extend(_line_edges(run))
+
+    edge_list = TopTools_ListOfShape()
+    for edge in edges:
+        edge_list.Append(edge)
+    wire_builder = BRepBuilderAPI_MakeWire()
+    wire_builder.Add(edge_list)
+    wire_builder.Build()
+    if not wire_builder.IsDone():
+        raise ValueError(f"The edges do not make a wire, BRepBuilderAPI_WireError {wire_builder.Error()}")
+    return workplane.newObject([Wire(wire_builder.Wire())]).toPending()
+
+
+@timed("rotate_solid")
+def rotate_solid(angles: typing.Sequence[float], solid: Workplane, fuse: bool = True) -> Workplane:
+    """Makes copies of the solid rotated around the Z axis by each angle.
+
+    Args:
+        angles: the rotation angles in degrees.
+        solid: the workplane to copy.
+        fuse: joins the copies together in a single solid. Otherwise the
+            copies are located instances of the solid in a compound, which
+            share its geometry.
+
+    Returns:
+        a Workplane with the rotated copies.
+    """
+    if not fuse:
+        instances = [
+            shape.moved(Location(Vector(0, 0, 0), Vector(0, 0, 1), angle)) for angle in angles for shape in solid.vals()
+        ]
+        return Workplane(solid.plane).newObject([Compound.makeCompound(instances)])
 
-def rotate_solid(angles: typing.Sequence[float], solid: Workplane) -> Workplane:
     rotation_axis = {
         "X": [(-1, 0, 0), (1, 0, 0)],
         "-X": [(1, 0, 0), (-1, 0, 0)],
@@ -105,6 +358,204 @@ def rotate_solid(angles: typing.Sequence[float], solid: Workplane) -> Workplane:
     return solid
 
 
+def workplane_to_bytes(workplane: Workplane) -> typing.Tuple[bytes, dict]:
+    """Serialises the objects of a Workplane to binary BREP bytes, which
+    round trip the geometry exactly, and a JSON compatible dictionary of the
+    Workplane plane, name, color and the profiles it was revolved from.
+    """
+    brep = io.BytesIO()
+    Compound.makeCompound(workplane.vals()).exportBin(brep)
+    return brep.getvalue(), workplane_metadata(workplane)
+
+
+def workplane_metadata(workplane: Workplane) -> dict:
+    """Returns the JSON compatible dictionary of the Workplane plane, name,
+    color and profiles that workplane_to_bytes stores with the BREP bytes."""
+    color = getattr(workplane, "color", None)
+    metadata = {
+        "plane": [workplane.plane.origin.toTuple(), workplane.plane.xDir.toTuple(), workplane.plane.zDir.toTuple()],
+        "name": getattr(workplane, "name", None),
+        "color": list(color.toTuple()) if isinstance(color, Color) else color,
+        "color_is_cadquery_color": isinstance(color, Color),
+    }
+    profiles = getattr(workplane, "profiles", None)
+    if profiles is not None:
+        metadata["profiles"] = [profile.as_dict() for profile in profiles]
+        metadata["rotation_angle"] = workplane.rotation_angle
+    return metadata
+
+
+def workplane_from_bytes(brep: bytes, metadata: dict) -> Workplane:
+    """Recreates a Workplane serialised with workplane_to_bytes."""
+    return workplane_from_compound(Shape.importBin(io.BytesIO(brep)), metadata)
+
+
+def workplane_from_compound(compound: Compound, metadata: dict) -> Workplane:
+    """Makes a Workplane of the shapes of a compound with the plane, name,
+    color and profiles of the metadata from workplane_to_bytes."""
+    plane = Plane(*[tuple(vector) for vector in metadata["plane"]])
+    workplane = Workplane(plane).newObject(list(compound))
+    if metadata["name"] is not None:
+        workplane.name = metadata["name"]
+    if metadata["color_is_cadquery_color"]:
+        workplane.color = Color(*metadata["color"])
+    elif metadata["color"] is not None:
+        workplane.color = tuple(metadata["color"])
+    if "profiles" in metadata:
+        workplane.profiles = tuple(Profile.from_dict(profile) for profile in metadata["profiles"])
+        workplane.rotation_angle = metadata["rotation_angle"]
+    return workplane
+
+
+def copy_workplane(workplane: Workplane) -> Workplane:
+    """Returns a Workplane with deep copies of the objects of the workplane
+    and the same plane, name, color and profiles. The copy goes through the
+    binary BREP format as, unlike Shape.copy, it keeps located instances
+    sharing their geometry."""
+    return workplane_from_bytes(*workplane_to_bytes(workplane))
+
+
+def build_serialized(builder: typing.Callable, kwargs: dict) -> typing.Tuple[bytes, dict]:
+    """Builds a Workplane and serialises it so that it can be returned from a
+    worker process."""
+    return workplane_to_bytes(builder(**kwargs))
+
+
+@timed("build_workplanes")
+def build_workplanes(
+    tasks: typing.Sequence[typing.Tuple[typing.Callable, dict]], workers: typing.Optional[int] = None
+) -> typing.List[Workplane]:
+    """Builds the Workplane of each (builder, kwargs) task. With more than one
+    worker the tasks are built concurrently in a process pool and the results
+    are returned as exact binary BREP copies, so the Workplanes are identical
+    to building the tasks one after another.
+
+    Args:
+        tasks: the module level builder functions and the keyword arguments
+            to call them with.
+        workers: the number of worker processes. None or 1 builds the tasks
+            in this process.
+
+    Returns:
+        the Workplanes in the same order as the tasks.
+    """
+    from .assemblies.reactor_builder import active_component_store
+
+    store = active_component_store.get()
+    if store is None:
+        return _build_workplanes(tasks, workers)
+
+    keys = [store.task_key(builder, kwargs) for builder, kwargs in tasks]
+    names = [kwargs.get("name", builder.__name__) for builder, kwargs in tasks]
+    workplanes = [store.find(key, name) for key, name in zip(keys, names)]
+    missing = [index for index, workplane in enumerate(workplanes) if workplane is None]
+    for index, workplane in zip(missing, _build_workplanes([tasks[index] for index in missing], workers)):
+        store.keep(keys[index], names[index], workplane)
+        store.rebuilt.append(names[index])
+        workplanes[index] = workplane
+    return workplanes
+
+
+def _build_workplanes(
+    tasks: typing.Sequence[typing.Tuple[typing.Callable, dict]], workers: typing.Optional[int] = None
+) -> typing.List[Workplane]:
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        return [builder(**kwargs) for builder, kwargs in tasks]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(build_serialized, builder, kwargs) for builder, kwargs in tasks]
+        return [workplane_from_bytes(*future.result()) for future in futures]
+
+
+class ShapeBounds(typing.NamedTuple):
+    """The axis aligned bounding box of a shape and the minimum and maximum
+    distance of the shape from the Z axis."""
+
+    min_corner: typing.Tuple[float, float, float]
+    max_corner: typing.Tuple[float, float, float]
+    min_radius: float
+    max_radius: float
+
+
+def shape_bounds(shape: Shape) -> ShapeBounds:
+    """Finds the bounds of the shape. The minimum radius is exact, zero when
+    the shape contains the Z axis, while the maximum radius is bounded from
+    above using the bounding box."""
+    bounding_box = shape.BoundingBox()
+    axis = Edge.makeLine(Vector(0, 0, bounding_box.zmin - 1), Vector(0, 0, bounding_box.zmax + 1))
+    max_x = max(abs(bounding_box.xmin), abs(bounding_box.xmax))
+    max_y = max(abs(bounding_box.ymin), abs(bounding_box.ymax))
+    return ShapeBounds(
+        min_corner=(bounding_box.xmin, bounding_box.ymin, bounding_box.zmin),
+        max_corner=(bounding_box.xmax, bounding_box.ymax, bounding_box.zmax),
+        min_radius=shape.distance(axis),
+        max_radius=(max_x**2 + max_y**2) ** 0.5,
+    )
+
+
+def bounds_overlap(bounds: ShapeBounds, other: ShapeBounds, tolerance: float = 1e-6) -> bool:
+    """Checks if two shapes could intersect by comparing their axis aligned
+    bounding boxes and the annuli swept by revolving them around the Z axis.
+    Returns False only when the shapes certainly do not intersect."""
+    for minimum, maximum, other_minimum, other_maximum in zip(
+        bounds.min_corner, bounds.max_corner, other.min_corner, other.max_corner
+    ):
+        if minimum > other_maximum + tolerance or other_minimum > maximum + tolerance:
+            return False
+    return bounds.min_radius <= other.max_radius + tolerance and other.min_radius <= bounds.max_radius + tolerance
+
+
+@timed("cut_workplanes")
+def cut_workplanes(
+    workplanes: typing.Sequence[Workplane], cutters: typing.Sequence[Workplane], clean: bool = True
+) -> typing.List[Workplane]:
+    """Cuts the cutters from each of the workplanes, skipping the cutters that
+    can not intersect a workplane and cutting the rest with a single boolean
+    operation per workplane.
+
+    Args:
+        workplanes: the workplanes to cut.
+        cutters: the workplanes to cut away.
+        clean: removes unwanted edges from the faces of the cut solids.
+
+    Returns:
+        a new Workplane with the cut shape for each workplane, or the original
+        workplane if none of the cutters can intersect it.
+    """
+    from .assemblies.reactor_builder import active_component_store
+
+    tools = [tool for cutter in cutters for tool in cutter.vals()]
+    tool_bounds = [shape_bounds(tool) for tool in tools]
+
+    cut_shapes = []
+    for workplane in workplanes:
+        solid = workplane.findSolid()
+        bounds = shape_bounds(solid)
+        overlapping_tools = [tool for tool, other in zip(tools, tool_bounds) if bounds_overlap(bounds, other)]
+        if len(overlapping_tools) == 0:
+            cut_shapes.append(workplane)
+            continue
+
+        store = active_component_store.get()
+        if store is not None:
+            key = store.cut_key(workplane, overlapping_tools, clean)
+            name = f"{store.components.get(id(workplane), ('', 'workplane'))[1]}/cut"
+            cut_workplane = store.find(key, name)
+            if cut_workplane is not None:
+                cut_shapes.append(cut_workplane)
+                continue
+
+        cut_shape = solid.cut(*overlapping_tools)
+        if clean:
+            cut_shape = cut_shape.clean()
+        cut_workplane = workplane.newObject([cut_shape])
+        if store is not None:
+            store.keep(key, name, cut_workplane)
+            store.rebuilt.append(name)
+        cut_shapes.append(cut_workplane)
+    return cut_shapes
+
+
 def sum_up_to_gap_before_plasma(radial_build):
     total_sum = 0
     for i, item in enumerate(radial_build):
@@ -0,0 +1,214 @@
+# Volumes and surface areas of solids revolved or extruded from 2D profiles,
+# computed from the profile with Pappus' theorem instead of integrating the
+# 3D shape with OCC. The boundary integrals use Gauss-Legendre quadrature on
+# each straight line, circular arc and cubic spline piece of the profile.
+
+import math
+import typing
+
+import numpy as np
+from cadquery import Shape, Workplane
+from OCP.BRepGProp import BRepGProp
+from OCP.GProp import GProp_GProps
+
+from .utils import Profile
+
+# quadrature nodes per piece, exact for the polynomials of the straight and
+# spline pieces and accurate to machine precision for the short arcs
+_GAUSS_NODES, _GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(8)
+
+
+class ProfileIntegrals(typing.NamedTuple):
+    """Integrals over a profile, positive for either point ordering.
+
+    Attributes:
+        area: the area of the profile.
+        moment: the integral of R over the area, the area times the R of
+            its centroid.
+        perimeter: the length of the boundary.
+        perimeter_moment: the integral of R along the boundary.
+    """
+
+    area: float
+    moment: float
+    perimeter: float
+    perimeter_moment: float
+
+
+def _line_pieces(points: np.ndarray):
+    """Positions and derivatives at the quadrature nodes of straight lines
+    joining each point to the next."""
+    start, end = points[:-1], points[1:]
+    fraction = (_GAUSS_NODES + 1) / 2
+    positions = start[:, np.newaxis, :] + fraction[np.newaxis, :, np.newaxis] * (end - start)[:, np.newaxis, :]
+    derivatives = np.broadcast_to((end - start)[:, np.newaxis, :] / 2, positions.shape)
+    return positions.reshape(-1, 2), derivatives.reshape(-1, 2), np.tile(_GAUSS_WEIGHTS, len(start))
+
+
+def _spline_pieces(points: np.ndarray, periodic: bool):
+    """Positions and derivatives at the quadrature nodes of the cubic spline
+    through the points, parameterised by chord length like the OCC splines."""
+    from scipy.interpolate import CubicSpline
+
+    if len(points) < 3:
+        return _line_pieces(points)
+    parameters = np.concatenate([[0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    spline = CubicSpline(parameters, points, axis=0, bc_type="periodic" if periodic else "not-a-knot")
+    half_widths = np.diff(parameters) / 2
+    nodes = (parameters[:-1] + half_widths)[:, np.newaxis] + half_widths[:, np.newaxis] * _GAUSS_NODES
+    weights = half_widths[:, np.newaxis] * _GAUSS_WEIGHTS
+    return spline(nodes.ravel()), spline(nodes.ravel(), 1), weights.ravel()
+
+
+def _arc_pieces(points: np.ndarray):
+    """Positions and derivatives at the quadrature nodes of the circular arc
+    through three points."""
+    (ax, ay), (bx, by), (cx, cy) = points[:3]
+    determinant = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    center = np.array(
+        [
+            ((ax**2 + ay**2) * (by - cy) + (bx**2 + by**2) * (cy - ay) + (cx**2 + cy**2) * (ay - by)),
+            ((ax**2 + ay**2) * (cx - bx) + (bx**2 + by**2) * (ax - cx) + (cx**2 + cy**2) * (bx - ax)),
+        ]
+    ) / determinant
+    radius = np.hypot(*(points[0] - center))
+    start, middle, end = [math.atan2(y - center[1], x - center[0]) for x, y in points[:3]]
+    # the arc runs from the start angle to the end angle through the middle angle
+    sweep = (end - start) % (2 * math.pi)
+    if (middle - start) % (2 * math.pi) > sweep:
+        sweep -= 2 * math.pi
+    angles = start + sweep * (_GAUSS_NODES + 1) / 2
+    positions = center + radius * np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    derivatives = radius * sweep / 2 * np.stack((-np.sin(angles), np.cos(angles)), axis=1)
+    return positions, derivatives, _GAUSS_WEIGHTS
+
+
+def _loop_integrals(profile: Profile) -> np.ndarray:
+    """The signed area, signed moment, perimeter and perimeter moment of a
+    single closed loop, following the connections as the builders do."""
+    points = np.asarray(profile.points, dtype=float)
+    connections = list(profile.connections)
+    closed = np.vstack((points, points[:1]))
+
+    if all(connection == "spline" for connection in connections):
+        pieces = [_spline_pieces(closed, periodic=True)]
+    elif all(connection == "straight" for connection in connections):
+        pieces = [_line_pieces(closed)]
+    else:
+        # groups the runs of points with the same connection, each run ending
+        # on the first point of the next run
+        pieces = []
+        start = 0
+        for index in range(1, len(connections) + 1):
+            if index == len(connections) or connections[index] != connections[start]:
+                run = closed[start : index + 1]
+                if connections[start] == "spline":
+                    pieces.append(_spline_pieces(run, periodic=False))
+                elif connections[start] == "circle":
+                    pieces.append(_arc_pieces(run))
+                else:
+                    pieces.append(_line_pieces(run))
+                start = index
+
+    positions = np.concatenate([piece[0] for piece in pieces])
+    derivatives = np.concatenate([piece[1] for piece in pieces])
+    weights = np.concatenate([piece[2] for piece in pieces])
+    R, dZ = positions[:, 0], derivatives[:, 1]
+    speed = np.hypot(derivatives[:, 0], derivatives[:, 1])
+    return np.array(
+        [
+            np.sum(weights * R * dZ),
+            np.sum(weights * R**2 / 2 * dZ),
+            np.sum(weights * speed),
+            np.sum(weights * R * speed),
+        ]
+    )
+
+
+def profile_integrals(profile: Profile) -> ProfileIntegrals:
+    """Computes the area, moment and perimeter integrals of a profile, with
+    its holes removed."""
+    area, moment, perimeter, perimeter_moment = 0.0, 0.0, 0.0, 0.0
+    for sign, loop in [(1, profile)] + [(-1, hole) for hole in profile.holes]:
+        loop_area, loop_moment, loop_perimeter, loop_perimeter_moment = _loop_integrals(loop)
+        # the moment has the same sign as the area for profiles at positive R
+        orientation = 1 if loop_area >= 0 else -1
+        area += sign * orientation * loop_area
+        moment += sign * orientation * loop_moment
+        perimeter += loop_perimeter
+        perimeter_moment += loop_perimeter_moment
+    return ProfileIntegrals(float(area), float(moment), float(perimeter), float(perimeter_moment))
+
+
+def revolved_volume(profile: Profile, rotation_angle: float = 360.0) -> float:
+    """The volume of the solid made by revolving the profile around the Z
+    axis, from Pappus' centroid theorem.
+
+    Args:
+        profile: the (R, Z) profile, with R >= 0.
+        rotation_angle: the angle of the revolve in degrees.
+    """
+    return math.radians(min(rotation_angle, 360.0)) * profile_integrals(profile).moment
+
+
+def revolved_surface_area(profile: Profile, rotation_angle: float = 360.0) -> float:
+    """The surface area of the solid made by revolving the profile around the
+    Z axis, from Pappus' centroid theorem, including the two profile faces at
+    the ends of partial revolves.
+
+    Args:
+        profile: the (R, Z) profile, with R >= 0.
+        rotation_angle: the angle of the revolve in degrees.
+    """
+    integrals = profile_integrals(profile)
+    end_faces = 2 * integrals.area if rotation_angle < 360.0 else 0.0
+    return math.radians(min(rotation_angle, 360.0)) * integrals.perimeter_moment + end_faces
+
+
+def extruded_volume(profile: Profile, distance: float) -> float:
+    """The volume of the solid made by extruding the profile by the distance."""
+    return profile_integrals(profile).area * distance
+
+
+def extruded_surface_area(profile: Profile, distance: float) -> float:
+    """The surface area of the solid made by extruding the profile by the
+    distance, including the two profile faces at its ends."""
+    integrals = profile_integrals(profile)
+    return integrals.perimeter * distance + 2 * integrals.area
+
+
+def shape_volume(shape: Shape, tolerance: float = 1e-10) -> float:
+    """The volume of a shape integrated adaptively by OCC. Shape.Volume uses a
+    fixed number of integration points, which can be a few percent out on the
+    spline surfaces of the plasma and blankets. The tolerance is a target for
+    the relative error, which OCC only meets to about a thousand times it."""
+    properties = GProp_GProps()
+    BRepGProp.VolumeProperties_s(shape.wrapped, properties, tolerance, False)
+    return properties.Mass()
+
+
+def workplane_volume(workplane: Workplane, cross_check_tolerance: typing.Optional[float] = None) -> float:
+    """The volume of the solids of a Workplane. The builders that revolve a
+    profile attach it to their Workplane as the profiles and rotation_angle
+    attributes, and the volume is then the sum of the revolved volumes of the
+    profiles. Otherwise, such as after a cut, the volume is integrated by OCC.
+
+    Args:
+        workplane: the Workplane to find the volume of.
+        cross_check_tolerance: if set, also integrates the volume with OCC and
+            raises a ValueError when the two differ by more than this fraction.
+    """
+    profiles = getattr(workplane, "profiles", None)
+    if profiles is None:
+        return sum(shape_volume(shape) for shape in workplane.vals() if isinstance(shape, Shape))
+
+    volume = sum(revolved_volume(profile, workplane.rotation_angle) for profile in profiles)
+    if cross_check_tolerance is not None:
+        occ_volume = sum(shape_volume(shape) for shape in workplane.vals() if isinstance(shape, Shape))
+        if abs(volume - occ_volume) > cross_check_tolerance * abs(occ_volume):
+            msg = (
+                f"The volume of {getattr(workplane, 'name', 'the workplane')} from its profiles, {volume}, differs "
+                f"from the OCC volume {occ_volume} by more than the tolerance {cross_check_tolerance}"
+            )
+            raise ValueError(msg)
+    return volume
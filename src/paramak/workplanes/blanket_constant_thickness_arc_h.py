@@ -2,25 +2,21 @@ import typing
 
 import cadquery as cq
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays
 
 
-def blanket_constant_thickness_arc_h(
+def blanket_constant_thickness_arc_h_profile(
     inner_mid_point: typing.Tuple[float, float],
     inner_upper_point: typing.Tuple[float, float],
     inner_lower_point: typing.Tuple[float, float],
     thickness: float,
-    rotation_angle=90,
-    plane="XZ",
-    origin=(0, 0, 0),
-    obj=None,
-    color: typing.Tuple[float, float, float, typing.Optional[float]] = (
-        0.0,
-        0.333,
-        0.0,
-    ),
-    name="blanket_constant_thickness_arc_h",
-):
+) -> Profile:
+    """The 2D profile of blanket_constant_thickness_arc_h, computed without
+    OCC. The inner arc passes through the three inner points and the outer
+    arc is offset horizontally by the thickness."""
+
     points = [
         (inner_upper_point[0], inner_upper_point[1], "circle"),
         (inner_mid_point[0], inner_mid_point[1], "circle"),
@@ -42,11 +38,39 @@ def blanket_constant_thickness_arc_h(
         ),
     ]
 
-    points.append(points[0])
+    return Profile.from_points(points)
+
+
+@cached_builder
+def blanket_constant_thickness_arc_h(
+    inner_mid_point: typing.Tuple[float, float],
+    inner_upper_point: typing.Tuple[float, float],
+    inner_lower_point: typing.Tuple[float, float],
+    thickness: float,
+    rotation_angle=90,
+    plane="XZ",
+    origin=(0, 0, 0),
+    obj=None,
+    color: typing.Tuple[float, float, float, typing.Optional[float]] = (
+        0.0,
+        0.333,
+        0.0,
+    ),
+    name="blanket_constant_thickness_arc_h",
+):
+    profile = blanket_constant_thickness_arc_h_profile(
+        inner_mid_point=inner_mid_point,
+        inner_upper_point=inner_upper_point,
+        inner_lower_point=inner_lower_point,
+        thickness=thickness,
+    )
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
 
-    solid = wire.revolve(rotation_angle)
+    with timed("revolve"):
+        solid = wire.revolve(rotation_angle)
     solid.name = name
     solid.color = cq.Color(*color)
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
@@ -1,11 +1,10 @@
 import warnings
 import typing
 
-from ..utils import create_wire_workplane_from_points
-import mpmath
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import PREVIEW_NUM_POINTS, Profile, adaptive_angles, create_wire_workplane_from_arrays, is_preview
 import numpy as np
-import sympy as sp
-from scipy.interpolate import interp1d
 
 
 def make_callable(attribute, start_angle, stop_angle):
@@ -28,6 +27,9 @@ def make_callable(attribute, start_angle, stop_angle):
             # no list of angles is given
             offset_values = attribute
             list_of_angles = np.linspace(start_angle, stop_angle, len(offset_values), endpoint=True)
+        # scipy is imported when first needed as it is slow to import
+        from scipy.interpolate import interp1d
+
         interpolated_values = interp1d(list_of_angles, offset_values)
 
     def fun(theta):
@@ -41,6 +43,7 @@ def make_callable(attribute, start_angle, stop_angle):
     return fun
 
 
+@timed("find_points")
 def find_points(
     start_angle,
     stop_angle,
@@ -55,171 +58,247 @@ def find_points(
     num_points,
     allow_overlapping_shape,
     angles=None,
+    tolerance=None,
 ):
-    # create array of angles theta
-    if angles is None:
-        thetas = np.linspace(
-            start_angle,
-            stop_angle,
-            num=num_points,
-            endpoint=True,
-        )
-    else:
-        thetas = angles
-
-    # create inner points
-    inner_offset = make_callable(offset_from_plasma, start_angle, stop_angle)
-    inner_points, overlapping_shape = create_offset_points(
+    inner_points, outer_points = find_layer_points(
+        start_angle=start_angle,
+        stop_angle=stop_angle,
+        offsets=[offset_from_plasma],
+        thicknesses=[thickness],
         major_radius=major_radius,
         minor_radius=minor_radius,
         triangularity=triangularity,
         elongation=elongation,
         vertical_displacement=vertical_displacement,
-        thetas=thetas,
-        offset=inner_offset,
+        num_points=num_points,
+        angles=angles,
+        tolerance=tolerance,
     )
-    inner_points[-1][2] = "straight"
-
-    # create outer points
-    thickness = make_callable(thickness, start_angle, stop_angle)
-
-    def outer_offset(theta):
-        return inner_offset(theta) + thickness(theta)
 
-    outer_points, overlapping_shape = create_offset_points(
-        major_radius=major_radius,
-        minor_radius=minor_radius,
-        triangularity=triangularity,
-        elongation=elongation,
-        vertical_displacement=vertical_displacement,
-        thetas=np.flip(thetas),
-        offset=outer_offset,
+    points, overlapping_shape = points_from_layer_points(
+        inner_points=inner_points[0],
+        outer_points=outer_points[0],
+        connect_to_center=connect_to_center,
     )
 
-    outer_points[-1][2] = "straight"
-
-    if connect_to_center:
-        inner_points.append([0, inner_points[-1][1], "straight"])
-        inner_points = [[0, inner_points[0][1], "straight"]] + inner_points
-        outer_points.append([0, outer_points[-1][1], "straight"])
-        outer_points = [[0, outer_points[0][1], "straight"]] + outer_points
-
-    # assemble
-    points = inner_points + outer_points
     if overlapping_shape and allow_overlapping_shape is False:
         msg = "blanket_from_plasma: Some points with negative R coordinate have " "been ignored."
         warnings.warn(msg, category=UserWarning)
 
-    # input()
     return points
 
 
-def create_offset_points(
-    major_radius: float,
-    minor_radius: float,
-    triangularity: float,
-    elongation: float,
-    vertical_displacement,
-    thetas,
-    offset,
+@timed("find_layer_points")
+def find_layer_points(
+    start_angle,
+    stop_angle,
+    offsets,
+    thicknesses,
+    major_radius,
+    minor_radius,
+    triangularity,
+    elongation,
+    vertical_displacement=0.0,
+    num_points=50,
+    angles=None,
+    tolerance=None,
 ):
-    """generates a list of points following parametric equations with an
-    offset
+    """Finds the inner and outer points of several blanket layers offset from
+    the same plasma. The plasma boundary and its normals are computed once and
+    shared by every layer.
 
     Args:
-        thetas (np.array): the angles in degrees.
-        offset (callable): offset value (cm). offset=0 will follow the
-            parametric equations.
+        offsets (list): the offset_from_plasma of each layer, each entry
+            accepts the same types as blanket_from_plasma offset_from_plasma.
+        thicknesses (list): the thickness of each layer, each entry accepts
+            the same types as blanket_from_plasma thickness.
+        angles (np.array, optional): the angles in degrees to use instead of
+            num_points equally spaced angles between start_angle and
+            stop_angle.
+        tolerance (float, optional): places the angles adaptively so that the
+            straight lines between the points of every layer are within this
+            distance (cm) of the offset curves, instead of num_points equally
+            spaced angles.
 
     Returns:
-        list: list of points [[R1, Z1, connection1], [R2, Z2, connection2],
-        ...]
+        (np.array, np.array): the inner and outer (R, Z) points of every
+        layer, each with shape (n_layers, n_points, 2). The outer points are
+        ordered from stop_angle to start_angle.
     """
-    # create sympy objects and derivatives
+    if len(offsets) != len(thicknesses):
+        raise ValueError("offsets and thicknesses should contain one entry per layer")
+
+    offset_functions = [make_callable(offset, start_angle, stop_angle) for offset in offsets]
+    thickness_functions = [make_callable(thickness, start_angle, stop_angle) for thickness in thicknesses]
+
+    def layer_points(thetas):
+        R, Z = distribution(
+            major_radius,
+            minor_radius,
+            triangularity,
+            elongation,
+            vertical_displacement,
+            thetas,
+        )
+        nx, ny = distribution_normals(minor_radius, triangularity, elongation, thetas)
+        boundary = np.stack((R, Z), axis=-1)
+        normals = np.stack((nx, ny), axis=-1)
 
-    overlapping_shape = False
-    theta_sp = sp.Symbol("theta")
-
-    R_sp, Z_sp = distribution(
-        major_radius,
-        minor_radius,
-        triangularity,
-        elongation,
-        vertical_displacement,
-        theta_sp,
-        pkg=sp,
-    )
-    R_derivative = sp.diff(R_sp, theta_sp)
-    Z_derivative = sp.diff(Z_sp, theta_sp)
-    points = []
-
-    for theta in thetas:
-        # get local value of derivatives
-        val_R_derivative = float(R_derivative.subs("theta", theta))
-        val_Z_derivative = float(Z_derivative.subs("theta", theta))
-
-        # get normal vector components
-        nx = val_Z_derivative
-        ny = -val_R_derivative
-
-        # normalise normal vector
-        normal_vector_norm = (nx**2 + ny**2) ** 0.5
-        nx /= normal_vector_norm
-        ny /= normal_vector_norm
-
-        # calculate outer points
-        val_R_outer = (
-            distribution(
-                major_radius,
-                minor_radius,
-                triangularity,
-                elongation,
-                vertical_displacement,
-                theta,
-            )[0]
-            + offset(theta) * nx
+        inner_offsets = np.array([evaluate_offset(offset, thetas) for offset in offset_functions])
+        layer_thicknesses = np.array([evaluate_offset(thickness, thetas) for thickness in thickness_functions])
+        outer_offsets = (inner_offsets + layer_thicknesses).reshape(len(offsets), len(thetas))
+        inner_offsets = inner_offsets.reshape(len(offsets), len(thetas))
+
+        inner_points = boundary + inner_offsets[:, :, np.newaxis] * normals
+        outer_points = boundary + outer_offsets[:, :, np.newaxis] * normals
+        return inner_points, outer_points
+
+    # create array of angles theta
+    if angles is not None:
+        thetas = np.asarray(angles, dtype=float)
+    elif tolerance is not None:
+        thetas = adaptive_angles(
+            lambda thetas: np.concatenate(layer_points(thetas)), start_angle, stop_angle, tolerance
         )
-        val_Z_outer = (
-            distribution(
-                major_radius,
-                minor_radius,
-                triangularity,
-                elongation,
-                vertical_displacement,
-                theta,
-            )[1]
-            + offset(theta) * ny
+    else:
+        thetas = np.linspace(
+            start_angle,
+            stop_angle,
+            num=num_points,
+            endpoint=True,
         )
-        if float(val_R_outer) > 0:
-            points.append([float(val_R_outer), float(val_Z_outer), "spline"])
-        else:
-            overlapping_shape = True
-    return points, overlapping_shape
 
+    inner_points, outer_points = layer_points(thetas)
+    return inner_points, np.flip(outer_points, axis=1)
+
+
+def points_from_layer_points(inner_points, outer_points, connect_to_center=False):
+    """Joins the inner and outer points of a single layer into the list of
+    points with connections that describes the 2D profile of the blanket.
+    Points with a negative R coordinate are ignored.
+
+    Args:
+        inner_points (np.array): the (R, Z) inner points with shape
+            (n_points, 2).
+        outer_points (np.array): the (R, Z) outer points with shape
+            (n_points, 2) ordered in the opposite direction to the inner
+            points.
+        connect_to_center: extends both ends of the profile to R=0.
+
+    Returns:
+        (list, bool): the list of points [[R1, Z1, connection1], ...] and
+        True if any points were ignored.
+    """
+    overlapping_shape = False
+    layer_points = []
+    for points in (inner_points, outer_points):
+        positive = points[:, 0] > 0
+        overlapping_shape = overlapping_shape or not bool(np.all(positive))
+        points = [[R, Z, "spline"] for R, Z in points[positive].tolist()]
+        points[-1][2] = "straight"
+        if connect_to_center:
+            points = [[0, points[0][1], "straight"]] + points + [[0, points[-1][1], "straight"]]
+        layer_points.append(points)
+
+    return layer_points[0] + layer_points[1], overlapping_shape
+
+
+def evaluate_offset(offset, thetas):
+    """Evaluates an offset (or thickness) callable for every angle in thetas
+    in one call, falling back to one call per angle for callables that only
+    accept scalar values.
+
+    Args:
+        offset (callable): function of the poloidal angle (in degrees).
+        thetas (np.array): the angles in degrees.
+
+    Returns:
+        np.array: the offset values with the same shape as thetas.
+    """
+    try:
+        values = np.asarray(offset(thetas), dtype=float)
+        return np.broadcast_to(values, thetas.shape)
+    except (TypeError, ValueError):
+        return np.array([float(offset(theta)) for theta in thetas])
+
+
+def distribution_normals(minor_radius, triangularity, elongation, theta):
+    """Unit normals of the plasma distribution computed from the closed form
+    derivatives dR/dtheta and dZ/dtheta.
 
-def distribution(major_radius, minor_radius, triangularity, elongation, vertical_displacement, theta, pkg=np):
+    Args:
+        theta (float or np.array): the angle(s) in degrees.
+
+    Returns:
+        (np.array, np.array): The R and Z components of the unit normal
+            vector(s) at angle theta
+    """
+    theta = np.radians(theta)
+    R_derivative = -minor_radius * np.sin(theta + triangularity * np.sin(theta)) * (1 + triangularity * np.cos(theta))
+    Z_derivative = elongation * minor_radius * np.cos(theta)
+
+    normal_vector_norm = np.hypot(R_derivative, Z_derivative)
+    return Z_derivative / normal_vector_norm, -R_derivative / normal_vector_norm
+
+
+def distribution(major_radius, minor_radius, triangularity, elongation, vertical_displacement, theta):
     """Plasma distribution theta in degrees
 
     Args:
-        theta (float or np.array or sp.Symbol): the angle(s) in degrees.
-        pkg (module, optional): Module to use in the funciton. If sp, as
-            sympy object will be returned. If np, a np.array or a float
-            will be returned. Defaults to np.
+        theta (float or np.array): the angle(s) in degrees.
 
     Returns:
-        (float, float) or (sympy.Add, sympy.Mul) or
-            (numpy.array, numpy.array): The R and Z coordinates of the
-            point with angle theta
+        (float, float) or (numpy.array, numpy.array): The R and Z coordinates
+            of the point with angle theta
     """
-    if pkg == np:
-        theta = np.radians(theta)
-    else:
-        theta = mpmath.radians(theta)
-    R = major_radius + minor_radius * pkg.cos(theta + triangularity * pkg.sin(theta))
-    Z = elongation * minor_radius * pkg.sin(theta) + vertical_displacement
+    theta = np.radians(theta)
+    R = major_radius + minor_radius * np.cos(theta + triangularity * np.sin(theta))
+    Z = elongation * minor_radius * np.sin(theta) + vertical_displacement
     return R, Z
 
 
+def blanket_from_plasma_profile(
+    thickness,
+    start_angle: float,
+    stop_angle: float,
+    minor_radius: float = 150.0,
+    major_radius: float = 450.0,
+    triangularity: float = 0.55,
+    elongation: float = 2.0,
+    vertical_displacement: float = 0.0,
+    offset_from_plasma: typing.Union[float, typing.Iterable[float]] = 0.0,
+    num_points: int = 50,
+    tolerance: typing.Optional[float] = None,
+    allow_overlapping_shape=False,
+    connect_to_center=False,
+    fidelity: str = "full",
+) -> Profile:
+    """The 2D profile of blanket_from_plasma, computed without OCC. The
+    arguments are described in blanket_from_plasma."""
+    preview = is_preview(fidelity)
+    if preview:
+        num_points, tolerance = min(num_points, PREVIEW_NUM_POINTS), None
+
+    points = find_points(
+        thickness=thickness,
+        start_angle=start_angle,
+        stop_angle=stop_angle,
+        minor_radius=minor_radius,
+        major_radius=major_radius,
+        triangularity=triangularity,
+        elongation=elongation,
+        vertical_displacement=vertical_displacement,
+        offset_from_plasma=offset_from_plasma,
+        num_points=num_points,
+        tolerance=tolerance,
+        allow_overlapping_shape=allow_overlapping_shape,
+        connect_to_center=connect_to_center,
+    )
+    profile = Profile.from_points(points)
+    return profile.straightened() if preview else profile
+
+
+@cached_builder
 def blanket_from_plasma(
     thickness,
     start_angle: float,
@@ -243,6 +322,8 @@ def blanket_from_plasma(
     obj=None,
     allow_overlapping_shape=False,
     connect_to_center=False,
+    tolerance: typing.Optional[float] = None,
+    fidelity: str = "full",
 ):
     """A blanket volume created from plasma parameters. In might be nessecary
     to increase the num_points when making long but thin geometry with this
@@ -276,7 +357,17 @@ def blanket_from_plasma(
         num_points: number of points that will describe the shape.
         allow_overlapping_shape: allows parameters to create a shape that
             overlaps itself.
+        tolerance: places the points adaptively, more densely where the
+            blanket is tightly curved, so that the straight lines between them
+            are within this distance (cm) of the inner and outer curves. This
+            needs fewer points than num_points for the same accuracy. None
+            uses num_points equally spaced angles.
+        fidelity: "full" or "preview", which approximates the blanket with at
+            most PREVIEW_NUM_POINTS points on each curve joined by straight
+            lines, for pictures that are quick to build and render.
     """
+    if is_preview(fidelity):
+        num_points, tolerance = min(num_points, PREVIEW_NUM_POINTS), None
 
     points = find_points(
         thickness=thickness,
@@ -289,14 +380,58 @@ def blanket_from_plasma(
         vertical_displacement=vertical_displacement,
         offset_from_plasma=offset_from_plasma,
         num_points=num_points,
+        tolerance=tolerance,
         allow_overlapping_shape=allow_overlapping_shape,
         connect_to_center=connect_to_center,
     )
-    points.append(points[0])
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
+    return blanket_from_points(
+        points=points,
+        name=name,
+        color=color,
+        rotation_angle=rotation_angle,
+        plane=plane,
+        origin=origin,
+        obj=obj,
+        fidelity=fidelity,
+    )
+
+
+@timed("blanket_from_points")
+def blanket_from_points(
+    points,
+    name: str = "blanket_from_plasma",
+    color: typing.Tuple[float, float, float, typing.Optional[float]] = (
+        0.333,
+        0.0,
+        0.0,
+    ),
+    rotation_angle: float = 90.0,
+    plane="XZ",
+    origin=(0, 0, 0),
+    obj=None,
+    fidelity: str = "full",
+):
+    """A blanket volume revolved from an already computed 2D profile such as
+    one returned by points_from_layer_points.
+
+    Args:
+        points: list of points [[R1, Z1, connection1], ...] describing the
+            profile of the blanket.
+        fidelity: "full" or "preview", which joins the points with straight
+            lines instead of splines.
+    """
+
+    profile = Profile.from_points(points)
+    if is_preview(fidelity):
+        profile = profile.straightened()
+
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
 
-    solid = wire.revolve(rotation_angle)
+    with timed("revolve"):
+        solid = wire.revolve(rotation_angle)
     solid.name = name
     solid.color = color
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
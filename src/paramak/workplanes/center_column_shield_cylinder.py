@@ -1,25 +1,17 @@
 import typing
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays
 
 
-def center_column_shield_cylinder(
+def center_column_shield_cylinder_profile(
     height: float,
     inner_radius: float,
     thickness: float,
     reference_point: tuple = ("center", 0),
-    name: str = "center_column_shield_cylinder",
-    color: typing.Tuple[float, float, float, typing.Optional[float]] = (
-        0.0,
-        0.333,
-        0.0,
-    ),
-    rotation_angle=90,
-    plane="XZ",
-    origin=(0, 0, 0),
-    obj=None,
-):
-    """A cylindrical center column shield volume with constant thickness.
+) -> Profile:
+    """The 2D profile of center_column_shield_cylinder, computed without OCC.
 
     Args:
         height: height of the center column shield.
@@ -50,11 +42,47 @@ def center_column_shield_cylinder(
         (inner_radius, center_height + (-height / 2), "straight"),
     ]
 
-    points.append(points[0])
+    return Profile.from_points(points)
+
+
+@cached_builder
+def center_column_shield_cylinder(
+    height: float,
+    inner_radius: float,
+    thickness: float,
+    reference_point: tuple = ("center", 0),
+    name: str = "center_column_shield_cylinder",
+    color: typing.Tuple[float, float, float, typing.Optional[float]] = (
+        0.0,
+        0.333,
+        0.0,
+    ),
+    rotation_angle=90,
+    plane="XZ",
+    origin=(0, 0, 0),
+    obj=None,
+):
+    """A cylindrical center column shield volume with constant thickness.
+
+    Args:
+        height: height of the center column shield.
+        inner_radius: the inner radius of the center column shield.
+        thickness: the outer radius of the center column shield.
+        reference_point: the vertical coordinates to build te vessel from and
+            description of the reference point. Can be either the 'center'
+            with a numerical value or 'lower' with a numerical value.
+    """
+
+    profile = center_column_shield_cylinder_profile(
+        height=height, inner_radius=inner_radius, thickness=thickness, reference_point=reference_point
+    )
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
 
-    solid = wire.revolve(rotation_angle)
+    with timed("revolve"):
+        solid = wire.revolve(rotation_angle)
     solid.name = name
     solid.color = color
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
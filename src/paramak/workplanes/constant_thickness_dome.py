@@ -4,10 +4,102 @@ import typing
 
 import cadquery as cq
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_points
 from ..workplanes.cutting_wedge import cutting_wedge
 
 
+def _check_dome_arguments(thickness: float, chord_width: float, chord_height: float):
+    if not isinstance(chord_width, numbers.Number):
+        raise ValueError("ConstantThicknessDome.chord_width must be a float. Not", chord_width)
+    if chord_width <= 0:
+        msg = f"ConstantThicknessDome.chord_width must be a positive number above 0. Not {chord_width}"
+        raise ValueError(msg)
+
+    if not isinstance(chord_height, numbers.Number):
+        raise ValueError("ConstantThicknessDome.chord_height must be a float. Not", chord_height)
+    if chord_height <= 0:
+        msg = f"ConstantThicknessDome.chord_height must be a positive number above 0. Not {chord_height}"
+        raise ValueError(msg)
+
+    if not isinstance(thickness, numbers.Number):
+        msg = f"VacuumVessel.thickness must be a float. Not {thickness}"
+        raise ValueError(msg)
+    if thickness <= 0:
+        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {thickness}"
+        raise ValueError(msg)
+
+    if chord_height * 2 >= chord_width:
+        msg = "ConstantThicknessDome requires that the chord_width " "is at least 2 times as large as the chord height"
+        raise ValueError(msg)
+
+
+def constant_thickness_dome_profile(
+    thickness: float = 10,
+    chord_center_height: float = 0,
+    chord_width: float = 100,
+    chord_height: float = 20,
+    upper_or_lower: str = "upper",
+) -> Profile:
+    """The 2D profile of constant_thickness_dome, computed without OCC. The
+    profile is bounded by the chord, the outer radius of the chord plus the
+    thickness and arcs of the inner and outer spheres.
+
+    Arguments:
+        thickness: the radial thickness of the dome.
+        chord_center_height: the vertical position of the chord center
+        chord_width: the width of the chord base
+        chord_height: the height of the chord which is also distance between
+            the chord_center_height and the inner surface of the dome
+        upper_or_lower: Curves the dish with a positive or negative direction
+            to allow the upper section or lower section of vacuum vessel
+            domes to be made.
+    """
+
+    _check_dome_arguments(thickness=thickness, chord_width=chord_width, chord_height=chord_height)
+    if upper_or_lower == "upper":
+        direction = 1
+    elif upper_or_lower == "lower":
+        direction = -1
+    else:
+        msg = f'upper_or_lower should be either "upper"  or "lower". Not {upper_or_lower}'
+        raise ValueError(msg)
+
+    radius_of_sphere = ((math.pow(chord_width, 2)) + (4.0 * math.pow(chord_height, 2))) / (8 * chord_height)
+    outer_radius = radius_of_sphere + thickness
+    chord_radius = chord_width / 2
+
+    # heights relative to the chord of the center of the spheres and of the
+    # point where the outer sphere meets the vertical side of the dome,
+    # before flipping the lower dome
+    center_height = chord_height - radius_of_sphere
+    side_height = center_height + math.sqrt(outer_radius**2 - (chord_radius + thickness) ** 2)
+
+    def arc_mid_point(radius, start_height, start_radius):
+        # the arc runs from the start point to the axis at the top of the sphere
+        start_angle = math.atan2(start_height - center_height, start_radius)
+        angle = (start_angle + math.pi / 2) / 2
+        return (radius * math.cos(angle), center_height + radius * math.sin(angle))
+
+    outer_mid_point = arc_mid_point(outer_radius, side_height, chord_radius + thickness)
+    inner_mid_point = arc_mid_point(radius_of_sphere, 0, chord_radius)
+
+    points = [
+        (chord_radius, 0, "straight"),
+        (chord_radius + thickness, 0, "straight"),
+        (chord_radius + thickness, side_height, "circle"),
+        (outer_mid_point[0], outer_mid_point[1], "circle"),
+        (0, center_height + outer_radius, "straight"),
+        (0, center_height + radius_of_sphere, "circle"),
+        (inner_mid_point[0], inner_mid_point[1], "circle"),
+    ]
+    points = [(R, chord_center_height + direction * Z, connection) for R, Z, connection in points]
+
+    return Profile.from_points(points)
+
+
+@cached_builder
 def constant_thickness_dome(
     thickness: float = 10,
     chord_center_height: float = 0,
@@ -43,24 +135,7 @@ def constant_thickness_dome(
             filename prefix when exporting.
     """
 
-    if not isinstance(chord_width, numbers.Number):
-        raise ValueError("ConstantThicknessDome.chord_width must be a float. Not", chord_width)
-    if chord_width <= 0:
-        msg = f"ConstantThicknessDome.chord_width must be a positive number above 0. Not {chord_width}"
-        raise ValueError(msg)
-
-    if not isinstance(chord_height, numbers.Number):
-        raise ValueError("ConstantThicknessDome.chord_height must be a float. Not", chord_height)
-    if chord_height <= 0:
-        msg = f"ConstantThicknessDome.chord_height must be a positive number above 0. Not {chord_height}"
-        raise ValueError(msg)
-
-    if not isinstance(thickness, numbers.Number):
-        msg = f"VacuumVessel.thickness must be a float. Not {thickness}"
-        raise ValueError(msg)
-    if thickness <= 0:
-        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {thickness}"
-        raise ValueError(msg)
+    _check_dome_arguments(thickness=thickness, chord_width=chord_width, chord_height=chord_height)
 
     # Note these points are not used in the normal way when constructing
     # the solid
@@ -90,10 +165,6 @@ def constant_thickness_dome(
     #          6   -
     #       far side
 
-    if chord_height * 2 >= chord_width:
-        msg = "ConstantThicknessDome requires that the chord_width " "is at least 2 times as large as the chord height"
-        raise ValueError(msg)
-
     radius_of_sphere = ((math.pow(chord_width, 2)) + (4.0 * math.pow(chord_height, 2))) / (8 * chord_height)
 
     # TODO set to 0 for now, add ability to shift the center of the chord left and right
@@ -142,9 +213,11 @@ def constant_thickness_dome(
     else:
         raise ValueError("upper_or_lower argument must be set to either 'upper' or 'lower'")
 
-    big_sphere = cq.Workplane(plane).moveTo(center_point[0], center_point[1]).sphere(radius_of_sphere + thickness)
+    # the spheres are solids of revolution so they are timed with the revolved cutters
+    with timed("revolve"):
+        big_sphere = cq.Workplane(plane).moveTo(center_point[0], center_point[1]).sphere(radius_of_sphere + thickness)
 
-    small_sphere = cq.Workplane(plane).moveTo(center_point[0], center_point[1]).sphere(radius_of_sphere)
+        small_sphere = cq.Workplane(plane).moveTo(center_point[0], center_point[1]).sphere(radius_of_sphere)
 
     wire = create_wire_workplane_from_points(
         points=(
@@ -158,7 +231,8 @@ def constant_thickness_dome(
         origin=origin,
         obj=obj,
     )
-    inner_cylinder_cutter = wire.revolve(360)
+    with timed("revolve"):
+        inner_cylinder_cutter = wire.revolve(360)
 
     wire = create_wire_workplane_from_points(
         points=(
@@ -174,7 +248,8 @@ def constant_thickness_dome(
         origin=origin,
         obj=obj,
     )
-    outer_cylinder_cutter = wire.revolve(360)
+    with timed("revolve"):
+        outer_cylinder_cutter = wire.revolve(360)
 
     cap = big_sphere.cut(small_sphere)
 
@@ -187,4 +262,14 @@ def constant_thickness_dome(
 
     cap.name = name
     cap.color = cq.Color(*color)
+    cap.profiles = (
+        constant_thickness_dome_profile(
+            thickness=thickness,
+            chord_center_height=chord_center_height,
+            chord_width=chord_width,
+            chord_height=chord_height,
+            upper_or_lower=upper_or_lower,
+        ),
+    )
+    cap.rotation_angle = rotation_angle
     return cap
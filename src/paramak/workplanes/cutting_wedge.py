@@ -2,9 +2,12 @@ import typing
 
 import cadquery as cq
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays
 
 
+@cached_builder
 def cutting_wedge(
     height: float,
     radius: float,
@@ -34,13 +37,15 @@ def cutting_wedge(
         (radius, -height / 2, "straight"),
         (0, -height / 2, "straight"),
     ]
-    points.append(points[0])
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
+    profile = Profile.from_points(points)
 
-    solid = wire.revolve(
-        angleDegrees=rotation_angle,
-    )
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
+
+    with timed("revolve"):
+        solid = wire.revolve(
+            angleDegrees=rotation_angle,
+        )
     # The code can be changed to revolve it in the other direction
     # solid = wire.revolve(
     #     angleDegrees=rotation_angle,
@@ -49,4 +54,6 @@ def cutting_wedge(
     # )
     solid.name = name
     solid.color = cq.Color(*color)
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
@@ -2,31 +2,15 @@ import typing
 
 from paramak import center_column_shield_cylinder, constant_thickness_dome
 
+from ..cache import cached_builder
+from ..utils import Profile
+from .center_column_shield_cylinder import center_column_shield_cylinder_profile
+from .constant_thickness_dome import constant_thickness_dome_profile
 
-def dished_vacuum_vessel(
-    radius: float = 300,
-    reference_point: tuple = ("center", 0),
-    dish_height: typing.Tuple[float, float] = (20, 50),
-    cylinder_height: float = 400,
-    thickness: float = 15,
-    rotation_angle: float = 90,
-    name: str = "dished_vessel",
-    plane="XZ",
-):
-    """A cylindrical vessel volume with constant thickness with a simple dished
-    head. This style of tank head has no knuckle radius or straight flange.
 
-    Arguments:
-        radius: the radius from which the centres of the vessel meets the outer
-            circumference.
-        reference_point: the x,z coordinates to build te vessel from. Can be
-            either the 'center' with a value or 'lower' with a
-            value. For example
-        dish_height: the height of the lower and upper dish sections.
-        cylinder_height: the height of the cylindrical section of the vacuum
-            vessel.
-        thickness: the radial thickness of the vessel in cm.
-    """
+def _section_heights(radius, reference_point, dish_height, cylinder_height, thickness):
+    """Checks the arguments and returns the heights of the center of the
+    cylinder section and of the lower and upper chord centers."""
 
     if not isinstance(radius, (float, int)):
         raise ValueError(f"radius must be a number. Not {type(radius)}")
@@ -38,7 +22,7 @@ def dished_vacuum_vessel(
         msg = f"VacuumVessel.thickness must be a number. Not {type(thickness)}"
         raise ValueError(msg)
     if thickness <= 0:
-        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {value}"
+        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {thickness}"
         raise ValueError(msg)
 
         #
@@ -73,6 +57,87 @@ def dished_vacuum_vessel(
         upper_chord_center_height = reference_point[1] + thickness + dish_height[0] + cylinder_height
     else:
         raise ValueError('reference_point should be a tuple where the first value is either "center" or "lower"')
+    return center_height, lower_chord_center_height, upper_chord_center_height
+
+
+def dished_vacuum_vessel_profile(
+    radius: float = 300,
+    reference_point: tuple = ("center", 0),
+    dish_height: typing.Tuple[float, float] = (20, 50),
+    cylinder_height: float = 400,
+    thickness: float = 15,
+) -> typing.Tuple[Profile, Profile, Profile]:
+    """The 2D profiles of the dished_vacuum_vessel sections, computed without
+    OCC. The arguments are described in dished_vacuum_vessel.
+
+    Returns:
+        the profiles of the lower dome, cylinder and upper dome sections.
+    """
+
+    center_height, lower_chord_center_height, upper_chord_center_height = _section_heights(
+        radius=radius,
+        reference_point=reference_point,
+        dish_height=dish_height,
+        cylinder_height=cylinder_height,
+        thickness=thickness,
+    )
+
+    cylinder_section = center_column_shield_cylinder_profile(
+        height=cylinder_height,
+        inner_radius=radius - thickness,
+        thickness=thickness,
+        reference_point=("center", center_height),
+    )
+    upper_dome_section = constant_thickness_dome_profile(
+        thickness=thickness,
+        chord_center_height=upper_chord_center_height,
+        chord_width=(radius - thickness) * 2,
+        chord_height=dish_height[1],
+        upper_or_lower="upper",
+    )
+    lower_dome_section = constant_thickness_dome_profile(
+        thickness=thickness,
+        chord_center_height=lower_chord_center_height,
+        chord_width=(radius - thickness) * 2,
+        chord_height=dish_height[0],
+        upper_or_lower="lower",
+    )
+    return lower_dome_section, cylinder_section, upper_dome_section
+
+
+@cached_builder
+def dished_vacuum_vessel(
+    radius: float = 300,
+    reference_point: tuple = ("center", 0),
+    dish_height: typing.Tuple[float, float] = (20, 50),
+    cylinder_height: float = 400,
+    thickness: float = 15,
+    rotation_angle: float = 90,
+    name: str = "dished_vessel",
+    plane="XZ",
+):
+    """A cylindrical vessel volume with constant thickness with a simple dished
+    head. This style of tank head has no knuckle radius or straight flange.
+
+    Arguments:
+        radius: the radius from which the centres of the vessel meets the outer
+            circumference.
+        reference_point: the x,z coordinates to build te vessel from. Can be
+            either the 'center' with a value or 'lower' with a
+            value. For example
+        dish_height: the height of the lower and upper dish sections.
+        cylinder_height: the height of the cylindrical section of the vacuum
+            vessel.
+        thickness: the radial thickness of the vessel in cm.
+    """
+
+    center_height, lower_chord_center_height, upper_chord_center_height = _section_heights(
+        radius=radius,
+        reference_point=reference_point,
+        dish_height=dish_height,
+        cylinder_height=cylinder_height,
+        thickness=thickness,
+    )
 
     cylinder_section = center_column_shield_cylinder(
         height=cylinder_height,
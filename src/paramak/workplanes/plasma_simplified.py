@@ -2,9 +2,60 @@ import typing
 
 import numpy as np
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import PREVIEW_NUM_POINTS, Profile, adaptive_angles, create_wire_workplane_from_arrays, is_preview
 
 
+def plasma_simplified_profile(
+    elongation: float = 2.0,
+    major_radius: float = 450.0,
+    minor_radius: float = 150.0,
+    triangularity: float = 0.55,
+    vertical_displacement: float = 0.0,
+    num_points: float = 50,
+    tolerance: typing.Optional[float] = None,
+    fidelity: str = "full",
+) -> Profile:
+    """The 2D profile of plasma_simplified, computed without OCC.
+
+    Args:
+        elongation: the elongation of the plasma.
+        major_radius: the major radius of the plasma (cm).
+        minor_radius: the minor radius of the plasma (cm).
+        triangularity: the triangularity of the plasma.
+        vertical_displacement: the vertical_displacement of the plasma (cm)..
+        num_points: number of points to describe the shape.
+        tolerance: places the points adaptively, more densely where the shape
+            is tightly curved, so that the straight lines between them are
+            within this distance (cm) of the shape. None uses num_points
+            equally spaced angles.
+        fidelity: "full" or "preview", which uses at most PREVIEW_NUM_POINTS
+            equally spaced points joined by straight lines.
+    """
+    preview = is_preview(fidelity)
+    if preview:
+        num_points, tolerance = min(num_points, PREVIEW_NUM_POINTS), None
+
+    def boundary(theta):
+        # parametric equations for plasma
+        R = major_radius + minor_radius * np.cos(theta + triangularity * np.sin(theta))
+        Z = elongation * minor_radius * np.sin(theta) + vertical_displacement
+        return np.stack((R, Z), axis=-1)
+
+    # create array of angles theta
+    if tolerance is None:
+        theta = np.linspace(0, 2 * np.pi, num=num_points, endpoint=False)
+    else:
+        angles = adaptive_angles(lambda angles: boundary(np.radians(angles))[np.newaxis], 0, 360, tolerance)
+        # the last angle is the same point as the first
+        theta = np.radians(angles[:-1])
+
+    profile = Profile(points=boundary(theta), connections=np.full(len(theta), "spline"))
+    return profile.straightened() if preview else profile
+
+
+@cached_builder
 def plasma_simplified(
     elongation: float = 2.0,
     major_radius: float = 450.0,
@@ -22,6 +73,8 @@ def plasma_simplified(
     plane="XZ",
     origin=(0, 0, 0),
     obj=None,
+    tolerance: typing.Optional[float] = None,
+    fidelity: str = "full",
 ):
     """Creates a double null tokamak plasma shape that is controlled by 4
     shaping parameters.
@@ -33,32 +86,40 @@ def plasma_simplified(
         triangularity: the triangularity of the plasma.
         vertical_displacement: the vertical_displacement of the plasma (cm)..
         num_points: number of points to describe the shape.
+        tolerance: places the points adaptively so that the straight lines
+            between them are within this distance (cm) of the shape, using
+            fewer points than num_points needs for the same accuracy. None
+            uses num_points equally spaced angles.
+        fidelity: "full" or "preview", which approximates the shape with at
+            most PREVIEW_NUM_POINTS points joined by straight lines and
+            revolves 360 degree plasmas in one piece, for pictures that are
+            quick to build and render.
     """
 
-    # create array of angles theta
-    theta = np.linspace(0, 2 * np.pi, num=num_points, endpoint=False)
-
-    # parametric equations for plasma
-    def R(theta):
-        return major_radius + minor_radius * np.cos(theta + triangularity * np.sin(theta))
+    profile = plasma_simplified_profile(
+        elongation=elongation,
+        major_radius=major_radius,
+        minor_radius=minor_radius,
+        triangularity=triangularity,
+        vertical_displacement=vertical_displacement,
+        num_points=num_points,
+        tolerance=tolerance,
+        fidelity=fidelity,
+    )
 
-    def Z(theta):
-        return elongation * minor_radius * np.sin(theta) + vertical_displacement
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
 
-    points = np.stack((R(theta), Z(theta)), axis=1).tolist()
-    points.append(points[0])
-    for point in points:
-        point.append("spline")
-
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
-
-    # avoids shape with surface on join that can't be meshed for 360 degree plasmas
-    if rotation_angle >= 360:
-        solid1 = wire.revolve(180, (1, 0, 0), (1, 1, 0))
-        solid2 = solid1.mirror(solid1.faces(">X"), union=True)
-        solid = solid2.union(solid1)  # todo try fuzzy bool tol=0.01
-    else:
-        solid = wire.revolve(rotation_angle)
+    # avoids shape with surface on join that can't be meshed for 360 degree plasmas,
+    # which does not happen to the planar and conical faces revolved from a preview
+    with timed("revolve"):
+        if rotation_angle >= 360 and not is_preview(fidelity):
+            solid1 = wire.revolve(180, (1, 0, 0), (1, 1, 0))
+            solid2 = solid1.mirror(solid1.faces(">X"), union=True)
+            solid = solid2.union(solid1)  # todo try fuzzy bool tol=0.01
+        else:
+            solid = wire.revolve(rotation_angle)
     solid.name = name
     solid.color = color
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
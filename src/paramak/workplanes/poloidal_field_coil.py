@@ -1,8 +1,30 @@
 import typing
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays
 
 
+def poloidal_field_coil_profile(height: float, width: float, center_point: float) -> Profile:
+    """The 2D profile of poloidal_field_coil, computed without OCC.
+
+    Args:
+        height: the vertical (z axis) height of the coil.
+        width: the horizontal (x axis) width of the coil.
+        center_point: the center of the coil (x,z) values.
+    """
+
+    points = [
+        (center_point[0] + width / 2.0, center_point[1] + height / 2.0, "straight"),  # upper right
+        (center_point[0] + width / 2.0, center_point[1] - height / 2.0, "straight"),  # lower right
+        (center_point[0] - width / 2.0, center_point[1] - height / 2.0, "straight"),  # lower left
+        (center_point[0] - width / 2.0, center_point[1] + height / 2.0, "straight"),
+    ]
+
+    return Profile.from_points(points)
+
+
+@cached_builder
 def poloidal_field_coil(
     height: float,
     width: float,
@@ -26,18 +48,14 @@ def poloidal_field_coil(
         center_point: the center of the coil (x,z) values.
     """
 
-    points = [
-        (center_point[0] + width / 2.0, center_point[1] + height / 2.0, "straight"),  # upper right
-        (center_point[0] + width / 2.0, center_point[1] - height / 2.0, "straight"),  # lower right
-        (center_point[0] - width / 2.0, center_point[1] - height / 2.0, "straight"),  # lower left
-        (center_point[0] - width / 2.0, center_point[1] + height / 2.0, "straight"),
-    ]
-
-    points.append(points[0])
+    profile = poloidal_field_coil_profile(height=height, width=width, center_point=center_point)
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
+    wire = create_wire_workplane_from_arrays(profile.points, profile.connections, plane=plane, origin=origin, obj=obj)
 
-    solid = wire.revolve(rotation_angle)
+    with timed("revolve"):
+        solid = wire.revolve(rotation_angle)
     solid.name = name
     solid.color = color
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
@@ -1,21 +1,18 @@
 import typing
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays
 
 
-def poloidal_field_coil_case(
+def poloidal_field_coil_case_profile(
     coil_height: float,
     coil_width: float,
     casing_thickness: typing.Tuple[float, float],
     center_point: typing.Tuple[float, float],
-    name: str = "poloidal_field_coil_case",
-    color: typing.Tuple[float, float, float, typing.Optional[float]] = (1.0, 1.0, 0.498),
-    rotation_angle=90,
-    plane="XZ",
-    origin=(0, 0, 0),
-    obj=None,
-):
-    """Constant thickness casing for a rectangular poloidal coil.
+) -> Profile:
+    """The 2D profile of poloidal_field_coil_case, computed without OCC, with
+    the coil as a hole.
 
     Args:
         coil_height: the vertical (z axis) height of the coil (cm).
@@ -30,7 +27,6 @@ def poloidal_field_coil_case(
         (center_point[0] - coil_width / 2.0, center_point[1] - coil_height / 2.0, "straight"),  # lower left
         (center_point[0] - coil_width / 2.0, center_point[1] + coil_height / 2.0, "straight"),  # upper left
     ]
-    inner_points.append(inner_points[0])
 
     outer_points = [
         (
@@ -54,13 +50,50 @@ def poloidal_field_coil_case(
             "straight",
         ),
     ]
-    outer_points.append(outer_points[0])
 
-    inner_wire = create_wire_workplane_from_points(points=inner_points, plane=plane, origin=origin, obj=obj)
-    outer_wire = create_wire_workplane_from_points(points=outer_points, plane=plane, origin=origin, obj=obj)
+    return Profile.from_points(outer_points, holes=(Profile.from_points(inner_points),))
+
+
+@cached_builder
+def poloidal_field_coil_case(
+    coil_height: float,
+    coil_width: float,
+    casing_thickness: typing.Tuple[float, float],
+    center_point: typing.Tuple[float, float],
+    name: str = "poloidal_field_coil_case",
+    color: typing.Tuple[float, float, float, typing.Optional[float]] = (1.0, 1.0, 0.498),
+    rotation_angle=90,
+    plane="XZ",
+    origin=(0, 0, 0),
+    obj=None,
+):
+    """Constant thickness casing for a rectangular poloidal coil.
+
+    Args:
+        coil_height: the vertical (z axis) height of the coil (cm).
+        coil_width: the horizontal (x axis) width of the coil (cm).
+        center_point: the center of the coil (x,z) values (cm).
+        casing_thickness: the thickness of the coil casing (cm).
+    """
+
+    profile = poloidal_field_coil_case_profile(
+        coil_height=coil_height, coil_width=coil_width, casing_thickness=casing_thickness, center_point=center_point
+    )
+    inner_profile = profile.holes[0]
+
+    inner_wire = create_wire_workplane_from_arrays(
+        inner_profile.points, inner_profile.connections, plane=plane, origin=origin, obj=obj
+    )
+    outer_wire = create_wire_workplane_from_arrays(
+        profile.points, profile.connections, plane=plane, origin=origin, obj=obj
+    )
 
-    inner_solid = inner_wire.revolve(rotation_angle)
-    solid = outer_wire.revolve(rotation_angle).cut(inner_solid)
+    with timed("revolve"):
+        inner_solid = inner_wire.revolve(rotation_angle)
+        outer_solid = outer_wire.revolve(rotation_angle)
+    solid = outer_solid.cut(inner_solid)
     solid.name = name
     solid.color = color
+    solid.profiles = (profile,)
+    solid.rotation_angle = rotation_angle
     return solid
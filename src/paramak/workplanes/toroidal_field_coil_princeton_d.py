@@ -1,23 +1,124 @@
+import functools
 import typing
+from pathlib import Path
+
 import numpy as np
-from ..utils import create_wire_workplane_from_points, rotate_solid
-from scipy import integrate
-from scipy.optimize import brentq
+import cadquery as cq
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays, rotate_solid
 from typing import List, Tuple
 from ..workplanes.cutting_wedge import cutting_wedge
 
 
+# range of R2/R1 ratios covered by the table of normalised profiles, the
+# number of table nodes spaced evenly in log(R2/R1) and the largest accepted
+# interpolation error relative to the height of the profile
+PROFILE_TABLE_RATIOS = (1.1, 50.0)
+PROFILE_TABLE_NODES = 97
+PROFILE_TABLE_TOLERANCE = 1e-4
+PROFILE_TABLE_FILENAME = Path(__file__).parent / "princeton_d_profiles.npz"
+
+
 def _compute_inner_points(R1, R2):
-    """Computes the inner curve points
+    """Computes the inner curve points, interpolated from the table of
+    normalised profiles when R2/R1 is in the accurate part of the table and
+    solved otherwise.
+
+    Args:
+        R1 (float): smallest radius (cm)
+        R2 (float): largest radius (cm)
+
+    Returns:
+        (np.array, np.array): R and Z values of the inner curve points
+    """
+    ratio = R2 / R1
+    if PROFILE_TABLE_RATIOS[0] <= ratio <= PROFILE_TABLE_RATIOS[1]:
+        log_ratios, table, accurate = _profile_table()
+        interval = min(np.searchsorted(log_ratios, np.log(ratio), side="right") - 1, len(accurate) - 1)
+        if accurate[interval]:
+            return _inner_r_values(R1, R2), R1 * table(np.log(ratio))
+    return _solve_inner_points(R1, R2)
+
+
+def solve_profile_table(
+    filename: typing.Optional[typing.Union[str, Path]] = None,
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Solves the Princeton-D profiles with R1 = 1 at the table ratios. The
+    profile of any coil is the normalised profile scaled by R1 as the shape
+    only depends on R2/R1.
+
+    Args:
+        filename: saves the table to this .npz file when set, the table
+            shipped with paramak is made with PROFILE_TABLE_FILENAME.
+
+    Returns:
+        the log(R2/R1) table nodes and the Z values of the normalised inner
+        curve points at each node
+    """
+    log_ratios = np.linspace(np.log(PROFILE_TABLE_RATIOS[0]), np.log(PROFILE_TABLE_RATIOS[1]), PROFILE_TABLE_NODES)
+    profiles = np.array([_solve_inner_points(1.0, ratio)[1] for ratio in np.exp(log_ratios)])
+    if filename is not None:
+        np.savez(filename, log_ratios=log_ratios, profiles=profiles)
+    return log_ratios, profiles
+
+
+@functools.lru_cache(maxsize=None)
+def _profile_table():
+    """Loads the shipped table of normalised profiles, solving it when the
+    file is missing or was made with other table settings.
+
+    Returns:
+        (np.array, CubicSpline, np.array): the log(R2/R1) table nodes, the
+        interpolated Z values of the normalised profile as a function of
+        log(R2/R1) and whether the interpolation is accurate within each
+        interval between nodes
+    """
+    # scipy is imported when first needed as it is slow to import
+    from scipy.interpolate import CubicSpline
+
+    log_ratios = np.linspace(np.log(PROFILE_TABLE_RATIOS[0]), np.log(PROFILE_TABLE_RATIOS[1]), PROFILE_TABLE_NODES)
+    try:
+        with np.load(PROFILE_TABLE_FILENAME) as data:
+            stored_log_ratios, profiles = data["log_ratios"], data["profiles"]
+        if stored_log_ratios.shape != log_ratios.shape or not np.allclose(stored_log_ratios, log_ratios):
+            raise ValueError("The stored table was made with other settings")
+    except (OSError, KeyError, ValueError):
+        log_ratios, profiles = solve_profile_table()
+    table = CubicSpline(log_ratios, profiles, axis=0)
+
+    # estimates the interpolation error at every other node by interpolating
+    # the remaining nodes, which overestimates the error of the full table
+    coarse_table = CubicSpline(log_ratios[::2], profiles[::2], axis=0)
+    left_out = profiles[1::2]
+    errors = np.abs(coarse_table(log_ratios[1::2]) - left_out).max(axis=1) / np.abs(left_out).max(axis=1)
+    # each left out node checks the two intervals either side of it
+    accurate = np.repeat(errors < PROFILE_TABLE_TOLERANCE, 2)
+    return log_ratios, table, accurate
+
+
+def _inner_r_values(R1, R2, num=5):
+    """Returns the R values of the inner curve points, evenly spaced between
+    R1, (R1 * R2) ** 0.5 and R2 and ordered as in the inner curve."""
+    R0 = (R1 * R2) ** 0.5
+    segment1_r = np.linspace(R0, R1, num=num, endpoint=True)
+    segment2_r = np.linspace(R0, R2, num=num, endpoint=True)
+    return np.concatenate([np.flip(segment1_r), segment2_r[1:], np.flip(segment2_r)[1:], segment1_r[1:]])
+
+
+def _solve_inner_points(R1, R2):
+    """Computes the inner curve points by shooting from (R1 * R2) ** 0.5
+    with the vertical position found by root finding
 
     Args:
         R1 (float): smallest radius (cm)
         R2 (float): largest radius (cm)
 
     Returns:
-        (list, list, list): R, Z and derivative lists for outer curve
-        points
+        (np.array, np.array): R and Z values of the inner curve points
     """
+    from scipy import integrate
+    from scipy.optimize import brentq
 
     def error(z_0):
         segment = get_segment(R0, R2, z_0)
@@ -47,14 +148,7 @@ def _compute_inner_points(R1, R2):
     segment1 = get_segment(R0, R1, z_0)
     segment2 = get_segment(R0, R2, z_0)
 
-    r_values = np.concatenate(
-        [
-            np.flip(segment1[0]),
-            segment2[0][1:],
-            np.flip(segment2[0])[1:],
-            segment1[0][1:],
-        ]
-    )
+    r_values = _inner_r_values(R1, R2)
     z_values = np.concatenate(
         [
             np.flip(segment1[1]),
@@ -114,6 +208,7 @@ def add_thickness(x: List[float], y: List[float], thickness: float, dy_dx: List[
     return x_outer, y_outer
 
 
+@timed("find_points")
 def find_points(R1, R2, thickness, vertical_displacement):
     """Finds the XZ points joined by connections that describe the 2D
     profile of the toroidal field coil shape."""
@@ -153,6 +248,28 @@ def find_points(R1, R2, thickness, vertical_displacement):
     return points, inner_leg_connection_points, inner_points, outer_points
 
 
+def toroidal_field_coil_princeton_d_profile(
+    r1: float = 100, r2: float = 300, thickness: float = 30, vertical_displacement: float = 0.0
+) -> typing.Tuple[Profile, Profile]:
+    """The 2D profiles of a toroidal_field_coil_princeton_d coil and its inner
+    leg, computed without OCC. The profiles are extruded by the coil distance
+    rather than revolved.
+
+    Args:
+        r1: Inner radius of the coil.
+        r2: Outer radius of the coil.
+        thickness: Thickness of the coil.
+        vertical_displacement: Vertical displacement of the coil.
+
+    Returns:
+        the profiles of the coil and of the inner leg.
+    """
+    points, inner_leg_connection_points, _, _ = find_points(r1, r2, thickness, vertical_displacement)
+    inner_leg_points = [(x, z, "straight") for x, z in inner_leg_connection_points]
+    return Profile.from_points(points), Profile.from_points(inner_leg_points)
+
+
+@cached_builder
 def toroidal_field_coil_princeton_d(
     r1: float = 100,
     r2: float = 300,
@@ -167,6 +284,7 @@ def toroidal_field_coil_princeton_d(
     plane: str = "XZ",
     origin: typing.Tuple[float, float, float] = (0.0, 0.0, 0.0),
     obj=None,
+    instanced: bool = False,
 ):
     """
     Creates a toroidal field coil with a Princeton-D shape.
@@ -185,29 +303,34 @@ def toroidal_field_coil_princeton_d(
         plane (str, optional): Plane in which to create the coil. Defaults to "XZ".
         origin (typing.Tuple[float, float, float], optional): Origin point for the coil. Defaults to (0.0, 0.0, 0.0).
         obj (optional): Existing object to modify. Defaults to None.
+        instanced (bool, optional): Whether to place the coils as located instances of a single coil in a
+            compound, sharing its geometry, instead of fusing them into one solid, so the coils should not
+            overlap. The build time then barely depends on the number of coils. Any inner legs are fused into
+            one solid in the compound. Defaults to False.
 
     Returns:
         solid: The created toroidal field coil solid.
     """
-    points, inner_leg_connection_points, inner_points, outer_points = find_points(
-        r1, r2, thickness, vertical_displacement
+    coil_profile, inner_leg_profile = toroidal_field_coil_princeton_d_profile(r1, r2, thickness, vertical_displacement)
+    wire = create_wire_workplane_from_arrays(
+        coil_profile.points, coil_profile.connections, plane=plane, origin=origin, obj=obj
     )
-    # need to get square end, it appears to miss the last point in the solid, TODO fix so this append is not needed
-    points.append(points[-1])
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
-    solid = wire.extrude(until=distance / 2, both=True)
-    solid = rotate_solid(angles=azimuthal_placement_angles, solid=solid)
+    with timed("extrude"):
+        solid = wire.extrude(until=distance / 2, both=True)
+    solid = rotate_solid(angles=azimuthal_placement_angles, solid=solid, fuse=not instanced)
 
     if with_inner_leg:
-        inner_leg_connection_points = [(x, z, "straight") for x, z in inner_leg_connection_points]
-        # need to get square end, it appears to miss the last point in the solid, TODO fix so this append is not needed
-        inner_leg_connection_points.append(inner_leg_connection_points[-1])
-        inner_wire = create_wire_workplane_from_points(
-            points=inner_leg_connection_points, plane=plane, origin=origin, obj=obj
+        inner_wire = create_wire_workplane_from_arrays(
+            inner_leg_profile.points, inner_leg_profile.connections, plane=plane, origin=origin, obj=obj
         )
-        inner_solid = inner_wire.extrude(until=distance / 2, both=True)
+        with timed("extrude"):
+            inner_solid = inner_wire.extrude(until=distance / 2, both=True)
         inner_solid = rotate_solid(angles=azimuthal_placement_angles, solid=inner_solid)
-        solid = solid.union(inner_solid)
+        if instanced:
+            # the inner legs of neighbouring coils overlap so they stay fused in one solid next to the coils
+            solid = solid.newObject([cq.Compound.makeCompound(solid.vals() + inner_solid.vals())])
+        else:
+            solid = solid.union(inner_solid)
 
     if rotation_angle < 360.0:
         bb = solid.val().BoundingBox()
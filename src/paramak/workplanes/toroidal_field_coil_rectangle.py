@@ -1,25 +1,22 @@
 import typing
 
-from ..utils import create_wire_workplane_from_points, rotate_solid
+import cadquery as cq
+
+from ..cache import cached_builder
+from ..timing import timed
+from ..utils import Profile, create_wire_workplane_from_arrays, rotate_solid
 from ..workplanes.cutting_wedge import cutting_wedge
 
 
-def toroidal_field_coil_rectangle(
+def toroidal_field_coil_rectangle_profile(
     horizontal_start_point: typing.Tuple[float, float] = (20, 200),
     vertical_mid_point: typing.Tuple[float, float] = (350, 0),
     thickness: float = 30,
-    distance: float = 20,
-    rotation_angle: float = 360.0,
-    name: str = "toroidal_field_coil",
-    with_inner_leg: bool = True,
-    azimuthal_placement_angles: typing.Sequence[float] = [0],
     vertical_displacement: float = 0.0,
-    color: typing.Tuple[float, float, float, typing.Optional[float]] = (0.0, 0.0, 1.0),
-    plane: str = "XZ",
-    origin: typing.Tuple[float, float, float] = (0.0, 0.0, 0.0),
-    obj=None,
-):
-    """Creates a rectangular shaped toroidal field coil.
+) -> typing.Tuple[Profile, Profile]:
+    """The 2D profiles of a toroidal_field_coil_rectangle coil and its inner
+    leg, computed without OCC. The profiles are extruded by the coil distance
+    rather than revolved.
 
     Args:
         horizontal_start_point: the (x,z) coordinates of the inner upper
@@ -27,11 +24,10 @@ def toroidal_field_coil_rectangle(
         vertical_mid_point: the (x,z) coordinates of the mid point of the
             vertical section (cm).
         thickness: the thickness of the toroidal field coil.
-        distance: the extrusion distance.
-        rotation_angle (float): angle of rotation in degrees, this cuts the resulting shape with a wedge. Useful for sector models.
-        with_inner_leg: include the inner tf leg. Defaults to True.
-        azimuth_start_angle: The azimuth angle to for the first TF coil which
-            offsets the placement of coils around the azimuthal angle
+        vertical_displacement: the vertical displacement of the coil (cm).
+
+    Returns:
+        the profiles of the coil and of the inner leg.
     """
 
     if horizontal_start_point[0] >= vertical_mid_point[0]:
@@ -76,30 +72,78 @@ def toroidal_field_coil_rectangle(
             horizontal_start_point[0],
             horizontal_start_point[1] + thickness,
         ),
-        horizontal_start_point,
     ]
 
     # adds any vertical displacement and the connection type to the points
     points = [(point[0], point[1] + vertical_displacement, "straight") for point in points]
+    inner_leg_points = [points[0], points[1], points[4], points[5]]
+
+    return Profile.from_points(points), Profile.from_points(inner_leg_points)
+
+
+@cached_builder
+def toroidal_field_coil_rectangle(
+    horizontal_start_point: typing.Tuple[float, float] = (20, 200),
+    vertical_mid_point: typing.Tuple[float, float] = (350, 0),
+    thickness: float = 30,
+    distance: float = 20,
+    rotation_angle: float = 360.0,
+    name: str = "toroidal_field_coil",
+    with_inner_leg: bool = True,
+    azimuthal_placement_angles: typing.Sequence[float] = [0],
+    vertical_displacement: float = 0.0,
+    color: typing.Tuple[float, float, float, typing.Optional[float]] = (0.0, 0.0, 1.0),
+    plane: str = "XZ",
+    origin: typing.Tuple[float, float, float] = (0.0, 0.0, 0.0),
+    obj=None,
+    instanced: bool = False,
+):
+    """Creates a rectangular shaped toroidal field coil.
+
+    Args:
+        horizontal_start_point: the (x,z) coordinates of the inner upper
+            point (cm).
+        vertical_mid_point: the (x,z) coordinates of the mid point of the
+            vertical section (cm).
+        thickness: the thickness of the toroidal field coil.
+        distance: the extrusion distance.
+        rotation_angle (float): angle of rotation in degrees, this cuts the resulting shape with a wedge. Useful for sector models.
+        with_inner_leg: include the inner tf leg. Defaults to True.
+        azimuth_start_angle: The azimuth angle to for the first TF coil which
+            offsets the placement of coils around the azimuthal angle
+        instanced: places the coils as located instances of a single coil
+            in a compound, sharing its geometry, instead of fusing them into
+            one solid, so the coils should not overlap. The build time then
+            barely depends on the number of coils. Any inner legs are fused
+            into one solid in the compound.
+    """
+
+    coil_profile, inner_leg_profile = toroidal_field_coil_rectangle_profile(
+        horizontal_start_point=horizontal_start_point,
+        vertical_mid_point=vertical_mid_point,
+        thickness=thickness,
+        vertical_displacement=vertical_displacement,
+    )
 
-    wire = create_wire_workplane_from_points(points=points, plane=plane, origin=origin, obj=obj)
-    solid = wire.extrude(until=distance / 2, both=True)
-    solid = rotate_solid(angles=azimuthal_placement_angles, solid=solid)
+    wire = create_wire_workplane_from_arrays(
+        coil_profile.points, coil_profile.connections, plane=plane, origin=origin, obj=obj
+    )
+    with timed("extrude"):
+        solid = wire.extrude(until=distance / 2, both=True)
+    solid = rotate_solid(angles=azimuthal_placement_angles, solid=solid, fuse=not instanced)
 
     if with_inner_leg:
-        inner_leg_connection_points = [
-            (points[0][0], points[0][1], "straight"),
-            (points[1][0], points[1][1], "straight"),
-            (points[4][0], points[4][1], "straight"),
-            (points[5][0], points[5][1], "straight"),
-            (points[0][0], points[0][1], "straight"),
-        ]
-        inner_wire = create_wire_workplane_from_points(
-            points=inner_leg_connection_points, plane=plane, origin=origin, obj=obj
+        inner_wire = create_wire_workplane_from_arrays(
+            inner_leg_profile.points, inner_leg_profile.connections, plane=plane, origin=origin, obj=obj
         )
-        inner_solid = inner_wire.extrude(until=distance / 2, both=True)
+        with timed("extrude"):
+            inner_solid = inner_wire.extrude(until=distance / 2, both=True)
         inner_solid = rotate_solid(angles=azimuthal_placement_angles, solid=inner_solid)
-        solid = solid.union(inner_solid)
+        if instanced:
+            # the inner legs of neighbouring coils overlap so they stay fused in one solid next to the coils
+            solid = solid.newObject([cq.Compound.makeCompound(solid.vals() + inner_solid.vals())])
+        else:
+            solid = solid.union(inner_solid)
 
     if rotation_angle < 360.0:
         bb = solid.val().BoundingBox()
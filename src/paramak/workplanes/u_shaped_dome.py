@@ -2,33 +2,15 @@ import typing
 
 from paramak import center_column_shield_cylinder, constant_thickness_dome
 
-from ..utils import create_wire_workplane_from_points
+from ..cache import cached_builder
+from ..utils import Profile
+from .center_column_shield_cylinder import center_column_shield_cylinder_profile
+from .constant_thickness_dome import constant_thickness_dome_profile
 
 
-def u_shaped_dome(
-    radius: float = 310,
-    reference_point: tuple = ("lower", 0),
-    dish_height: typing.Tuple[float, float] = 50,
-    cylinder_height: float = 400,
-    thickness: float = 16,
-    rotation_angle: float = 180,
-    name: str = "u_shaped_dome",
-    plane="XZ",
-    upper_or_lower="upper",
-):
-    """A cylindrical u shaped dome with constant thickness.
-
-    Arguments:
-        radius: the radius from which the centres of the vessel meets the outer
-            circumference.
-        reference_point: the x,z coordinates to build te vessel from. Can be
-            either the 'center' with a value or 'lower' with a
-            value. For example
-        dish_height: the height of the lower and upper dish sections.
-        cylinder_height: the height of the cylindrical section of the vacuum
-            vessel.
-        thickness: the radial thickness of the vessel in cm.
-    """
+def _section_heights(radius, reference_point, dish_height, cylinder_height, thickness):
+    """Checks the arguments and returns the heights of the center of the
+    cylinder section and of the lower and upper chord centers."""
 
     if not isinstance(radius, (float, int)):
         raise ValueError(f"radius must be a number. Not {type(radius)}")
@@ -40,7 +22,7 @@ def u_shaped_dome(
         msg = f"VacuumVessel.thickness must be a number. Not {type(thickness)}"
         raise ValueError(msg)
     if thickness <= 0:
-        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {value}"
+        msg = f"VacuumVessel.thickness must be a positive number above 0. Not {thickness}"
         raise ValueError(msg)
 
         #
@@ -66,6 +48,87 @@ def u_shaped_dome(
         upper_chord_center_height = reference_point[1] + thickness + dish_height + cylinder_height
     else:
         raise ValueError('reference_point should be a tuple where the first value is either "center" or "lower"')
+    return center_height, lower_chord_center_height, upper_chord_center_height
+
+
+def u_shaped_dome_profile(
+    radius: float = 310,
+    reference_point: tuple = ("lower", 0),
+    dish_height: typing.Tuple[float, float] = 50,
+    cylinder_height: float = 400,
+    thickness: float = 16,
+    upper_or_lower="upper",
+) -> typing.Tuple[Profile, Profile]:
+    """The 2D profiles of the u_shaped_dome sections, computed without OCC.
+    The arguments are described in u_shaped_dome.
+
+    Returns:
+        the profiles of the dome and cylinder sections.
+    """
+
+    center_height, lower_chord_center_height, upper_chord_center_height = _section_heights(
+        radius=radius,
+        reference_point=reference_point,
+        dish_height=dish_height,
+        cylinder_height=cylinder_height,
+        thickness=thickness,
+    )
+
+    cylinder_section = center_column_shield_cylinder_profile(
+        height=cylinder_height,
+        inner_radius=radius - thickness,
+        thickness=thickness,
+        reference_point=("center", center_height),
+    )
+    if upper_or_lower == "upper":
+        chord_center_height = upper_chord_center_height
+    elif upper_or_lower == "lower":
+        chord_center_height = lower_chord_center_height
+    else:
+        raise ValueError(f'upper_or_lower must be either "lower" or "upper" not {upper_or_lower}')
+    dome_section = constant_thickness_dome_profile(
+        thickness=thickness,
+        chord_center_height=chord_center_height,
+        chord_width=(radius - thickness) * 2,
+        chord_height=dish_height,
+        upper_or_lower=upper_or_lower,
+    )
+    return dome_section, cylinder_section
+
+
+@cached_builder
+def u_shaped_dome(
+    radius: float = 310,
+    reference_point: tuple = ("lower", 0),
+    dish_height: typing.Tuple[float, float] = 50,
+    cylinder_height: float = 400,
+    thickness: float = 16,
+    rotation_angle: float = 180,
+    name: str = "u_shaped_dome",
+    plane="XZ",
+    upper_or_lower="upper",
+):
+    """A cylindrical u shaped dome with constant thickness.
+
+    Arguments:
+        radius: the radius from which the centres of the vessel meets the outer
+            circumference.
+        reference_point: the x,z coordinates to build te vessel from. Can be
+            either the 'center' with a value or 'lower' with a
+            value. For example
+        dish_height: the height of the lower and upper dish sections.
+        cylinder_height: the height of the cylindrical section of the vacuum
+            vessel.
+        thickness: the radial thickness of the vessel in cm.
+    """
+
+    center_height, lower_chord_center_height, upper_chord_center_height = _section_heights(
+        radius=radius,
+        reference_point=reference_point,
+        dish_height=dish_height,
+        cylinder_height=cylinder_height,
+        thickness=thickness,
+    )
 
     cylinder_section = center_column_shield_cylinder(
         height=cylinder_height,
@@ -1,4 +1,7 @@
 import cadquery as cq
+import pytest
+from OCP.BRep import BRep_Tool
+from OCP.TopLoc import TopLoc_Location
 from paramak.assemblies.assembly import Assembly
 
 def test_remove_and_names():
@@ -17,3 +20,119 @@ def test_remove_and_names():
     assert assembly2.names() == ['box1']
     assert assembly3.names() == ['sphere']
     assert assembly4.names() == ['box1', 'sphere']
+
+
+def make_assembly():
+    assembly = Assembly()
+    assembly.add(cq.Workplane().box(1, 1, 1), name="box1", color=cq.Color(0.5, 0.5, 0.5))
+    assembly.add(cq.Workplane().moveTo(2, 2).sphere(1), name="sphere")
+    assembly.add(cq.Workplane().box(2, 2, 2), name="box2")
+    assembly.elongation = 2.0
+    assembly.minor_radius = 100
+    return assembly
+
+
+def test_remove_keeps_reactor_attributes():
+    assembly = make_assembly()
+
+    copy = assembly.remove("sphere")
+
+    assert copy.names() == ["box1", "box2"]
+    assert assembly.names() == ["box1", "sphere", "box2"]
+    assert copy.elongation == 2.0
+    assert copy.minor_radius == 100
+    assert copy.get("box1").obj is assembly.get("box1").obj
+    assert "sphere" not in copy.objects and "sphere" in assembly.objects
+
+
+def test_remove_inplace():
+    assembly = make_assembly()
+
+    assert assembly.remove("sphere", inplace=True) is assembly
+    assert assembly.names() == ["box1", "box2"]
+    assert "sphere" not in assembly.objects
+    assert set(assembly.volumes()) == {"box1", "box2"}
+    with pytest.warns(UserWarning):
+        assembly.remove("sphere", inplace=True)
+
+
+def test_get_rename_and_replace():
+    assembly = make_assembly()
+    sphere = assembly.get("sphere")
+
+    assembly.rename("sphere", "ball")
+    assert assembly.get("ball") is sphere
+    assert assembly.names() == ["box1", "ball", "box2"]
+    with pytest.raises(KeyError):
+        assembly.get("sphere")
+    with pytest.raises(ValueError):
+        assembly.rename("ball", "box1")
+
+    cylinder = cq.Workplane().cylinder(1, 1)
+    assembly.replace("box1", cylinder)
+    assert assembly.get("box1").obj is cylinder
+    assert assembly.get("box1").color.toTuple() == cq.Color(0.5, 0.5, 0.5).toTuple()
+    assert assembly.names() == ["box1", "ball", "box2"]
+
+
+def test_nested_parts():
+    subassembly = Assembly(name="coils")
+    subassembly.add(cq.Workplane().box(1, 1, 1), name="coil_1")
+    subassembly.add(cq.Workplane().box(1, 1, 1).translate((5, 0, 0)), name="coil_2")
+    assembly = make_assembly()
+    assembly.add(subassembly)
+
+    assert assembly.names() == ["box1", "sphere", "box2", "coil_1", "coil_2"]
+    assert assembly.get("coil_2") is assembly.get("coils/coil_2")
+
+    assembly.rename("coil_2", "coil_3")
+    assert "coils/coil_3" in assembly.objects and "coils/coil_2" not in assembly.objects
+    assembly.remove("coils", inplace=True)
+    assert assembly.names() == ["box1", "sphere", "box2"]
+    assert [name for name in assembly.objects if name.startswith("coils")] == []
+
+
+def stl_triangle_count(filename):
+    with open(filename, "rb") as file:
+        file.seek(80)
+        return int.from_bytes(file.read(4), "little")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_meshes(tmp_path, workers):
+    assembly = make_assembly()
+
+    filenames = assembly.export_meshes(tmp_path, part_tolerances={"sphere": (0.001, 0.05)}, workers=workers)
+
+    assert filenames == {name: str(tmp_path / f"{name}.stl") for name in ["box1", "sphere", "box2"]}
+    assert stl_triangle_count(filenames["box1"]) == 12
+    coarse = assembly.export_meshes(tmp_path / "coarse", workers=workers)
+    assert stl_triangle_count(filenames["sphere"]) > stl_triangle_count(coarse["sphere"])
+
+    combined = assembly.export_meshes(tmp_path, filename="reactor.stl", workers=workers)
+    assert set(combined.values()) == {str(tmp_path / "reactor.stl")}
+    assert stl_triangle_count(tmp_path / "reactor.stl") == sum(stl_triangle_count(name) for name in coarse.values())
+    assert (tmp_path / "reactor.stl").stat().st_size == 84 + 50 * stl_triangle_count(tmp_path / "reactor.stl")
+
+
+def test_export_meshes_leaves_parts_untouched(tmp_path):
+    assembly = make_assembly()
+    sphere = assembly.get("sphere").obj.val()
+    sphere.mesh(0.001, 0.05)
+    fine_triangles = len(sphere.tessellate(0.001, 0.05)[1])
+
+    coarse = assembly.export_meshes(tmp_path)
+
+    # the finer triangles of the part are neither reused nor removed
+    assert stl_triangle_count(coarse["sphere"]) < fine_triangles
+    assert BRep_Tool.Triangulation_s(sphere.Faces()[0].wrapped, TopLoc_Location()) is not None
+
+
+def test_export_meshes_duplicate_part_names(tmp_path):
+    assembly = make_assembly()
+    subassembly = Assembly()
+    subassembly.add(cq.Workplane().box(1, 1, 1), name="box1")
+    assembly.add(subassembly, name="subassembly")
+
+    with pytest.raises(ValueError):
+        assembly.export_meshes(tmp_path)
@@ -0,0 +1,138 @@
+import gc
+import json
+import weakref
+
+import cadquery as cq
+import pytest
+
+import paramak
+from paramak.assemblies import spherical_tokamak
+from paramak.assemblies.assembly import Assembly
+
+
+def build_reactor(extra_cut_shapes=True):
+    return paramak.tokamak_from_plasma(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 30),
+            (paramak.LayerType.SOLID, 50),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 20),
+            (paramak.LayerType.SOLID, 50),
+        ],
+        elongation=2,
+        rotation_angle=90,
+        extra_cut_shapes=(
+            [paramak.poloidal_field_coil(height=30, width=30, center_point=(700, 0), rotation_angle=90)]
+            if extra_cut_shapes
+            else []
+        ),
+        colors={"plasma": (1, 0, 0)},
+    )
+
+
+@pytest.mark.parametrize("file_format", ["brep", "step"])
+def test_parts_written_as_they_are_added(tmp_path, file_format):
+    reactor = build_reactor()
+
+    with paramak.PartWriter(tmp_path, file_format=file_format) as writer:
+        manifest = build_reactor()
+
+    # the reactor function returns the manifest of the written parts rather than an assembly
+    assert isinstance(manifest, dict)
+    assert [part["name"] for part in manifest["parts"]] == reactor.names()
+    assert manifest["attributes"]["elongation"] == reactor.elongation
+    assert len(writer.parts) == len(manifest["parts"])
+    assert json.loads((tmp_path / "manifest.json").read_text())["attributes"] == manifest["attributes"]
+    for part in manifest["parts"]:
+        assert (tmp_path / part["file"]).exists()
+
+    loaded = Assembly.from_parts(tmp_path)
+    assert loaded.names() == reactor.names()
+    assert loaded.material_tags() == reactor.material_tags()
+    assert loaded.elongation == reactor.elongation
+    assert loaded.fidelity == "full"
+    assert loaded.objects["plasma"].color.toTuple() == pytest.approx((1, 0, 0, 1))
+    volumes = reactor.volumes()
+    for name, volume in loaded.volumes().items():
+        assert volume == pytest.approx(volumes[name], rel=1e-6)
+
+
+@pytest.mark.parametrize("with_writer", [True, False])
+def test_components_released_once_written(tmp_path, monkeypatch, with_writer):
+    """While a PartWriter is active the components are built one at a time
+    and each is released once written, so that at most the previous one is
+    still alive when the next is built."""
+
+    build_workplanes = spherical_tokamak.build_workplanes
+    built = []
+    alive = []
+
+    def tracked_build_workplanes(tasks, workers=None):
+        gc.collect()
+        alive.append(sum(reference() is not None for reference in built))
+        workplanes = build_workplanes(tasks, workers=workers)
+        built.extend(weakref.ref(workplane) for workplane in workplanes)
+        return workplanes
+
+    monkeypatch.setattr(spherical_tokamak, "build_workplanes", tracked_build_workplanes)
+    if with_writer:
+        with paramak.PartWriter(tmp_path):
+            build_reactor()
+        # the two blanket layers and the plasma
+        assert len(alive) == 3
+        assert max(alive) <= 1
+    else:
+        build_reactor()
+        assert alive == [0]
+
+
+def test_brep_parts_keep_profiles(tmp_path):
+    with paramak.PartWriter(tmp_path):
+        build_reactor(extra_cut_shapes=False)
+
+    loaded = Assembly.from_parts(tmp_path)
+
+    # the center column cylinder is not cut so it keeps the profile it was revolved from
+    assert loaded.objects["layer_1"].obj.profiles is not None
+    assert loaded.objects["layer_1"].obj.rotation_angle == 90
+
+
+def test_writer_is_only_active_in_the_context(tmp_path):
+    with paramak.PartWriter(tmp_path) as writer:
+        inside = Assembly()
+        inside.add(cq.Workplane().box(1, 1, 1), name="box", loc=cq.Location(1, 2, 3))
+    outside = Assembly()
+    outside.add(cq.Workplane().box(1, 1, 1), name="box")
+
+    assert inside.objects["box"].obj is None
+    assert outside.objects["box"].obj is not None
+    assert Assembly.from_parts(tmp_path).objects["box"].loc.toTuple()[0] == pytest.approx((1, 2, 3))
+    assert [part["solids"] for part in writer.parts] == [1]
+
+
+def test_writer_takes_positional_arguments(tmp_path):
+    with paramak.PartWriter(tmp_path):
+        assembly = Assembly()
+        assembly.add(cq.Workplane().box(1, 1, 1), cq.Location(1, 2, 3), "box")
+
+    assert assembly.objects["box"].obj is None
+    assert Assembly.from_parts(tmp_path).objects["box"].loc.toTuple()[0] == pytest.approx((1, 2, 3))
+
+
+def test_step_parts_are_not_serialised_to_brep(tmp_path, monkeypatch):
+    def fail(workplane):
+        raise AssertionError("STEP parts should not be serialised to BREP")
+
+    monkeypatch.setattr(paramak.assemblies.part_writer, "workplane_to_bytes", fail)
+    with paramak.PartWriter(tmp_path, file_format="step"):
+        Assembly().add(cq.Workplane().box(1, 1, 1), name="box")
+
+    assert Assembly.from_parts(tmp_path).objects["box"].obj.val().Volume() == pytest.approx(1)
+
+
+def test_unknown_file_format(tmp_path):
+    with pytest.raises(ValueError):
+        paramak.PartWriter(tmp_path, file_format="stl")
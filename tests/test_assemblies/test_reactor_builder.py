@@ -0,0 +1,80 @@
+import pytest
+
+import paramak
+
+RADIAL_BUILD = [
+    (paramak.LayerType.GAP, 10),
+    (paramak.LayerType.SOLID, 30),
+    (paramak.LayerType.SOLID, 50),
+    (paramak.LayerType.GAP, 50),
+    (paramak.LayerType.PLASMA, 300),
+    (paramak.LayerType.GAP, 60),
+    (paramak.LayerType.SOLID, 20),
+    (paramak.LayerType.SOLID, 50),
+    (paramak.LayerType.SOLID, 30),
+]
+
+
+def with_thickness(radial_build, index, thickness):
+    radial_build = list(radial_build)
+    radial_build[index] = (radial_build[index][0], thickness)
+    return radial_build
+
+
+@pytest.fixture
+def builder():
+    cutter = paramak.poloidal_field_coil(height=30, width=30, center_point=(700, 0), rotation_angle=180)
+    return paramak.ReactorBuilder(
+        paramak.tokamak_from_plasma,
+        radial_build=RADIAL_BUILD,
+        elongation=2,
+        rotation_angle=180,
+        extra_cut_shapes=[cutter],
+    )
+
+
+def test_outer_layer_change_rebuilds_outer_layers(builder):
+    builder.build()
+    assert builder.reused == []
+
+    radial_build = with_thickness(RADIAL_BUILD, 7, 70)
+    reactor = builder.build(radial_build=radial_build)
+
+    assert builder.rebuilt == ["layer_3", "layer_4", "layer_3/cut", "layer_4/cut"]
+    assert builder.reused == ["layer_2", "plasma_simplified", "layer_2/cut"]
+    assert builder.arguments["radial_build"] == radial_build
+
+    full_build = paramak.tokamak_from_plasma(
+        radial_build=radial_build,
+        elongation=2,
+        rotation_angle=180,
+        extra_cut_shapes=builder.arguments["extra_cut_shapes"],
+    )
+    assert reactor.names() == full_build.names()
+    for name, volume in full_build.volumes().items():
+        assert reactor.volumes()[name] == pytest.approx(volume)
+
+
+def test_unchanged_build_is_reused(builder):
+    first = builder.build()
+    second = builder.build()
+
+    assert builder.rebuilt == []
+    assert second.objects["plasma"].obj is first.objects["plasma"].obj
+
+
+def test_inner_change_rebuilds_everything(builder):
+    builder.build()
+    builder.build(radial_build=with_thickness(RADIAL_BUILD, 2, 40))
+
+    assert builder.reused == []
+
+
+def test_failed_build_keeps_components(builder):
+    builder.build()
+    with pytest.raises(Exception):
+        builder.build(radial_build=RADIAL_BUILD[:4])
+    assert builder.arguments["radial_build"] == RADIAL_BUILD
+
+    builder.build(elongation=2)
+    assert builder.rebuilt == []
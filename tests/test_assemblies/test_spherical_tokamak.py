@@ -157,4 +157,107 @@ def test_attributes():
     assert my_reactor.elongation == 2
     assert my_reactor.triangularity == 0.55
     assert my_reactor.major_radius == 275
-    assert my_reactor.minor_radius == 150
\ No newline at end of file
+    assert my_reactor.minor_radius == 150
+
+def test_parallel_build_matches_serial_build():
+    """Building the components in worker processes should give exactly the
+    same solids as building them one after another."""
+
+    from paramak.utils import workplane_from_bytes, workplane_to_bytes
+
+    radial_build = [
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 50),
+        (paramak.LayerType.GAP, 50),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 15),
+        (paramak.LayerType.SOLID, 60),
+    ]
+    serial = paramak.spherical_tokamak_from_plasma(radial_build=radial_build, elongation=2, triangularity=0.55)
+    parallel = paramak.spherical_tokamak_from_plasma(
+        radial_build=radial_build, elongation=2, triangularity=0.55, workers=2
+    )
+
+    assert parallel.names() == serial.names()
+    for serial_part, parallel_part in zip(serial.children, parallel.children):
+        # the parallel parts have been read from binary BREP once
+        serial_part_from_bytes = workplane_from_bytes(*workplane_to_bytes(serial_part.obj))
+        assert workplane_to_bytes(parallel_part.obj) == workplane_to_bytes(serial_part_from_bytes)
+
+
+
+@pytest.mark.parametrize("rotation_angle", [30, 180])
+def test_material_tags_with_magnets(rotation_angle):
+    poloidal_field_coils = []
+    for case_thickness, height, width, center_point in zip([10, 15], [20, 50], [20, 50], [(500, 300), (590, 100)]):
+        poloidal_field_coils.append(
+            paramak.poloidal_field_coil(
+                height=height, width=width, center_point=center_point, rotation_angle=rotation_angle
+            )
+        )
+        poloidal_field_coils.append(
+            paramak.poloidal_field_coil_case(
+                coil_height=height,
+                coil_width=width,
+                casing_thickness=case_thickness,
+                rotation_angle=rotation_angle,
+                center_point=center_point,
+            )
+        )
+    my_reactor = paramak.spherical_tokamak_from_plasma(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 50),
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.SOLID, 60),
+            (paramak.LayerType.SOLID, 10),
+            (paramak.LayerType.GAP, 10),
+        ],
+        elongation=2,
+        triangularity=0.55,
+        rotation_angle=rotation_angle,
+        extra_cut_shapes=poloidal_field_coils,
+    )
+
+    names = my_reactor.solid_names()
+    # the rear wall is split into 2 parts by the magnet that is cut out
+    assert len(names) == len(my_reactor.toCompound().Solids()) == 11
+    assert [name for name in my_reactor.names() if names.count(name) == 2] == ["layer_5"]
+    assert my_reactor.material_tags({"layer_5": "steel"}).count("steel") == 2
+
+
+def test_preview_keeps_intersect_cuts():
+    import cadquery as cq
+
+    radial_build = [
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 50),
+        (paramak.LayerType.GAP, 50),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 60),
+    ]
+    coil = paramak.poloidal_field_coil(height=50, width=50, center_point=(500, 100), rotation_angle=180)
+    divertor = cq.Workplane("XZ").polyline([(250, -2000), (250, 0), (350, 0), (350, -2000)]).close().revolve(180)
+    kwargs = dict(radial_build=radial_build, rotation_angle=180, extra_intersect_shapes=[divertor])
+
+    preview = paramak.spherical_tokamak_from_plasma(extra_cut_shapes=[coil], fidelity="preview", **kwargs)
+    uncut = paramak.spherical_tokamak_from_plasma(fidelity="preview", **kwargs)
+
+    assert preview.fidelity == "preview"
+    assert "extra_intersect_shapes_1" in preview.names()
+    # the layer is cut by the divertor but not by the coil it overlaps
+    volumes = preview.volumes()
+    assert volumes["layer_2"] == pytest.approx(uncut.volumes()["layer_2"])
+    assert volumes["layer_2"] + volumes["extra_intersect_shapes_1"] == pytest.approx(
+        paramak.spherical_tokamak_from_plasma(radial_build=radial_build, rotation_angle=180, fidelity="preview")
+        .get("layer_2")
+        .obj.val()
+        .Volume(),
+        rel=1e-3,
+    )
@@ -30,4 +30,98 @@ def test_colors():
             "layer_4": (0.4, 0.4, 0.8),
             "layer_5": (0.5, 0.5, 0.8),
         }
-    )
\ No newline at end of file
+    )
+
+def test_parallel_build_matches_serial_build():
+    """Building the components in worker processes should give exactly the
+    same solids as building them one after another."""
+
+    from paramak.utils import workplane_from_bytes, workplane_to_bytes
+
+    radial_build = [
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 30),
+        (paramak.LayerType.SOLID, 50),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 20),
+    ]
+    serial = paramak.tokamak_from_plasma(radial_build=radial_build, elongation=2, triangularity=0.55)
+    parallel = paramak.tokamak_from_plasma(radial_build=radial_build, elongation=2, triangularity=0.55, workers=2)
+
+    assert parallel.names() == serial.names()
+    for serial_part, parallel_part in zip(serial.children, parallel.children):
+        # the parallel parts have been read from binary BREP once
+        serial_part_from_bytes = workplane_from_bytes(*workplane_to_bytes(serial_part.obj))
+        assert workplane_to_bytes(parallel_part.obj) == workplane_to_bytes(serial_part_from_bytes)
+
+
+def test_material_tags_follow_split_solids():
+    """A slab cutting through the middle of the 180 degree layers splits
+    each of them in two solids, which keep the name of their layer."""
+
+    import cadquery as cq
+    import pytest
+
+    slab = cq.Workplane("XY").box(10, 2000, 2000)
+    reactor = paramak.tokamak_from_plasma(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 30),
+            (paramak.LayerType.SOLID, 20),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 20),
+        ],
+        elongation=2,
+        rotation_angle=180,
+        extra_cut_shapes=[slab],
+    )
+    reactor = reactor.remove("add_extra_cut_shape_1")
+
+    solids = reactor.toCompound().Solids()
+    names = reactor.solid_names()
+    assert len(names) == len(solids)
+    assert names.count("layer_1") == 2 and names.count("layer_2") == 2 and names.count("plasma") == 1
+
+    part_volumes = [solid.Volume() for part in reactor.names() for solid in reactor.get(part).obj.solids().vals()]
+    assert [solid.Volume() for solid in solids] == pytest.approx(part_volumes)
+
+    reactor.get("layer_2").metadata["material_tag"] = "breeder"
+    tags = reactor.material_tags(tags={"layer_1": "tungsten"})
+    assert tags == ["tungsten", "tungsten", "breeder", "breeder", "plasma"]
+
+
+def test_preview_skips_cuts():
+    import cadquery as cq
+    import pytest
+
+    radial_build = [
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 30),
+        (paramak.LayerType.SOLID, 20),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 20),
+    ]
+    slab = cq.Workplane("XY").box(10, 2000, 2000)
+    full = paramak.tokamak_from_plasma(radial_build=radial_build, rotation_angle=180, extra_cut_shapes=[slab])
+    preview = paramak.tokamak_from_plasma(
+        radial_build=radial_build, rotation_angle=180, extra_cut_shapes=[slab], fidelity="preview"
+    )
+    uncut = paramak.tokamak_from_plasma(radial_build=radial_build, rotation_angle=180, fidelity="preview")
+
+    assert full.fidelity == "full"
+    assert preview.fidelity == "preview"
+    assert preview.remove("plasma").fidelity == "preview"
+    assert preview.names() == full.names()
+    # the slab splits each full layer in two, and the preview layers are not cut
+    assert full.solid_names().count("layer_2") == 2
+    assert preview.solid_names().count("layer_2") == 1
+    assert preview.volumes()["layer_2"] == pytest.approx(uncut.volumes()["layer_2"])
+    assert set(preview.get("layer_2").obj.profiles[0].connections) == {"straight"}
+    with pytest.raises(ValueError):
+        paramak.tokamak_from_plasma(radial_build=radial_build, fidelity="draft")
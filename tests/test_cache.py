@@ -0,0 +1,196 @@
+import cadquery as cq
+import numpy as np
+import pytest
+
+import paramak
+from paramak import cache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    # disables the in-memory cache so that repeated calls reach the disk
+    cache.configure_memory_cache(max_entries=0)
+    yield cache.enable_disk_cache(tmp_path / "cache")
+    cache.disable_disk_cache()
+    cache.configure_memory_cache(max_entries=0)
+
+
+@pytest.fixture
+def memory_cache():
+    yield cache.configure_memory_cache()
+    cache.configure_memory_cache(max_entries=0)
+
+
+def test_disk_cache_disabled_by_default():
+    assert cache.disk_cache_stats() is None
+
+
+def test_memory_cache_disabled_by_default():
+    assert cache.cache_info().max_entries == 0
+    paramak.poloidal_field_coil(height=20, width=30, center_point=(500, 100))
+    assert cache.cache_info().entries == 0
+
+
+def test_memory_cache_miss_returns_built_result(memory_cache, monkeypatch):
+    """A miss should hand out the built Workplane and keep a single copy."""
+
+    copies = []
+    original = cache.workplane_from_bytes
+    monkeypatch.setattr(cache, "workplane_from_bytes", lambda *args: copies.append(args) or original(*args))
+    built = paramak.poloidal_field_coil(height=20, width=30, center_point=(500, 100))
+
+    assert len(copies) == 1
+    cached_entry = next(iter(memory_cache.entries.values()))[1]
+    assert cached_entry is not built
+    assert cached_entry.val().Volume() == built.val().Volume()
+
+
+def test_disk_cache_hit_returns_same_solid(disk_cache):
+    """Building the same coil twice should read the second one from disk with
+    identical geometry, name and color."""
+
+    coil = paramak.poloidal_field_coil(height=20, width=30, center_point=(500, 100), rotation_angle=180)
+    cached_coil = paramak.poloidal_field_coil(height=20.0, width=30, center_point=(500, 100), rotation_angle=180)
+
+    stats = cache.disk_cache_stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+    assert stats.entries == 1
+    assert cached_coil is not coil
+    assert cached_coil.val().Volume() == coil.val().Volume()
+    assert cached_coil.name == coil.name
+    assert cached_coil.color == coil.color
+    assert cached_coil.plane.zDir == coil.plane.zDir
+
+
+def test_disk_cache_survives_new_cache_instance(disk_cache):
+    """Entries written in an earlier run should be reused."""
+
+    paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20)
+
+    new_cache = cache.enable_disk_cache(disk_cache.directory)
+    paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20)
+
+    assert new_cache.stats().hits == 1
+    assert new_cache.stats().misses == 0
+
+
+def test_disk_cache_tuple_results(disk_cache):
+    """Builders returning several Workplanes should be cached as a tuple."""
+
+    vessel = paramak.dished_vacuum_vessel()
+    cached_vessel = paramak.dished_vacuum_vessel()
+
+    assert isinstance(cached_vessel, tuple)
+    assert len(cached_vessel) == len(vessel)
+    for part, cached_part in zip(vessel, cached_vessel):
+        assert cached_part.val().Volume() == pytest.approx(part.val().Volume())
+
+
+def test_disk_cache_key_normalization():
+    """Equivalent numbers should give the same key while the version and
+    other values should change it."""
+
+    builder = paramak.poloidal_field_coil.__wrapped__
+    key = cache.builder_key(builder, (), dict(height=1, width=2, center_point=(3, 4)))
+
+    assert key == cache.builder_key(builder, (), dict(height=1.0, width=np.float64(2), center_point=[3, 4.0]))
+    assert key == cache.builder_key(builder, (1, 2, (3, 4)), {})
+    assert key != cache.builder_key(builder, (), dict(height=1, width=2, center_point=(3, 5)))
+
+
+def test_disk_cache_key_includes_version(monkeypatch):
+    builder = paramak.poloidal_field_coil.__wrapped__
+    key = cache.builder_key(builder, (), dict(height=1, width=2, center_point=(3, 4)))
+
+    monkeypatch.setattr(cache, "paramak_version", lambda: "0.0.0")
+
+    assert key != cache.builder_key(builder, (), dict(height=1, width=2, center_point=(3, 4)))
+
+
+def test_disk_cache_skips_callable_arguments(disk_cache):
+    """Arguments that can not be normalized are built without the cache."""
+
+    paramak.blanket_from_plasma(thickness=lambda theta: 10, start_angle=-90, stop_angle=90)
+
+    stats = cache.disk_cache_stats()
+    assert stats.hits == 0
+    assert stats.misses == 0
+    assert stats.entries == 0
+
+
+def test_disk_cache_eviction(tmp_path, memory_cache):
+    """The least recently used entries should be removed once the size limit
+    is exceeded."""
+
+    disk_cache = cache.enable_disk_cache(tmp_path, max_size=1)
+    try:
+        paramak.poloidal_field_coil(height=20, width=30, center_point=(500, 100))
+        paramak.poloidal_field_coil(height=20, width=30, center_point=(600, 100))
+    finally:
+        cache.disable_disk_cache()
+
+    stats = disk_cache.stats()
+    assert stats.evictions == 2
+    assert stats.entries == 0
+
+    disk_cache.clear()
+    assert disk_cache.stats() == (0, 0, 0, 0, 0, 1)
+
+
+def test_memory_cache_returns_unaliased_copies(memory_cache):
+    """Repeated builds should be served from memory as copies that can be
+    changed without affecting later results."""
+
+    kwargs = dict(coil_height=20, coil_width=30, casing_thickness=5, center_point=(500, 100))
+    case = paramak.poloidal_field_coil_case(**kwargs)
+    case.name = "changed"
+    case.val().move(cq.Location(cq.Vector(0, 0, 1000)))
+    cached_case = paramak.poloidal_field_coil_case(**kwargs)
+    other_cached_case = paramak.poloidal_field_coil_case(**kwargs)
+
+    assert cached_case.name == "poloidal_field_coil_case"
+    assert cached_case is not other_cached_case
+    assert cached_case.val() is not other_cached_case.val()
+    assert not cached_case.val().isSame(other_cached_case.val())
+    assert cached_case.val().Volume() == pytest.approx(case.val().Volume())
+    assert cached_case.val().Center().z == pytest.approx(case.val().Center().z - 1000)
+    assert paramak.poloidal_field_coil_case.cache_info()[:3] == (2, 1, 1)
+
+
+def test_memory_cache_bounded_by_entries():
+    memory_cache = cache.configure_memory_cache(max_entries=2)
+    try:
+        for radius in [10, 20, 30]:
+            paramak.center_column_shield_cylinder(height=100, inner_radius=radius, thickness=20)
+        assert cache.cache_info().entries == 2
+
+        # the least recently used entry (radius 10) was removed
+        paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20)
+        assert cache.cache_info().hits == 0
+        paramak.center_column_shield_cylinder(height=100, inner_radius=30, thickness=20)
+        assert cache.cache_info().hits == 1
+    finally:
+        cache.configure_memory_cache(max_entries=0)
+
+
+def test_memory_cache_bounded_by_size():
+    memory_cache = cache.configure_memory_cache(max_size=1)
+    try:
+        paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20)
+        assert memory_cache.info().entries == 0
+        assert memory_cache.info().size == 0
+    finally:
+        cache.configure_memory_cache(max_entries=0)
+
+
+def test_memory_cache_clear(memory_cache):
+    paramak.poloidal_field_coil(height=20, width=30, center_point=(500, 100))
+    paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20)
+
+    paramak.poloidal_field_coil.cache_clear()
+    assert paramak.poloidal_field_coil.cache_info().entries == 0
+    assert paramak.center_column_shield_cylinder.cache_info().entries == 1
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 0, 128, 0, 256_000_000)
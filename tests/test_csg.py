@@ -0,0 +1,91 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+from cadquery import Vector, Vertex
+
+import paramak
+from paramak.assemblies.assembly import Assembly
+from paramak.csg import assembly_to_csg
+
+
+def assert_regions_match_solids(geometry, assembly, samples=300):
+    """Checks that random points are in the CSG cells exactly when they are
+    in the solids of the parts."""
+    generator = np.random.default_rng(1)
+    for cell in geometry.cells:
+        shape = assembly.get(cell.name).obj.val()
+        bounding_box = shape.BoundingBox()
+        low = np.array([bounding_box.xmin, bounding_box.ymin, bounding_box.zmin]) - 5
+        high = np.array([bounding_box.xmax, bounding_box.ymax, bounding_box.zmax]) + 5
+        for point in generator.uniform(low, high, size=(samples, 3)):
+            # skips points within the tolerance of the surfaces
+            if shape.distance(Vertex.makeVertex(*point)) < 1e-3:
+                continue
+            assert geometry.contains(cell.name, point) == shape.isInside(Vector(*point)), (cell.name, point)
+
+
+@pytest.mark.parametrize("rotation_angle", [90, 180, 270, 360])
+def test_regions_match_solids(rotation_angle):
+    assembly = Assembly()
+    assembly.add(
+        paramak.center_column_shield_cylinder(
+            height=100, inner_radius=10, thickness=5, rotation_angle=rotation_angle
+        ),
+        name="column",
+    )
+    assembly.add(
+        paramak.poloidal_field_coil(height=20, width=30, center_point=(100, 30), rotation_angle=rotation_angle),
+        name="coil",
+    )
+    assembly.add(
+        paramak.poloidal_field_coil_case(
+            coil_height=20, coil_width=30, casing_thickness=5, center_point=(100, 30), rotation_angle=rotation_angle
+        ),
+        name="case",
+    )
+    assembly.add(paramak.plasma_simplified(rotation_angle=rotation_angle), name="plasma")
+
+    geometry = assembly_to_csg(assembly)
+
+    assert [cell.name for cell in geometry.cells] == ["column", "coil", "case"]
+    assert geometry.cad_parts == ("plasma",)
+    assert_regions_match_solids(geometry, assembly)
+
+
+def test_reactor_xml():
+    coils = [
+        paramak.poloidal_field_coil(height=50, width=50, center_point=(700, 400), rotation_angle=180),
+        paramak.poloidal_field_coil_case(
+            coil_height=50, coil_width=50, casing_thickness=10, center_point=(700, 400), rotation_angle=180
+        ),
+    ]
+    reactor = paramak.tokamak_from_plasma(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 30),
+            (paramak.LayerType.SOLID, 20),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 20),
+        ],
+        elongation=2,
+        rotation_angle=180,
+        extra_cut_shapes=coils,
+    )
+
+    geometry = assembly_to_csg(reactor, tags={"add_extra_cut_shape_1": "copper"})
+
+    # the center column cylinder is not reached by the coils so it is not cut
+    assert [cell.name for cell in geometry.cells] == ["add_extra_cut_shape_1", "add_extra_cut_shape_2", "layer_1"]
+    assert geometry.cad_parts == ("layer_2", "plasma")
+    root = ET.fromstring(geometry.to_xml(material_ids={"copper": 3}))
+    surface_ids = {surface.get("id") for surface in root.iter("surface")}
+    assert len(surface_ids) == len(geometry.surfaces)
+    for cell in root.iter("cell"):
+        region_ids = cell.get("region").replace("(", " ").replace(")", " ").replace("|", " ").replace("~", " ").split()
+        assert {region_id.lstrip("+-") for region_id in region_ids} <= surface_ids
+    assert [cell.get("material") for cell in root.iter("cell")] == ["3", "void", "void"]
+    # the coil and its case share the surfaces of the coil boundary
+    assert len(geometry.surfaces) < 3 * 4 + 4 + 1
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import pytest
+
+import paramak
+
+
+def imported_modules(statement):
+    """Returns the slow to import libraries loaded by the statement in a new process."""
+    heavy_modules = {"cadquery", "scipy"}
+    code = f"import sys\n{statement}\nprint(' '.join(sorted(set(sys.modules) & {heavy_modules!r})))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_import_is_lazy():
+    """Importing paramak should not import cadquery or scipy."""
+    assert imported_modules("import paramak") == []
+
+
+def test_builder_import_defers_scipy():
+    assert imported_modules("import paramak; paramak.blanket_from_plasma; paramak.tokamak_from_plasma") == [
+        "cadquery"
+    ]
+
+
+@pytest.mark.parametrize("name", ["tokamak", "blanket_from_plasma", "LayerType", "cache", "timing"])
+def test_lazy_attributes(name):
+    assert name in dir(paramak)
+    assert getattr(paramak, name) is getattr(paramak, name)
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        paramak.missing
@@ -0,0 +1,138 @@
+import time
+
+import pytest
+
+import paramak
+from paramak import sweep
+
+BASE = dict(
+    radial_build=[
+        (paramak.LayerType.GAP, 10),
+        (paramak.LayerType.SOLID, 40),
+        (paramak.LayerType.GAP, 50),
+        (paramak.LayerType.PLASMA, 300),
+        (paramak.LayerType.GAP, 60),
+        (paramak.LayerType.SOLID, 20),
+    ],
+    elongation=2.0,
+    triangularity=0.55,
+    rotation_angle=90,
+)
+
+
+def slow_reactor(**kwargs):
+    time.sleep(60)
+
+
+def add_tf_coils(kwargs):
+    """Turns the tf_coil_count parameter into toroidal field coils cut from the reactor."""
+    kwargs = dict(kwargs)
+    count = kwargs.pop("tf_coil_count")
+    kwargs["extra_cut_shapes"] = [
+        paramak.toroidal_field_coil_rectangle(
+            horizontal_start_point=(10, 700),
+            vertical_mid_point=(700, 0),
+            thickness=20,
+            distance=20,
+            azimuthal_placement_angles=[(index + 0.5) * 90 / count for index in range(count)],
+        )
+    ]
+    return kwargs
+
+
+def test_parameter_grid():
+    points = sweep.parameter_grid(elongation=[1.5, 2.0], **{"radial_build[1]": [20, 30, 40]})
+
+    assert len(points) == 6
+    assert points[0] == {"elongation": 1.5, "radial_build[1]": 20}
+
+
+def test_random_parameters():
+    points = sweep.random_parameters({"triangularity": (0.2, 0.6), "tf_coil_count": (4, 8)}, samples=20, seed=1)
+
+    assert len(points) == 20
+    assert all(0.2 <= point["triangularity"] <= 0.6 for point in points)
+    assert all(isinstance(point["tf_coil_count"], int) and 4 <= point["tf_coil_count"] <= 8 for point in points)
+    assert points == sweep.random_parameters({"triangularity": (0.2, 0.6), "tf_coil_count": (4, 8)}, 20, seed=1)
+
+
+def test_apply_parameters():
+    kwargs = sweep.apply_parameters(BASE, {"radial_build[1]": 25, "elongation": 1.7})
+
+    assert kwargs["radial_build"][1] == (paramak.LayerType.SOLID, 25)
+    assert kwargs["elongation"] == 1.7
+    assert BASE["radial_build"][1] == (paramak.LayerType.SOLID, 40)
+
+
+def test_sweep_is_resumed(tmp_path):
+    points = sweep.parameter_grid(**{"radial_build[1]": [30, 40]})
+    results = paramak.run_sweep(paramak.spherical_tokamak_from_plasma, BASE, points[:1], tmp_path, workers=1)
+
+    assert results[0]["status"] == "ok"
+    assert results[0]["seconds"] >= results[0]["timings"]["total"]
+    assert set(results[0]["volumes"]) == {"layer_1", "layer_2", "plasma"}
+    assert results[0]["timings"]["name"] == "spherical_tokamak_from_plasma"
+    assert (tmp_path / results[0]["files"]["brep"].split("/")[-1]).exists()
+
+    # an interrupted sweep can leave an incomplete last line
+    with open(tmp_path / sweep.RESULTS_FILENAME, "a") as file:
+        file.write('{"key": "abc", "sta')
+
+    resumed = paramak.run_sweep(paramak.spherical_tokamak_from_plasma, BASE, points, tmp_path, workers=2)
+    assert resumed[0] == results[0]
+    assert resumed[1]["status"] == "ok"
+    assert resumed[1]["volumes"]["layer_1"] > 0
+    assert [result["key"] for result in paramak.load_results(tmp_path)] == [result["key"] for result in resumed]
+
+    # a changed base builds the points again instead of returning the stored results
+    changed = paramak.run_sweep(
+        paramak.spherical_tokamak_from_plasma, {**BASE, "elongation": 1.8}, points[:1], tmp_path, workers=1
+    )
+    assert changed[0]["key"] != results[0]["key"]
+    assert changed[0]["volumes"]["plasma"] != pytest.approx(results[0]["volumes"]["plasma"])
+    assert changed[0]["seconds"] >= changed[0]["timings"]["total"]
+
+
+def test_sweep_coil_counts(tmp_path):
+    results = paramak.run_sweep(
+        paramak.spherical_tokamak_from_plasma,
+        BASE,
+        [{"tf_coil_count": 2}],
+        tmp_path,
+        workers=1,
+        export=("step",),
+        configure=add_tf_coils,
+    )
+
+    assert results[0]["status"] == "ok"
+    assert "add_extra_cut_shape_1" in results[0]["volumes"]
+    assert sweep.base_digest(BASE, add_tf_coils) != sweep.base_digest(BASE)
+    coil = paramak.poloidal_field_coil(height=20, width=20, center_point=(700, 0))
+    with_coil = {**BASE, "extra_cut_shapes": [coil]}
+    assert sweep.base_digest(with_coil) == sweep.base_digest(with_coil)
+    assert sweep.base_digest(with_coil) != sweep.base_digest(BASE)
+    assert results[0]["files"]["step"].endswith(".step")
+
+
+def test_sweep_failures_and_timeouts(tmp_path):
+    failed = paramak.run_sweep(
+        paramak.spherical_tokamak_from_plasma, BASE, [{"radial_build[9]": 1}], tmp_path, workers=1
+    )
+    assert failed[0]["status"] == "failed"
+    assert "IndexError" in failed[0]["error"]
+
+    start = time.perf_counter()
+    timed_out = paramak.run_sweep(slow_reactor, BASE, [{"elongation": 1.5}], tmp_path, workers=1, timeout=1)
+    assert time.perf_counter() - start < 30
+    assert timed_out[0]["status"] == "timeout"
+
+    # failed points are skipped when resuming unless they are retried
+    assert paramak.run_sweep(slow_reactor, BASE, [{"elongation": 1.5}], tmp_path, timeout=1) == timed_out
+    retried = paramak.run_sweep(slow_reactor, BASE, [{"elongation": 1.5}], tmp_path, timeout=1, retry_failed=True)
+    assert retried[0]["status"] == "timeout"
+    assert len(paramak.load_results(tmp_path)) == 3
+
+
+@pytest.mark.parametrize("name", ["run_sweep", "parameter_grid", "sweep"])
+def test_sweep_exports(name):
+    assert name in dir(paramak)
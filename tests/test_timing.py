@@ -0,0 +1,128 @@
+import logging
+
+import pytest
+
+import paramak
+from paramak import timing
+
+
+def build_tokamak():
+    return paramak.tokamak(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 30),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 20),
+        ],
+        vertical_build=[
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 700),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 15),
+        ],
+        triangularity=0.55,
+        rotation_angle=180,
+    )
+
+
+def test_timed_without_report():
+    """Stages outside of a report should run without recording anything."""
+
+    with timing.timed("stage"):
+        value = 1
+    assert value == 1
+
+
+def test_nested_stages():
+    with timing.timing_report("build") as report:
+        with timing.timed("outer"):
+            with timing.timed("inner"):
+                pass
+            with timing.timed("inner"):
+                pass
+        with timing.timing_report("nested") as nested_report:
+            pass
+
+    assert nested_report is report
+    assert list(report.stages) == ["build", "build/outer", "build/outer/inner", "build/nested"]
+    assert report.stages["build/outer/inner"].calls == 2
+    assert report.total == report.stages["build"].duration
+    assert report.as_dict()["stages"]["build/outer"]["calls"] == 1
+    assert "inner" in str(report)
+
+
+def test_recursive_stage_timed_once():
+    with timing.timing_report("build") as report:
+        with timing.timed("stage"):
+            with timing.timed("stage"):
+                pass
+
+    assert list(report.stages) == ["build", "build/stage"]
+    assert report.stages["build/stage"].calls == 1
+
+
+def test_tokamak_timings(caplog):
+    """The report should be attached to the assembly, logged and passed to
+    the callbacks."""
+
+    reports = []
+    timing.add_timing_callback(reports.append)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="paramak"):
+            reactor = build_tokamak()
+    finally:
+        timing.remove_timing_callback(reports.append)
+
+    assert reports == [reactor.timings]
+    assert reactor.timings.name == "tokamak"
+    assert reactor.timings.total > 0
+    for stage in [
+        "tokamak/build_workplanes/blanket_from_points/revolve",
+        "tokamak/find_layer_points",
+        "tokamak/build_workplanes/union",
+        "tokamak/assembly_add",
+    ]:
+        assert stage in reactor.timings.stages
+    assert "Timings of tokamak" in caplog.text
+    assert reactor.remove("plasma").timings is reactor.timings
+
+
+@pytest.mark.parametrize(
+    "builder, kwargs, stage",
+    [
+        (paramak.poloidal_field_coil, {"height": 30, "width": 30, "center_point": (700, 0)}, "revolve"),
+        (
+            paramak.poloidal_field_coil_case,
+            {"coil_height": 30, "coil_width": 30, "casing_thickness": 5, "center_point": (700, 0)},
+            "revolve",
+        ),
+        (paramak.constant_thickness_dome, {}, "revolve"),
+        (paramak.dished_vacuum_vessel, {}, "revolve"),
+        (paramak.toroidal_field_coil_rectangle, {}, "extrude"),
+        (paramak.toroidal_field_coil_princeton_d, {}, "extrude"),
+    ],
+)
+def test_builders_time_their_solids(builder, kwargs, stage):
+    """Every builder records the revolve or extrude that makes its solid, so
+    the stage totals cover all the components of a reactor."""
+
+    with timing.timing_report("build") as report:
+        builder(**kwargs)
+
+    assert any(name.split("/")[-1] == stage for name in report.stages)
+
+
+def test_timings_not_recorded_after_failure():
+    reports = []
+    timing.add_timing_callback(reports.append)
+    try:
+        with pytest.raises(ValueError):
+            with timing.timing_report("build"):
+                raise ValueError
+    finally:
+        timing.remove_timing_callback(reports.append)
+
+    assert reports == []
@@ -1,14 +1,27 @@
+import cadquery as cq
+import numpy as np
 import pytest
 
 from paramak.utils import (
+    _segment_distances,
     ValidationError,
+    cut_workplanes,
     get_gap_after_plasma,
     get_plasma_value,
+    bounds_overlap,
+    shape_bounds,
     sum_after_gap_following_plasma,
     sum_up_to_plasma,
     validate_divertor_radial_build,
     validate_plasma_radial_build,
     LayerType,
+    Profile,
+    adaptive_angles,
+    create_wire_workplane_from_arrays,
+    create_wire_workplane_from_instructions,
+    create_wire_workplane_from_points,
+    instructions_from_points,
+    is_preview,
 )
 
 
@@ -1054,3 +1067,138 @@ def test_sum_after_gap_following_plasma_not_found():
     ]
     with pytest.raises(ValueError, match="LayerType.PLASMA entry not found"):
         sum_after_gap_following_plasma(radial_build)
+
+
+def test_shape_bounds():
+    ring = cq.Workplane("XY").circle(50).circle(20).extrude(100).translate((0, 0, -500))
+    bounds = shape_bounds(ring.val())
+
+    assert bounds.min_radius == pytest.approx(20)
+    assert bounds.max_radius >= 50
+    assert bounds.min_corner[2] == pytest.approx(-500, abs=1e-3)
+    assert bounds.max_corner[2] == pytest.approx(-400, abs=1e-3)
+    assert shape_bounds(cq.Workplane("XY").circle(50).extrude(100).val()).min_radius == pytest.approx(0)
+
+
+def test_bounds_overlap():
+    column = shape_bounds(cq.Workplane("XY").circle(50).extrude(100, both=True).val())
+    coil = shape_bounds(cq.Workplane("XY").circle(300).circle(200).extrude(10).val())
+    box = cq.Workplane("XY").box(10, 10, 10)
+
+    # the bounding boxes of the column and the coil overlap but the annuli do not
+    assert not bounds_overlap(column, coil)
+    assert not bounds_overlap(coil, shape_bounds(box.translate((0, 0, 500)).val()))
+    assert bounds_overlap(column, shape_bounds(box.val()))
+    assert bounds_overlap(coil, shape_bounds(box.translate((250, 0, 0)).val()))
+
+
+def test_cut_workplanes_matches_sequential_cuts():
+    layers = [
+        cq.Workplane("XY").circle(300).circle(100).extrude(50),
+        cq.Workplane("XY").circle(90).circle(60).extrude(50),
+    ]
+    cutters = [
+        cq.Workplane("XY").circle(40).extrude(50),
+        cq.Workplane("XY").box(20, 20, 100).translate((150, 0, 0)),
+        cq.Workplane("XY").box(20, 20, 100).translate((0, 250, 0)),
+    ]
+
+    cut_layers = cut_workplanes(layers, cutters)
+
+    assert len(cut_layers) == 2
+    sequential = layers[0]
+    for cutter in cutters:
+        sequential = sequential.cut(cutter)
+    assert cut_layers[0].val().Volume() == pytest.approx(sequential.val().Volume())
+    assert cut_layers[0].val().Volume() < layers[0].val().Volume()
+    # none of the cutters reach the inner layer
+    assert cut_layers[1] is layers[1]
+
+
+def test_profile_points_round_trip():
+    points = [[0, 0, "straight"], [10, 0, "circle"], [5, 5, "circle"]]
+    profile = Profile.from_points(points)
+
+    assert profile.points.shape == (3, 2)
+    assert list(profile.connections) == ["straight", "circle", "circle"]
+    assert profile.holes == ()
+    assert profile.to_points() == points + [points[0]]
+
+
+@pytest.mark.parametrize(
+    "points",
+    [
+        [[100, 0, "straight"], [200, 0, "straight"], [200, 100, "straight"], [100, 100, "straight"]],
+        [[100, 0, "spline"], [200, 50, "spline"], [150, 150, "spline"], [80, 60, "spline"]],
+        [
+            [100, 0, "straight"],
+            [200, 0, "circle"],
+            [250, 50, "circle"],
+            [200, 100, "spline"],
+            [150, 120, "spline"],
+            [100, 100, "straight"],
+        ],
+    ],
+)
+def test_create_wire_workplane_from_arrays(points):
+    profile = Profile.from_points(points)
+
+    solid = create_wire_workplane_from_arrays(profile.points, profile.connections, plane="XZ").revolve(90)
+
+    # the same wire made with the Workplane methods
+    workplane = cq.Workplane("XZ")
+    if all(point[2] == "spline" for point in points):
+        expected = workplane.spline([point[:2] for point in points], makeWire=True, tol=1e-1, periodic=True)
+    else:
+        instructions = instructions_from_points(points + [points[0]])
+        expected = create_wire_workplane_from_instructions(instructions=instructions, workplane=workplane)
+    assert solid.val().isValid()
+    assert solid.val().Volume() == pytest.approx(expected.revolve(90).val().Volume())
+    assert create_wire_workplane_from_points(points + [points[0]], plane="XZ").revolve(90).val().Volume() == (
+        pytest.approx(solid.val().Volume())
+    )
+
+
+def test_adaptive_angles_meet_the_tolerance():
+    def curves(angles):
+        # a triangular plasma boundary and a circle
+        theta = np.radians(angles)
+        plasma = np.stack((450 + 150 * np.cos(theta + 0.55 * np.sin(theta)), 300 * np.sin(theta)), axis=-1)
+        circle = np.stack((100 * np.cos(theta), 100 * np.sin(theta)), axis=-1)
+        return np.stack((plasma, circle))
+
+    def max_deviation(angles):
+        dense = np.linspace(0, 360, 100001)
+        index = np.clip(np.searchsorted(angles, dense) - 1, 0, len(angles) - 2)
+        points = curves(angles)
+        chords = (points[:, index], points[:, index + 1])
+        return _segment_distances(curves(dense), *chords).max()
+
+    angles = adaptive_angles(curves, 0, 360, tolerance=0.1)
+
+    assert angles[0] == 0 and angles[-1] == 360
+    assert np.all(np.diff(angles) > 0)
+    assert max_deviation(angles) <= 0.1
+    assert max_deviation(np.linspace(0, 360, len(angles))) > 0.1
+    with pytest.raises(ValueError):
+        adaptive_angles(curves, 0, 360, tolerance=0.1, max_points=20)
+
+
+def test_straightened_profile():
+    hole = Profile.from_points([[1, 1, "spline"], [2, 1, "spline"], [2, 2, "straight"]])
+    profile = Profile.from_points(
+        [[0, 0, "spline"], [5, 0, "circle"], [4, 3, "circle"], [0, 5, "spline"], [-1, 2, "straight"]], holes=(hole,)
+    )
+
+    straightened = profile.straightened()
+
+    assert list(straightened.connections) == ["straight", "circle", "circle", "straight", "straight"]
+    assert set(straightened.holes[0].connections) == {"straight"}
+    np.testing.assert_array_equal(straightened.points, profile.points)
+
+
+def test_is_preview():
+    assert is_preview("preview")
+    assert not is_preview("full")
+    with pytest.raises(ValueError):
+        is_preview("draft")
@@ -0,0 +1,127 @@
+import pytest
+
+import paramak
+from paramak.utils import copy_workplane, create_wire_workplane_from_points
+from paramak.volumes import shape_volume, workplane_volume
+
+REVOLVED_BUILDERS = [
+    (paramak.plasma_simplified, paramak.plasma_simplified_profile, dict(elongation=1.8, triangularity=0.4)),
+    (
+        paramak.blanket_from_plasma,
+        paramak.blanket_from_plasma_profile,
+        dict(thickness=20, start_angle=-90, stop_angle=260, offset_from_plasma=[10, 30]),
+    ),
+    (
+        paramak.blanket_constant_thickness_arc_h,
+        paramak.blanket_constant_thickness_arc_h_profile,
+        dict(inner_mid_point=(500, 0), inner_upper_point=(400, 300), inner_lower_point=(400, -300), thickness=20),
+    ),
+    (
+        paramak.center_column_shield_cylinder,
+        paramak.center_column_shield_cylinder_profile,
+        dict(height=600, inner_radius=20, thickness=40),
+    ),
+    (paramak.constant_thickness_dome, paramak.constant_thickness_dome_profile, dict(upper_or_lower="lower")),
+    (
+        paramak.poloidal_field_coil,
+        paramak.poloidal_field_coil_profile,
+        dict(height=30, width=20, center_point=(750, 200)),
+    ),
+    (
+        paramak.poloidal_field_coil_case,
+        paramak.poloidal_field_coil_case_profile,
+        dict(coil_height=30, coil_width=20, casing_thickness=5, center_point=(750, 200)),
+    ),
+]
+
+
+@pytest.mark.parametrize("builder,profile_function,kwargs", REVOLVED_BUILDERS)
+@pytest.mark.parametrize("rotation_angle", [90, 270])
+def test_revolved_matches_occ(builder, profile_function, kwargs, rotation_angle):
+    solid = builder(rotation_angle=rotation_angle, **kwargs)
+    profile = profile_function(**kwargs)
+
+    assert paramak.revolved_volume(profile, rotation_angle) == pytest.approx(shape_volume(solid.val()), rel=1e-5)
+    assert workplane_volume(solid, cross_check_tolerance=1e-5) == paramak.revolved_volume(profile, rotation_angle)
+    area = paramak.revolved_surface_area(profile, rotation_angle)
+    assert area == pytest.approx(solid.val().Area(), rel=1e-3)
+
+
+def test_extruded_matches_occ():
+    profile, _ = paramak.toroidal_field_coil_rectangle_profile(
+        horizontal_start_point=(10, 500), vertical_mid_point=(600, 0), thickness=50
+    )
+    solid = create_wire_workplane_from_points(profile.to_points(), plane="XZ").extrude(until=10, both=True)
+
+    assert paramak.extruded_volume(profile, 20) == pytest.approx(solid.val().Volume())
+    assert paramak.extruded_surface_area(profile, 20) == pytest.approx(solid.val().Area())
+
+
+def test_profiles_kept_by_copies():
+    solid = paramak.poloidal_field_coil(height=30, width=20, center_point=(750, 200), rotation_angle=45)
+    copy = copy_workplane(solid)
+
+    assert copy.rotation_angle == 45
+    assert copy.profiles[0].points.tolist() == solid.profiles[0].points.tolist()
+    assert workplane_volume(copy) == workplane_volume(solid)
+
+
+def test_cross_check_failure():
+    solid = paramak.poloidal_field_coil(height=30, width=20, center_point=(750, 200), rotation_angle=90)
+    solid.profiles = (paramak.poloidal_field_coil_profile(height=30, width=25, center_point=(750, 200)),)
+
+    with pytest.raises(ValueError):
+        workplane_volume(solid, cross_check_tolerance=1e-3)
+
+
+def test_assembly_volumes():
+    extra_cut_shape = paramak.poloidal_field_coil(height=30, width=30, center_point=(750, 200), rotation_angle=180)
+    reactor = paramak.spherical_tokamak_from_plasma(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 50),
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.SOLID, 60),
+        ],
+        elongation=2,
+        triangularity=0.55,
+        rotation_angle=180,
+        extra_cut_shapes=[extra_cut_shape],
+    )
+
+    volumes = reactor.volumes(cross_check_tolerance=1e-4)
+    assert set(volumes) == set(reactor.names())
+    for name, volume in volumes.items():
+        assert volume == pytest.approx(shape_volume(reactor.objects[name].obj.val()), rel=1e-4)
+
+
+def test_tokamak_layer_volumes():
+    """The tokamak layers are unions of the parts inboard and outboard of the
+    plasma, with the volume of the union found from both profiles."""
+
+    reactor = paramak.tokamak(
+        radial_build=[
+            (paramak.LayerType.GAP, 10),
+            (paramak.LayerType.SOLID, 30),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 300),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 20),
+        ],
+        vertical_build=[
+            (paramak.LayerType.SOLID, 15),
+            (paramak.LayerType.GAP, 50),
+            (paramak.LayerType.PLASMA, 700),
+            (paramak.LayerType.GAP, 60),
+            (paramak.LayerType.SOLID, 15),
+        ],
+        triangularity=0.55,
+        rotation_angle=180,
+    )
+
+    assert len(reactor.objects["layer_1"].obj.profiles) == 2
+    reactor.volumes(cross_check_tolerance=1e-4)
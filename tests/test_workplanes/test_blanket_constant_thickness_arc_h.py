@@ -2,6 +2,8 @@ import math
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_relative_shape_volume():
     """Creates two blankets using the blanket_constant_thickness_arc_h
@@ -35,3 +37,12 @@ def test_relative_shape_volume():
     areas = [face.Area() for face in test_shape_180.val().Faces()]
     assert len(areas) == 6
     assert len(set([round(i) for i in areas])) == 4
+
+
+def test_profile_matches_solid():
+    kwargs = dict(inner_mid_point=(500, 0), inner_upper_point=(400, 300), inner_lower_point=(400, -300), thickness=20)
+    profile = paramak.blanket_constant_thickness_arc_h_profile(**kwargs)
+
+    assert list(profile.connections) == ["circle", "circle", "straight", "circle", "circle", "straight"]
+    solid = paramak.blanket_constant_thickness_arc_h(rotation_angle=180, **kwargs)
+    assert math.isclose(profile_volume(profile, rotation_angle=180), solid.val().Volume())
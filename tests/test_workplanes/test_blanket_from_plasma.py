@@ -5,6 +5,9 @@ import pytest
 from cadquery import exporters
 
 import paramak
+from paramak.volumes import shape_volume
+
+from .utils import profile_volume
 
 plasma = paramak.plasma_simplified(
     major_radius=450, minor_radius=150, triangularity=0.55, elongation=2, rotation_angle=160
@@ -152,3 +155,130 @@ def test_overlapping():
             stop_angle=360,
             start_angle=0,
         )
+
+
+def test_offset_points_match_finite_difference_normals():
+    """Checks that the closed form normals used to offset the points match
+    the normals found from central differences of the plasma distribution."""
+
+    import numpy as np
+
+    from paramak.workplanes.blanket_from_plasma import distribution, find_layer_points
+
+    shape = dict(major_radius=450, minor_radius=150, triangularity=0.55, elongation=2, vertical_displacement=10)
+    thetas = np.linspace(-90, 270, 37)
+
+    inner_points, _ = find_layer_points(
+        start_angle=-90,
+        stop_angle=270,
+        offsets=[lambda theta: 10 + 0.1 * theta],
+        thicknesses=[20],
+        angles=thetas,
+        **shape,
+    )
+
+    step = 1e-4
+    R_after, Z_after = distribution(theta=thetas + step, **shape)
+    R_before, Z_before = distribution(theta=thetas - step, **shape)
+    R_derivative, Z_derivative = R_after - R_before, Z_after - Z_before
+    norm = np.hypot(R_derivative, Z_derivative)
+    nx, ny = Z_derivative / norm, -R_derivative / norm
+
+    R, Z = distribution(theta=thetas, **shape)
+    offsets = 10 + 0.1 * thetas
+    assert inner_points[0] == pytest.approx(np.stack((R + offsets * nx, Z + offsets * ny), 1), abs=1e-5)
+
+
+def test_offset_points_with_scalar_only_callable():
+    """Checks that an offset function that only accepts scalar angles is
+    evaluated once per angle."""
+
+    import math
+
+    def offset(theta):
+        return 10 + math.cos(math.radians(theta))
+
+    test_shape = paramak.blanket_from_plasma(thickness=150, start_angle=-90, stop_angle=240, offset_from_plasma=offset)
+
+    assert test_shape.vals()[0].Volume() > 1000
+
+
+def test_find_layer_points_matches_single_layers():
+    """Checks that the batched layer points have one (n_points, 2) array per
+    layer and match the points found for each layer separately."""
+
+    from paramak.workplanes.blanket_from_plasma import find_layer_points, find_points
+
+    shape = dict(major_radius=450, minor_radius=150, triangularity=0.55, elongation=2, vertical_displacement=0)
+    offsets = [0, [10, 20, 30], (5, 50)]
+    thicknesses = [10, [5, 10, 20], lambda theta: 10 + 0.1 * theta]
+
+    inner_points, outer_points = find_layer_points(
+        start_angle=90, stop_angle=-90, offsets=offsets, thicknesses=thicknesses, num_points=40, **shape
+    )
+
+    assert inner_points.shape == (3, 40, 2)
+    assert outer_points.shape == (3, 40, 2)
+
+    for i, (offset, thickness) in enumerate(zip(offsets, thicknesses)):
+        points = find_points(
+            start_angle=90,
+            stop_angle=-90,
+            offset_from_plasma=offset,
+            thickness=thickness,
+            connect_to_center=False,
+            num_points=40,
+            allow_overlapping_shape=True,
+            **shape,
+        )
+        expected = inner_points[i].flatten().tolist() + outer_points[i].flatten().tolist()
+        assert [value for point in points for value in point[:2]] == pytest.approx(expected)
+
+
+def test_find_layer_points_length_mismatch():
+    """Checks that an error is raised when the number of offsets and
+    thicknesses differ."""
+
+    from paramak.workplanes.blanket_from_plasma import find_layer_points
+
+    with pytest.raises(ValueError, match="one entry per layer"):
+        find_layer_points(
+            start_angle=90,
+            stop_angle=-90,
+            offsets=[0, 10],
+            thicknesses=[10],
+            major_radius=450,
+            minor_radius=150,
+            triangularity=0.55,
+            elongation=2,
+        )
+
+
+def test_profile_matches_solid():
+    kwargs = dict(thickness=20, start_angle=-90, stop_angle=260, offset_from_plasma=[10, 30], num_points=30)
+    profile = paramak.blanket_from_plasma_profile(**kwargs)
+
+    assert profile.points.shape == (60, 2)
+    assert list(profile.connections).count("straight") == 2
+    solid = paramak.blanket_from_plasma(rotation_angle=180, **kwargs)
+    assert profile_volume(profile, rotation_angle=180) == pytest.approx(solid.val().Volume())
+
+
+def test_adaptive_points():
+    uniform = paramak.blanket_from_plasma(thickness=20, start_angle=-90, stop_angle=260, num_points=400)
+    adaptive = paramak.blanket_from_plasma(thickness=20, start_angle=-90, stop_angle=260, tolerance=0.1)
+
+    assert len(adaptive.profiles[0].points) < 400
+    assert shape_volume(adaptive.val()) == pytest.approx(shape_volume(uniform.val()), rel=1e-5)
+
+
+def test_preview():
+    kwargs = dict(thickness=20, start_angle=-90, stop_angle=260, num_points=100)
+    profile = paramak.blanket_from_plasma_profile(fidelity="preview", **kwargs)
+
+    assert len(profile.points) == 2 * paramak.utils.PREVIEW_NUM_POINTS
+    assert set(profile.connections) == {"straight"}
+    preview = paramak.blanket_from_plasma(fidelity="preview", **kwargs)
+    assert set(preview.profiles[0].connections) == {"straight"}
+    full = paramak.blanket_from_plasma(**kwargs)
+    assert shape_volume(preview.val()) == pytest.approx(shape_volume(full.val()), rel=0.05)
@@ -1,7 +1,10 @@
 import cadquery as cq
+import pytest
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_creation():
     test_shape = paramak.center_column_shield_cylinder(height=100, inner_radius=10, thickness=20, rotation_angle=90)
@@ -27,3 +30,15 @@ def test_reference_point():
     )
     assert test_shape.val().BoundingBox().zmin == -250
     assert test_shape.val().BoundingBox().zmax == -150
+
+
+def test_profile_matches_solid():
+    profile = paramak.center_column_shield_cylinder_profile(
+        height=100, inner_radius=10, thickness=20, reference_point=("lower", 5)
+    )
+
+    assert profile.points.tolist() == [[10, 105], [30, 105], [30, 5], [10, 5]]
+    solid = paramak.center_column_shield_cylinder(
+        height=100, inner_radius=10, thickness=20, reference_point=("lower", 5), rotation_angle=90
+    )
+    assert profile_volume(profile, rotation_angle=90) == pytest.approx(solid.val().Volume())
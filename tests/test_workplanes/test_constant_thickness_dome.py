@@ -1,9 +1,22 @@
 import cadquery as cq
+import pytest
 
 import paramak
 import paramak.workplanes
 
+from .utils import profile_volume
+
 a = paramak.constant_thickness_dome(upper_or_lower="upper")
 cq.exporters.export(a, "upper.step")
 a = paramak.constant_thickness_dome(upper_or_lower="lower")
 cq.exporters.export(a, "lower.step")
+
+
+@pytest.mark.parametrize("upper_or_lower", ["upper", "lower"])
+def test_profile_matches_solid(upper_or_lower):
+    kwargs = dict(thickness=15, chord_center_height=200, chord_width=570, chord_height=50)
+    profile = paramak.constant_thickness_dome_profile(upper_or_lower=upper_or_lower, **kwargs)
+
+    assert "circle" in profile.connections
+    solid = paramak.constant_thickness_dome(upper_or_lower=upper_or_lower, rotation_angle=90, **kwargs)
+    assert profile_volume(profile, rotation_angle=90) == pytest.approx(solid.val().Volume())
@@ -1,7 +1,10 @@
 import cadquery as cq
+import pytest
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_creation():
     lower_dome_section, cylinder_section, upper_dome_section = paramak.dished_vacuum_vessel()
@@ -28,3 +31,12 @@ def test_reference_point():
     )
     assert lower_dome_section.val().BoundingBox().zmin == -465
     assert upper_dome_section.val().BoundingBox().zmax == 65
+
+
+def test_profile_matches_solid():
+    profiles = paramak.dished_vacuum_vessel_profile(reference_point=("lower", 10))
+    solids = paramak.dished_vacuum_vessel(reference_point=("lower", 10), rotation_angle=90)
+
+    assert len(profiles) == len(solids) == 3
+    for profile, solid in zip(profiles, solids):
+        assert profile_volume(profile, rotation_angle=90) == pytest.approx(solid.val().Volume())
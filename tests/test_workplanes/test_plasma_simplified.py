@@ -4,8 +4,9 @@ import cadquery as cq
 import pytest
 
 import paramak
+from paramak.volumes import shape_volume
 
-from .utils import transport_particles_on_h5m_geometry
+from .utils import profile_volume, transport_particles_on_h5m_geometry
 
 
 @pytest.mark.parametrize("rotation_angle", [30, 90, 180, 360])
@@ -45,3 +46,36 @@ def test_transport_different_angles(rotation_angle):
         cross_sections_xml="tests/cross_sections.xml",
     )
     assert flux > 0.0
+
+
+def test_profile_matches_solid():
+    profile = paramak.plasma_simplified_profile(elongation=1.8, triangularity=0.4, num_points=40)
+
+    assert profile.points.shape == (40, 2)
+    assert set(profile.connections) == {"spline"}
+    solid = paramak.plasma_simplified(elongation=1.8, triangularity=0.4, num_points=40, rotation_angle=90)
+    assert profile_volume(profile, rotation_angle=90) == pytest.approx(solid.val().Volume())
+
+
+def test_adaptive_points():
+    profile = paramak.plasma_simplified_profile(tolerance=0.1)
+
+    # equally spaced angles need 135 points to keep the chords within 0.1 cm
+    assert len(profile.points) < 110
+    solid = paramak.plasma_simplified(tolerance=0.1, rotation_angle=90)
+    uniform = paramak.plasma_simplified(num_points=400, rotation_angle=90)
+    assert shape_volume(solid.val()) == pytest.approx(shape_volume(uniform.val()), rel=1e-5)
+
+
+def test_preview():
+    profile = paramak.plasma_simplified_profile(num_points=100, tolerance=0.1, fidelity="preview")
+
+    assert len(profile.points) == paramak.utils.PREVIEW_NUM_POINTS
+    assert set(profile.connections) == {"straight"}
+    preview = paramak.plasma_simplified(rotation_angle=360, fidelity="preview")
+    full = paramak.plasma_simplified(rotation_angle=360)
+    # the 360 degree preview is revolved in one piece
+    assert len(preview.solids().vals()) == 1
+    assert preview.val().isValid()
+    assert shape_volume(preview.val()) == pytest.approx(shape_volume(full.val()), rel=0.05)
+    assert profile_volume(preview.profiles[0], rotation_angle=360) == pytest.approx(shape_volume(preview.val()))
@@ -4,6 +4,8 @@ from cadquery import exporters
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_construction():
     poloidal_field_coil = paramak.poloidal_field_coil(height=20, width=10, center_point=(100, 50), rotation_angle=360)
@@ -18,3 +20,11 @@ def test_volume_rotation_angle():
     )
 
     assert math.isclose(half_poloidal_field_coil.val().Volume(), poloidal_field_coil.val().Volume() / 2)
+
+
+def test_profile_matches_solid():
+    profile = paramak.poloidal_field_coil_profile(height=20, width=10, center_point=(100, 50))
+
+    assert profile.points.shape == (4, 2)
+    solid = paramak.poloidal_field_coil(height=20, width=10, center_point=(100, 50), rotation_angle=180)
+    assert math.isclose(profile_volume(profile, rotation_angle=180), solid.val().Volume())
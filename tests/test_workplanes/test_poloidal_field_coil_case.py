@@ -4,6 +4,8 @@ from cadquery import exporters
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_construction():
     poloidal_field_coil_case = paramak.poloidal_field_coil_case(
@@ -22,3 +24,12 @@ def test_volume_rotation_angle():
     )
 
     assert math.isclose(half_poloidal_field_coil_case.val().Volume(), poloidal_field_coil_case.val().Volume() / 2)
+
+
+def test_profile_matches_solid():
+    kwargs = dict(coil_height=20, coil_width=10, center_point=(100, 50), casing_thickness=10)
+    profile = paramak.poloidal_field_coil_case_profile(**kwargs)
+
+    assert len(profile.holes) == 1
+    solid = paramak.poloidal_field_coil_case(rotation_angle=180, **kwargs)
+    assert math.isclose(profile_volume(profile, rotation_angle=180), solid.val().Volume())
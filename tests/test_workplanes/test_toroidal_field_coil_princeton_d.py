@@ -1,4 +1,16 @@
+import numpy as np
+import pytest
+
 import paramak
+from paramak.workplanes import toroidal_field_coil_princeton_d as princeton_d
+from paramak.workplanes.toroidal_field_coil_princeton_d import (
+    PROFILE_TABLE_TOLERANCE,
+    _compute_inner_points,
+    _profile_table,
+    _solve_inner_points,
+)
+
+from .utils import profile_volume
 
 
 def test_creation_of_inner_leg():
@@ -20,3 +32,57 @@ def test_rotation_angle():
         / (0.5 * solid_180_uncut.val().Volume())
         < 0.00001
     )
+
+
+@pytest.mark.parametrize("r1, r2", [(130, 300), (50, 1234.5), (1.2, 30), (400, 470)])
+def test_profile_table_matches_solver(r1, r2):
+    r_values, z_values = _compute_inner_points(r1, r2)
+    solved_r_values, solved_z_values = _solve_inner_points(r1, r2)
+
+    assert np.allclose(r_values, solved_r_values)
+    assert np.abs(z_values - solved_z_values).max() < PROFILE_TABLE_TOLERANCE * np.abs(solved_z_values).max()
+
+
+@pytest.mark.parametrize("r1, r2", [(100, 105), (10, 600)])
+def test_profile_table_falls_back_to_solver(r1, r2):
+    """Ratios outside of the table are solved."""
+    r_values, z_values = _compute_inner_points(r1, r2)
+    solved_r_values, solved_z_values = _solve_inner_points(r1, r2)
+
+    assert np.array_equal(r_values, solved_r_values)
+    assert np.array_equal(z_values, solved_z_values)
+
+
+def test_shipped_profile_table_is_accurate():
+    """The shipped table should match the current table settings and be
+    accurate over the whole range of ratios."""
+    log_ratios, _, accurate = _profile_table()
+
+    with np.load(princeton_d.PROFILE_TABLE_FILENAME) as data:
+        assert np.allclose(data["log_ratios"], log_ratios)
+    assert accurate.all()
+
+
+def test_profile_table_solved_without_shipped_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(princeton_d, "PROFILE_TABLE_FILENAME", tmp_path / "missing.npz")
+    monkeypatch.setattr(princeton_d, "PROFILE_TABLE_NODES", 9)
+    _profile_table.cache_clear()
+    try:
+        log_ratios, _, accurate = _profile_table()
+        assert len(log_ratios) == 9
+        assert len(accurate) == 8
+    finally:
+        _profile_table.cache_clear()
+
+
+def test_profile_matches_solid():
+    coil_profile, inner_leg_profile = paramak.toroidal_field_coil_princeton_d_profile(
+        r1=100, r2=900, thickness=50, vertical_displacement=10
+    )
+
+    assert set(coil_profile.connections) == {"spline", "straight"}
+    assert inner_leg_profile.points.shape == (4, 2)
+    solid = paramak.toroidal_field_coil_princeton_d(
+        r1=100, r2=900, thickness=50, distance=30, vertical_displacement=10, with_inner_leg=False
+    )
+    assert profile_volume(coil_profile, distance=30) == pytest.approx(solid.val().Volume())
@@ -1,9 +1,13 @@
 import math
 
+import pytest
+
 from cadquery import exporters
 
 import paramak
 
+from .utils import profile_volume
+
 
 def test_construction():
     toroidal_field_coil_rectangle = paramak.toroidal_field_coil_rectangle(azimuthal_placement_angles=[0, 90, 180])
@@ -36,3 +40,57 @@ def test_rotation_angle():
         / (0.5 * solid_180_uncut.val().Volume())
         < 0.00001
     )
+
+
+@pytest.mark.parametrize("with_inner_leg", [True, False])
+def test_instanced_volume(with_inner_leg):
+    angles = [0, 90, 180, 270]
+    fused = paramak.toroidal_field_coil_rectangle(azimuthal_placement_angles=angles, with_inner_leg=with_inner_leg)
+    instanced = paramak.toroidal_field_coil_rectangle(
+        azimuthal_placement_angles=angles, with_inner_leg=with_inner_leg, instanced=True
+    )
+
+    assert instanced.val().Volume() == pytest.approx(fused.val().Volume())
+    if with_inner_leg:
+        # one solid per coil plus the fused inner legs
+        assert len(instanced.val().Solids()) > 4
+    else:
+        assert len(instanced.val().Solids()) == 4
+
+
+def test_instanced_coils_share_geometry():
+    instanced = paramak.toroidal_field_coil_rectangle(
+        azimuthal_placement_angles=[0, 120, 240], with_inner_leg=False, instanced=True
+    )
+    coils = instanced.val().Solids()
+
+    assert all(coil.wrapped.IsPartner(coils[0].wrapped) for coil in coils[1:])
+    assert coils[1].Center().y == pytest.approx(-coils[2].Center().y)
+    assert instanced.name == "toroidal_field_coil"
+
+
+def test_instanced_rotation_angle():
+    fused = paramak.toroidal_field_coil_rectangle(azimuthal_placement_angles=[0, 90, 180, 270], rotation_angle=180)
+    instanced = paramak.toroidal_field_coil_rectangle(
+        azimuthal_placement_angles=[0, 90, 180, 270], rotation_angle=180, instanced=True
+    )
+
+    assert instanced.val().Volume() == pytest.approx(fused.val().Volume())
+
+
+def test_profile_matches_solid():
+    coil_profile, inner_leg_profile = paramak.toroidal_field_coil_rectangle_profile(
+        horizontal_start_point=(10, 520), vertical_mid_point=(860, 0), thickness=50, vertical_displacement=10
+    )
+
+    assert coil_profile.points.shape == (10, 2)
+    assert inner_leg_profile.points.shape == (4, 2)
+    solid = paramak.toroidal_field_coil_rectangle(
+        horizontal_start_point=(10, 520),
+        vertical_mid_point=(860, 0),
+        thickness=50,
+        distance=30,
+        vertical_displacement=10,
+    )
+    volume = profile_volume(coil_profile, distance=30) + profile_volume(inner_leg_profile, distance=30)
+    assert math.isclose(volume, solid.val().Volume())
@@ -1,7 +1,10 @@
+import pytest
 from cadquery import exporters
 
 import paramak
 
+from .utils import profile_volume
+
 # TODO try OCP 7.7.1 and newer cadquery
 # lower with rotation_angle less than 360 can fail, OCP 7.7.0
 
@@ -15,3 +18,13 @@ def test_construction():
     domes = paramak.u_shaped_dome(upper_or_lower="upper", rotation_angle=360)
     domes = paramak.u_shaped_dome(upper_or_lower="upper", rotation_angle=360, reference_point=("lower", 10))
     domes = paramak.u_shaped_dome(upper_or_lower="upper", rotation_angle=360, reference_point=("center", 20))
+
+
+@pytest.mark.parametrize("upper_or_lower", ["upper", "lower"])
+def test_profile_matches_solid(upper_or_lower):
+    profiles = paramak.u_shaped_dome_profile(upper_or_lower=upper_or_lower)
+    solids = paramak.u_shaped_dome(upper_or_lower=upper_or_lower, rotation_angle=90)
+
+    assert len(profiles) == len(solids) == 2
+    for profile, solid in zip(profiles, solids):
+        assert profile_volume(profile, rotation_angle=90) == pytest.approx(solid.val().Volume())
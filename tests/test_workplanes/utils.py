@@ -1,3 +1,21 @@
+from paramak.utils import create_wire_workplane_from_points
+
+
+def profile_volume(profile, rotation_angle=None, distance=None):
+    """Builds the volume of a 2D profile with OCC, revolved by the
+    rotation_angle or extruded by the distance, to check the profile
+    functions against the builders."""
+    volume = 0
+    for sign, loop in [(1, profile)] + [(-1, hole) for hole in profile.holes]:
+        wire = create_wire_workplane_from_points(loop.to_points(), plane="XZ")
+        if rotation_angle is not None:
+            solid = wire.revolve(rotation_angle)
+        else:
+            solid = wire.extrude(until=distance / 2, both=True)
+        volume += sign * solid.val().Volume()
+    return volume
+
+
 def transport_particles_on_h5m_geometry(
     h5m_filename: str,
     material_tags: list,